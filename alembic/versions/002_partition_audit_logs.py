@@ -0,0 +1,125 @@
+"""Partition audit_logs by month
+
+Revision ID: 002
+Revises: 001
+Create Date: 2026-10-17 09:00:00
+
+"""
+from datetime import date, datetime
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '002'
+down_revision = '001'
+branch_labels = None
+depends_on = None
+
+PARTITIONS_AHEAD = 3
+
+COLUMNS = "id, organization_id, user_id, action, resource_type, resource_id, details, ip_address, user_agent, timestamp"
+
+# DDL is spelled out here rather than shared with src.database.partitions,
+# so later changes to the runtime helpers never alter this revision
+RLS_POLICY_SQL = """
+    CREATE POLICY {table}_isolation_policy ON {table}
+    FOR ALL
+    USING (organization_id = current_setting('app.current_organization_id', TRUE)::uuid)
+"""
+
+
+def enable_rls(table: str) -> None:
+    op.execute(f"ALTER TABLE {table} ENABLE ROW LEVEL SECURITY")
+    op.execute(RLS_POLICY_SQL.format(table=table))
+
+
+def add_months(value: date, months: int) -> date:
+    """First day of the month `months` after value's"""
+    index = value.year * 12 + value.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+
+    # Move the existing table out of the way
+    op.execute("DROP POLICY IF EXISTS audit_logs_isolation_policy ON audit_logs")
+    op.drop_index('ix_audit_logs_timestamp', table_name='audit_logs')
+    op.drop_index('ix_audit_logs_organization_id', table_name='audit_logs')
+    op.drop_index('ix_audit_logs_action', table_name='audit_logs')
+    op.execute("ALTER TABLE audit_logs RENAME CONSTRAINT audit_logs_pkey TO audit_logs_legacy_pkey")
+    op.execute("ALTER TABLE audit_logs RENAME TO audit_logs_legacy")
+
+    # Partitioned parent, the partition key has to be part of the primary key
+    op.execute("""
+        CREATE TABLE audit_logs (
+            id UUID NOT NULL,
+            organization_id UUID NOT NULL REFERENCES organizations (id),
+            user_id UUID,
+            action VARCHAR(100) NOT NULL,
+            resource_type VARCHAR(100) NOT NULL,
+            resource_id VARCHAR(255),
+            details TEXT,
+            ip_address VARCHAR(45),
+            user_agent VARCHAR(500),
+            timestamp TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            PRIMARY KEY (id, timestamp)
+        ) PARTITION BY RANGE (timestamp)
+    """)
+    op.create_index(op.f('ix_audit_logs_action'), 'audit_logs', ['action'], unique=False)
+    op.create_index(op.f('ix_audit_logs_organization_id'), 'audit_logs', ['organization_id'], unique=False)
+    op.create_index(op.f('ix_audit_logs_timestamp'), 'audit_logs', ['timestamp'], unique=False)
+    enable_rls('audit_logs')
+
+    # One partition per month of existing data, plus a few months ahead
+    oldest = conn.execute(sa.text("SELECT min(timestamp) FROM audit_logs_legacy")).scalar()
+    month = add_months((oldest or datetime.utcnow()).date(), 0)
+    last = add_months(datetime.utcnow().date(), PARTITIONS_AHEAD)
+    while month <= last:
+        name = f"audit_logs_y{month.year}m{month.month:02d}"
+        op.execute(
+            f"CREATE TABLE {name} PARTITION OF audit_logs "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')"
+        )
+        enable_rls(name)
+        month = add_months(month, 1)
+    op.execute("CREATE TABLE audit_logs_default PARTITION OF audit_logs DEFAULT")
+    enable_rls('audit_logs_default')
+
+    op.execute(f"INSERT INTO audit_logs ({COLUMNS}) SELECT {COLUMNS} FROM audit_logs_legacy")
+    op.execute("DROP TABLE audit_logs_legacy")
+
+
+def downgrade() -> None:
+    # Partition policies go away with the partitions when the old table is dropped
+    op.execute("ALTER TABLE audit_logs RENAME TO audit_logs_partitioned")
+    op.execute("DROP POLICY IF EXISTS audit_logs_isolation_policy ON audit_logs_partitioned")
+    op.drop_index('ix_audit_logs_timestamp', table_name='audit_logs_partitioned')
+    op.drop_index('ix_audit_logs_organization_id', table_name='audit_logs_partitioned')
+    op.drop_index('ix_audit_logs_action', table_name='audit_logs_partitioned')
+    op.execute("ALTER TABLE audit_logs_partitioned RENAME CONSTRAINT audit_logs_pkey TO audit_logs_partitioned_pkey")
+
+    op.create_table(
+        'audit_logs',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('organization_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('user_id', postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column('action', sa.String(length=100), nullable=False),
+        sa.Column('resource_type', sa.String(length=100), nullable=False),
+        sa.Column('resource_id', sa.String(length=255), nullable=True),
+        sa.Column('details', sa.Text(), nullable=True),
+        sa.Column('ip_address', sa.String(length=45), nullable=True),
+        sa.Column('user_agent', sa.String(length=500), nullable=True),
+        sa.Column('timestamp', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['organization_id'], ['organizations.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_audit_logs_action'), 'audit_logs', ['action'], unique=False)
+    op.create_index(op.f('ix_audit_logs_organization_id'), 'audit_logs', ['organization_id'], unique=False)
+    op.create_index(op.f('ix_audit_logs_timestamp'), 'audit_logs', ['timestamp'], unique=False)
+
+    op.execute(f"INSERT INTO audit_logs ({COLUMNS}) SELECT {COLUMNS} FROM audit_logs_partitioned")
+    op.execute("DROP TABLE audit_logs_partitioned")
+    enable_rls('audit_logs')
@@ -0,0 +1,29 @@
+"""Composite index for keyset pagination of audit logs
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-17 11:00:00
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '003'
+down_revision = '002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Created on the partitioned parent, Postgres builds it on every partition
+    op.execute("""
+        CREATE INDEX ix_audit_logs_org_timestamp_id
+        ON audit_logs (organization_id, timestamp DESC, id DESC)
+    """)
+    # Leading column of the new index, no longer needed on its own
+    op.drop_index('ix_audit_logs_organization_id', table_name='audit_logs')
+
+
+def downgrade() -> None:
+    op.create_index('ix_audit_logs_organization_id', 'audit_logs', ['organization_id'], unique=False)
+    op.drop_index('ix_audit_logs_org_timestamp_id', table_name='audit_logs')
@@ -0,0 +1,43 @@
+"""Keyset pagination and trigram search indexes for users
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-17 14:00:00
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '004'
+down_revision = '003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Enabled by docker/init-db.sql, but not every database is created from it
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    # CONCURRENTLY keeps users writable while the indexes build, it cannot run
+    # inside the migration transaction
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_users_org_created_at_id', 'users', ['organization_id', 'created_at', 'id'],
+            unique=False, postgresql_concurrently=True
+        )
+        # Leading column of the new index, no longer needed on its own
+        op.drop_index('ix_users_organization_id', table_name='users', postgresql_concurrently=True)
+
+        op.execute("CREATE INDEX CONCURRENTLY ix_users_email_trgm ON users USING gin (email gin_trgm_ops)")
+        op.execute("CREATE INDEX CONCURRENTLY ix_users_full_name_trgm ON users USING gin (full_name gin_trgm_ops)")
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_users_full_name_trgm', table_name='users', postgresql_concurrently=True)
+        op.drop_index('ix_users_email_trgm', table_name='users', postgresql_concurrently=True)
+        op.create_index(
+            'ix_users_organization_id', 'users', ['organization_id'],
+            unique=False, postgresql_concurrently=True
+        )
+        op.drop_index('ix_users_org_created_at_id', table_name='users', postgresql_concurrently=True)
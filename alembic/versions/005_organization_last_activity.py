@@ -0,0 +1,38 @@
+"""Organization last activity
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-17 18:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '005'
+down_revision = '004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('organizations', sa.Column('last_activity_at', sa.DateTime(), nullable=True))
+    # Best known activity so far, so the first sweep doesn't deactivate
+    # organizations that were used but never tracked
+    op.execute("""
+        UPDATE organizations SET last_activity_at = GREATEST(
+            created_at,
+            updated_at,
+            (SELECT max(last_login) FROM users WHERE users.organization_id = organizations.id)
+        )
+    """)
+    op.alter_column('organizations', 'last_activity_at', nullable=False)
+    op.create_index(
+        'ix_organizations_active_last_activity_at', 'organizations', ['last_activity_at'],
+        unique=False, postgresql_where=sa.text('is_active')
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_organizations_active_last_activity_at', table_name='organizations')
+    op.drop_column('organizations', 'last_activity_at')
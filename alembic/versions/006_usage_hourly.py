@@ -0,0 +1,40 @@
+"""Hourly usage rollup table
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-17 20:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '006'
+down_revision = '005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'usage_hourly',
+        sa.Column('organization_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('hour', sa.DateTime(), nullable=False),
+        sa.Column('method', sa.String(length=10), nullable=False),
+        sa.Column('route', sa.String(length=255), nullable=False),
+        sa.Column('request_count', sa.BigInteger(), nullable=False),
+        sa.ForeignKeyConstraint(['organization_id'], ['organizations.id'], ),
+        sa.PrimaryKeyConstraint('organization_id', 'hour', 'method', 'route')
+    )
+    op.execute("ALTER TABLE usage_hourly ENABLE ROW LEVEL SECURITY")
+    op.execute("""
+        CREATE POLICY usage_hourly_isolation_policy ON usage_hourly
+        FOR ALL
+        USING (organization_id = current_setting('app.current_organization_id', TRUE)::uuid)
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP POLICY IF EXISTS usage_hourly_isolation_policy ON usage_hourly")
+    op.drop_table('usage_hourly')
@@ -0,0 +1,38 @@
+"""Unique user emails
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-17 22:00:00
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '007'
+down_revision = '006'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Login looks users up by email alone, so emails must be unique across
+    # organizations. Existing duplicates make the build fail and have to be
+    # resolved first, the invalid index is dropped again on the next attempt
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_users_email_unique")
+        op.create_index(
+            'ix_users_email_unique', 'users', ['email'],
+            unique=True, postgresql_concurrently=True
+        )
+        op.drop_index('ix_users_email', table_name='users', postgresql_concurrently=True)
+        op.execute("ALTER INDEX ix_users_email_unique RENAME TO ix_users_email")
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_users_email_nonunique', 'users', ['email'],
+            unique=False, postgresql_concurrently=True
+        )
+        op.drop_index('ix_users_email', table_name='users', postgresql_concurrently=True)
+        op.execute("ALTER INDEX ix_users_email_nonunique RENAME TO ix_users_email")
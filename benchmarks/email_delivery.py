@@ -0,0 +1,72 @@
+"""
+Benchmark: email delivery throughput
+
+Sends the same batch to a local aiosmtpd server:
+  - one SMTP connection per message, like the old one-task-per-email setup
+  - EmailDispatcher.send_batch over the pooled persistent connection
+Rate shaping is disabled, so the numbers show what one worker can push
+before the provider's limit applies.
+
+Usage: python -m benchmarks.email_delivery [--messages 2000]
+"""
+import argparse
+import socket
+import time
+
+from aiosmtpd.controller import Controller
+
+from src.services.email import EmailDispatcher, RateShaper, SMTPConnectionPool
+
+
+class SinkHandler:
+    async def handle_DATA(self, server, session, envelope):
+        return "250 Message accepted"
+
+
+def build_items(count: int) -> list:
+    return [
+        {
+            "id": str(i),
+            "template": "welcome",
+            "to": f"user{i}@example.com",
+            "context": {"organization_name": "Acme"},
+            "attempts": 0,
+        }
+        for i in range(count)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=2000)
+    args = parser.parse_args()
+
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    controller = Controller(SinkHandler(), hostname="127.0.0.1", port=port)
+    controller.start()
+
+    items = build_items(args.messages)
+    results = {}
+    try:
+        for name, per_connection in [("connection/message", 1), ("pooled", args.messages)]:
+            pool = SMTPConnectionPool(
+                host="127.0.0.1", port=port, user="", starttls=False, messages_per_connection=per_connection
+            )
+            dispatcher = EmailDispatcher(outbox=None, pool=pool, shaper=RateShaper(0), batch_size=args.messages)
+            start = time.perf_counter()
+            result = dispatcher.send_batch(items)
+            elapsed = time.perf_counter() - start
+            pool.close()
+            assert len(result.sent) == args.messages
+            results[name] = elapsed
+            print(f"{name:>18}: {args.messages / elapsed * 60:,.0f} emails/minute")
+    finally:
+        controller.stop()
+
+    print(f"{'speedup':>18}: {results['connection/message'] / results['pooled']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
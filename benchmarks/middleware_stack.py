@@ -0,0 +1,136 @@
+"""
+Benchmark: BaseHTTPMiddleware stack vs pure ASGI middleware stack
+
+Builds two minimal apps with the tenant, rate-limit and audit middleware in
+the same order as src/main.py and times authenticated GET requests through
+each. Redis and the database are left out (rate limiting off, GETs are not
+audited) so the numbers isolate the per-request cost of the middleware layers.
+
+Usage: python -m benchmarks.middleware_stack [--requests 5000] [--concurrency 50]
+"""
+import argparse
+import asyncio
+import time
+
+import httpx
+from fastapi import FastAPI, HTTPException, Request
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from src.core.config import settings
+from src.core.security import create_access_token, decode_token
+from src.middleware.audit_logger import AuditLoggerMiddleware
+from src.middleware.rate_limiter import RateLimiterMiddleware
+from src.middleware.tenant_context import TenantContextMiddleware
+
+
+class LegacyTenantContextMiddleware(BaseHTTPMiddleware):
+    """Previous BaseHTTPMiddleware implementation"""
+
+    async def dispatch(self, request: Request, call_next):
+        public_paths = ["/", "/health", "/docs", "/redoc", "/openapi.json", "/api/v1/auth/register", "/api/v1/auth/login"]
+        if request.url.path in public_paths or request.url.path.startswith("/api/v1/subscriptions/webhook"):
+            return await call_next(request)
+
+        auth_header = request.headers.get("Authorization")
+        if auth_header and auth_header.startswith("Bearer "):
+            token = auth_header.replace("Bearer ", "")
+            try:
+                payload = decode_token(token)
+                if payload.get("organization_id"):
+                    request.state.organization_id = payload.get("organization_id")
+                    request.state.user_id = payload.get("sub")
+            except HTTPException:
+                pass
+
+        return await call_next(request)
+
+
+class LegacyRateLimiterMiddleware(BaseHTTPMiddleware):
+    """Previous BaseHTTPMiddleware implementation (rate limiting disabled)"""
+
+    async def dispatch(self, request: Request, call_next):
+        if not settings.RATE_LIMIT_ENABLED:
+            return await call_next(request)
+        return await call_next(request)
+
+
+class LegacyAuditLoggerMiddleware(BaseHTTPMiddleware):
+    """Previous BaseHTTPMiddleware implementation (GETs are never written)"""
+
+    async def dispatch(self, request: Request, call_next):
+        if not settings.ENABLE_AUDIT_LOGS:
+            return await call_next(request)
+        skip_paths = ["/health", "/docs", "/redoc", "/openapi.json"]
+        if request.url.path in skip_paths:
+            return await call_next(request)
+
+        organization_id = getattr(request.state, "organization_id", None)
+        response = await call_next(request)
+        if organization_id and request.method != "GET":
+            pass
+        return response
+
+
+def build_app(tenant, rate_limiter, audit_logger) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/api/v1/ping")
+    async def ping():
+        return {"status": "ok"}
+
+    app.add_middleware(audit_logger)
+    app.add_middleware(rate_limiter)
+    app.add_middleware(tenant)
+    return app
+
+
+async def run(app: FastAPI, headers: dict, requests: int, concurrency: int) -> float:
+    transport = httpx.ASGITransport(app=app)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def one():
+            async with semaphore:
+                response = await client.get("/api/v1/ping", headers=headers)
+                assert response.status_code == 200
+
+        # Warm up
+        await asyncio.gather(*(one() for _ in range(min(requests, 200))))
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(requests)))
+        return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+
+    settings.RATE_LIMIT_ENABLED = False
+    settings.ENABLE_AUDIT_LOGS = True
+
+    token = create_access_token({"sub": "bench-user", "organization_id": "bench-org", "role": "admin"})
+    headers = {"Authorization": f"Bearer {token}"}
+
+    stacks = {
+        "BaseHTTPMiddleware": build_app(
+            LegacyTenantContextMiddleware, LegacyRateLimiterMiddleware, LegacyAuditLoggerMiddleware
+        ),
+        "pure ASGI": build_app(TenantContextMiddleware, RateLimiterMiddleware, AuditLoggerMiddleware),
+    }
+
+    results = {}
+    for name, app in stacks.items():
+        elapsed = asyncio.run(run(app, headers, args.requests, args.concurrency))
+        results[name] = elapsed
+        print(f"{name:>20}: {elapsed:.3f}s total, {elapsed / args.requests * 1e6:.1f} us/request, "
+              f"{args.requests / elapsed:.0f} req/s")
+
+    saving = 1 - results["pure ASGI"] / results["BaseHTTPMiddleware"]
+    print(f"{'saving':>20}: {saving:.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Benchmark: list response serialization
+
+Times GET requests to three versions of a user list endpoint returning the
+same rows:
+  - ORM objects through response_model with the stdlib JSONResponse (before)
+  - ORM objects through response_model with ORJSONResponse
+  - row mappings through the precompiled ListSerializer (src/schemas/adapters.py)
+The database is left out, rows are built once up front, so the numbers
+isolate validation and JSON encoding. Hydrating ORM objects from a result
+set costs extra on top of the "before" numbers.
+
+Usage: python -m benchmarks.serialization [--rows 1000] [--requests 200]
+"""
+import argparse
+import asyncio
+import time
+import uuid
+from datetime import datetime
+
+import httpx
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse, ORJSONResponse
+
+from src.api.users import LIST_COLUMNS
+from src.models.base import User, UserRole
+from src.schemas import UserListResponse
+from src.schemas.adapters import user_list_serializer
+
+
+def build_rows(count: int) -> list:
+    organization_id = uuid.uuid4()
+    now = datetime.utcnow()
+    return [
+        {
+            "id": uuid.uuid4(),
+            "organization_id": organization_id,
+            "email": f"user{i}@example.com",
+            "full_name": f"User {i}",
+            "role": UserRole.MEMBER,
+            "is_active": True,
+            "created_at": now,
+            "last_login": now if i % 2 else None,
+        }
+        for i in range(count)
+    ]
+
+
+def build_app(rows: list) -> FastAPI:
+    app = FastAPI()
+    users = [User(**row) for row in rows]
+    assert list(rows[0]) == [column.key for column in LIST_COLUMNS]
+
+    @app.get("/orm-json", response_model=UserListResponse, response_class=JSONResponse)
+    async def orm_json():
+        return UserListResponse(items=users, next_cursor=None)
+
+    @app.get("/orm-orjson", response_model=UserListResponse, response_class=ORJSONResponse)
+    async def orm_orjson():
+        return UserListResponse(items=users, next_cursor=None)
+
+    @app.get("/rows-serializer", response_model=UserListResponse)
+    async def rows_serializer():
+        return user_list_serializer.response(rows)
+
+    return app
+
+
+async def run(app: FastAPI, path: str, requests: int) -> float:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        # Warm up
+        for _ in range(min(requests, 10)):
+            assert (await client.get(path)).status_code == 200
+
+        start = time.perf_counter()
+        for _ in range(requests):
+            await client.get(path)
+        return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    rows = build_rows(args.rows)
+    app = build_app(rows)
+
+    # Every variant has to produce the same document
+    async def bodies():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            return [(await client.get(path)).json() for path in ("/orm-json", "/orm-orjson", "/rows-serializer")]
+    first, *others = asyncio.run(bodies())
+    assert all(body == first for body in others)
+
+    results = {}
+    for name, path in [("ORM + json", "/orm-json"), ("ORM + orjson", "/orm-orjson"), ("rows + serializer", "/rows-serializer")]:
+        elapsed = asyncio.run(run(app, path, args.requests))
+        results[name] = elapsed
+        per_request = elapsed / args.requests
+        print(f"{name:>18}: {per_request * 1e3:.2f} ms/request, {per_request / args.rows * 1e6:.2f} us/row")
+
+    saving = 1 - results["rows + serializer"] / results["ORM + json"]
+    print(f"{'saving':>18}: {saving:.1%}")
+
+
+if __name__ == "__main__":
+    main()
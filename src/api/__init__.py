@@ -1,4 +1,4 @@
 # API package
-from src.api import auth, organizations, users, subscriptions, audit_logs
+from src.api import auth, organizations, users, subscriptions, audit_logs, usage
 
-__all__ = ["auth", "organizations", "users", "subscriptions", "audit_logs"]
+__all__ = ["auth", "organizations", "users", "subscriptions", "audit_logs", "usage"]
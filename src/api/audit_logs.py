@@ -1,29 +1,69 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from typing import List, Optional
-from datetime import datetime, timedelta
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from typing import AsyncIterator, Optional
+from datetime import datetime
+import csv
+import io
+import json
 
-from src.database.session import get_db, set_tenant_context
+from src.database.session import get_tenant_db, get_session_factory, tenant_session
 from src.core.security import get_current_user_token
+from src.core.pagination import encode_cursor, decode_timestamp_cursor
+from src.core.timestamps import naive_utc
 from src.models.base import AuditLog
-from src.schemas import AuditLogResponse
+from src.schemas import AuditLogListResponse
+from src.schemas.adapters import audit_log_list_serializer
 
 router = APIRouter()
 
+# Columns of AuditLogResponse, used for exports and to build list pages from row tuples
+EXPORT_COLUMNS = [
+    AuditLog.id, AuditLog.organization_id, AuditLog.user_id, AuditLog.action,
+    AuditLog.resource_type, AuditLog.resource_id, AuditLog.details,
+    AuditLog.ip_address, AuditLog.timestamp
+]
+EXPORT_CHUNK_SIZE = 1000
+# One asyncpg fetch, gets the first rows out without waiting for a whole chunk
+EXPORT_FIRST_CHUNK_SIZE = 50
+EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
 
-@router.get("/", response_model=List[AuditLogResponse])
+
+def _apply_filters(query, organization_id, action, resource_type, start_date, end_date):
+    """Filters shared by the list and export endpoints"""
+    query = query.where(AuditLog.organization_id == organization_id)
+    
+    if action:
+        query = query.where(AuditLog.action == action)
+    
+    if resource_type:
+        query = query.where(AuditLog.resource_type == resource_type)
+    
+    # Query strings may carry an offset, the column is naive UTC
+    if start_date:
+        query = query.where(AuditLog.timestamp >= naive_utc(start_date))
+    
+    if end_date:
+        query = query.where(AuditLog.timestamp <= naive_utc(end_date))
+    
+    return query
+
+
+@router.get("/", response_model=AuditLogListResponse)
 async def list_audit_logs(
     action: Optional[str] = Query(None, description="Filter by action"),
     resource_type: Optional[str] = Query(None, description="Filter by resource type"),
     start_date: Optional[datetime] = Query(None, description="Start date for filtering"),
     end_date: Optional[datetime] = Query(None, description="End date for filtering"),
     limit: int = Query(100, ge=1, le=1000, description="Number of records to return"),
-    offset: int = Query(0, ge=0, description="Number of records to skip"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
     current_user: dict = Depends(get_current_user_token),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_tenant_db)
 ):
     """
     Query audit logs for the organization (admin only)
+    Keyset paginated newest first, follow next_cursor for older entries
     """
     if current_user.get("role") != "admin":
         raise HTTPException(
@@ -32,27 +72,99 @@ async def list_audit_logs(
         )
     
     organization_id = current_user.get("organization_id")
-    set_tenant_context(db, organization_id)
     
     # Build query
-    query = db.query(AuditLog).filter(AuditLog.organization_id == organization_id)
+    query = _apply_filters(select(*EXPORT_COLUMNS), organization_id, action, resource_type, start_date, end_date)
     
-    if action:
-        query = query.filter(AuditLog.action == action)
+    # Resume strictly after the last row of the previous page
+    if cursor:
+        after = decode_timestamp_cursor(cursor)
+        query = query.where(tuple_(AuditLog.timestamp, AuditLog.id) < after)
     
-    if resource_type:
-        query = query.filter(AuditLog.resource_type == resource_type)
+    # Newest first, id breaks ties between rows with the same timestamp
+    query = query.order_by(AuditLog.timestamp.desc(), AuditLog.id.desc())
     
-    if start_date:
-        query = query.filter(AuditLog.timestamp >= start_date)
+    # Fetch one extra row to know whether another page exists
+    rows = (await db.execute(query.limit(limit + 1))).all()
     
-    if end_date:
-        query = query.filter(AuditLog.timestamp <= end_date)
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].timestamp, rows[-1].id)
     
-    # Order by timestamp descending (newest first)
-    query = query.order_by(AuditLog.timestamp.desc())
+    return audit_log_list_serializer.response((row._mapping for row in rows), next_cursor)
+
+
+def _format_value(value):
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+async def _stream_export(
+    session_factory: async_sessionmaker, organization_id: str, query, export_format: str
+) -> AsyncIterator[str]:
+    """
+    Stream rows through a server-side cursor, one chunk at a time
+    The first chunk is small so the response starts as soon as rows arrive,
+    it runs in its own session because request dependencies are closed
+    before a StreamingResponse starts sending
+    """
+    names = [column.key for column in EXPORT_COLUMNS]
+    
+    if export_format == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(names)
+        # Header goes out before the query even runs
+        yield buffer.getvalue()
     
-    # Apply pagination
-    logs = query.offset(offset).limit(limit).all()
+    async with tenant_session(organization_id, session_factory) as db:
+        result = await db.stream(query.execution_options(yield_per=EXPORT_CHUNK_SIZE))
+        size = EXPORT_FIRST_CHUNK_SIZE
+        while rows := await result.fetchmany(size):
+            size = EXPORT_CHUNK_SIZE
+            if export_format == "csv":
+                buffer.seek(0)
+                buffer.truncate()
+                writer.writerows([[_format_value(v) for v in row] for row in rows])
+                yield buffer.getvalue()
+            else:
+                yield "".join(
+                    json.dumps({name: _format_value(v) for name, v in zip(names, row)}) + "\n"
+                    for row in rows
+                )
+
+
+@router.get("/export")
+async def export_audit_logs(
+    export_format: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$", description="ndjson or csv"),
+    action: Optional[str] = Query(None, description="Filter by action"),
+    resource_type: Optional[str] = Query(None, description="Filter by resource type"),
+    start_date: Optional[datetime] = Query(None, description="Start date for filtering"),
+    end_date: Optional[datetime] = Query(None, description="End date for filtering"),
+    current_user: dict = Depends(get_current_user_token),
+    session_factory: async_sessionmaker = Depends(get_session_factory)
+):
+    """
+    Export audit logs for the organization as NDJSON or CSV (admin only)
+    Streamed oldest first with constant memory regardless of the number of rows
+    """
+    if current_user.get("role") != "admin":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only admins can export audit logs"
+        )
+    
+    organization_id = current_user.get("organization_id")
+    query = _apply_filters(
+        select(*EXPORT_COLUMNS), organization_id, action, resource_type, start_date, end_date
+    ).order_by(AuditLog.timestamp, AuditLog.id)
     
-    return logs
+    return StreamingResponse(
+        _stream_export(session_factory, organization_id, query, export_format),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="audit-logs.{export_format}"'}
+    )
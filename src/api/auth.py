@@ -1,11 +1,13 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import timedelta
 
 from src.database.session import get_db
-from src.core.security import verify_password, get_password_hash, create_access_token, create_refresh_token, decode_token
+from src.core.security import verify_password_async, get_password_hash_async, create_access_token, create_refresh_token, decode_token
 from src.core.config import settings
 from src.models.base import Organization, User, UserRole
+from src.services.last_login import last_login_recorder
 from src.schemas import (
     RegisterRequest, LoginRequest, TokenResponse, 
     RefreshTokenRequest, MessageResponse
@@ -15,7 +17,7 @@ router = APIRouter()
 
 
 @router.post("/register", response_model=TokenResponse, status_code=status.HTTP_201_CREATED)
-async def register(request: RegisterRequest, db: Session = Depends(get_db)):
+async def register(request: RegisterRequest, db: AsyncSession = Depends(get_db)):
     """
     Register a new organization and admin user
     """
@@ -25,8 +27,14 @@ async def register(request: RegisterRequest, db: Session = Depends(get_db)):
             detail="Signup is currently disabled"
         )
     
+    # Hash before the first query, the session takes its pooled connection
+    # lazily and must not hold it (or the new rows' locks) while bcrypt runs
+    hashed_password = await get_password_hash_async(request.password)
+    
     # Check if organization slug already exists
-    existing_org = db.query(Organization).filter(Organization.slug == request.organization_slug).first()
+    existing_org = (await db.execute(
+        select(Organization).where(Organization.slug == request.organization_slug)
+    )).scalars().first()
     if existing_org:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -34,7 +42,7 @@ async def register(request: RegisterRequest, db: Session = Depends(get_db)):
         )
     
     # Check if email already exists
-    existing_user = db.query(User).filter(User.email == request.email).first()
+    existing_user = (await db.execute(select(User).where(User.email == request.email))).scalars().first()
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -47,19 +55,19 @@ async def register(request: RegisterRequest, db: Session = Depends(get_db)):
         slug=request.organization_slug
     )
     db.add(organization)
-    db.flush()  # Get the ID without committing
+    await db.flush()  # Get the ID without committing
     
     # Create admin user
     user = User(
         organization_id=organization.id,
         email=request.email,
-        hashed_password=get_password_hash(request.password),
+        hashed_password=hashed_password,
         full_name=request.full_name,
         role=UserRole.ADMIN
     )
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
     
     # Generate tokens
     token_data = {
@@ -80,14 +88,19 @@ async def register(request: RegisterRequest, db: Session = Depends(get_db)):
 
 
 @router.post("/login", response_model=TokenResponse)
-async def login(request: LoginRequest, db: Session = Depends(get_db)):
+async def login(request: LoginRequest, db: AsyncSession = Depends(get_db)):
     """
     Login with email and password
     """
-    # Find user by email
-    user = db.query(User).filter(User.email == request.email).first()
+    # Find user by email, with the organization in the same round trip
+    row = (await db.execute(
+        select(User, Organization)
+        .join(Organization, Organization.id == User.organization_id)
+        .where(User.email == request.email)
+    )).first()
+    user, organization = row if row else (None, None)
     
-    if not user or not verify_password(request.password, user.hashed_password):
+    if not user or not await verify_password_async(request.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password"
@@ -100,8 +113,7 @@ async def login(request: LoginRequest, db: Session = Depends(get_db)):
         )
     
     # Check organization is active
-    organization = db.query(Organization).filter(Organization.id == user.organization_id).first()
-    if not organization or not organization.is_active:
+    if not organization.is_active:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Organization is disabled"
@@ -118,10 +130,8 @@ async def login(request: LoginRequest, db: Session = Depends(get_db)):
     access_token = create_access_token(token_data)
     refresh_token = create_refresh_token({"sub": str(user.id)})
     
-    # Update last login
-    from datetime import datetime
-    user.last_login = datetime.utcnow()
-    db.commit()
+    # Update last login, written in bulk off the request path
+    last_login_recorder.record(user.id)
     
     return TokenResponse(
         access_token=access_token,
@@ -131,7 +141,7 @@ async def login(request: LoginRequest, db: Session = Depends(get_db)):
 
 
 @router.post("/refresh", response_model=TokenResponse)
-async def refresh_token(request: RefreshTokenRequest, db: Session = Depends(get_db)):
+async def refresh_token(request: RefreshTokenRequest, db: AsyncSession = Depends(get_db)):
     """
     Refresh access token using refresh token
     """
@@ -145,7 +155,7 @@ async def refresh_token(request: RefreshTokenRequest, db: Session = Depends(get_
             )
         
         user_id = payload.get("sub")
-        user = db.query(User).filter(User.id == user_id).first()
+        user = (await db.execute(select(User).where(User.id == user_id))).scalars().first()
         
         if not user or not user.is_active:
             raise HTTPException(
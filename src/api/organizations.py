@@ -1,9 +1,12 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.database.session import get_db, set_tenant_context
+from src.database.session import get_tenant_db
 from src.core.security import get_current_user_token
 from src.models.base import Organization
+from src.services.tenant_cache import tenant_cache
+from src.services.tier_cache import tier_cache
 from src.schemas import OrganizationResponse, OrganizationUpdate, MessageResponse
 
 router = APIRouter()
@@ -12,14 +15,19 @@ router = APIRouter()
 @router.get("/me", response_model=OrganizationResponse)
 async def get_current_organization(
     current_user: dict = Depends(get_current_user_token),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_tenant_db)
 ):
     """
     Get current user's organization
     """
     organization_id = current_user.get("organization_id")
     
-    organization = db.query(Organization).filter(Organization.id == organization_id).first()
+    async def load():
+        return (await db.execute(
+            select(Organization).where(Organization.id == organization_id)
+        )).scalars().first()
+    
+    organization = await tenant_cache.get(organization_id, "organization", OrganizationResponse, load)
     
     if not organization:
         raise HTTPException(
@@ -34,7 +42,7 @@ async def get_current_organization(
 async def update_current_organization(
     update_data: OrganizationUpdate,
     current_user: dict = Depends(get_current_user_token),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_tenant_db)
 ):
     """
     Update current organization (admin only)
@@ -47,7 +55,9 @@ async def update_current_organization(
         )
     
     organization_id = current_user.get("organization_id")
-    organization = db.query(Organization).filter(Organization.id == organization_id).first()
+    organization = (await db.execute(
+        select(Organization).where(Organization.id == organization_id)
+    )).scalars().first()
     
     if not organization:
         raise HTTPException(
@@ -59,7 +69,9 @@ async def update_current_organization(
     if update_data.name is not None:
         organization.name = update_data.name
     
-    db.commit()
-    db.refresh(organization)
+    await db.commit()
+    await db.refresh(organization)
+    await tier_cache.invalidate(organization.id)
+    await tenant_cache.invalidate(organization.id)
     
     return organization
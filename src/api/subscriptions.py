@@ -1,11 +1,14 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Request, Header
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 import stripe
 
-from src.database.session import get_db
+from src.database.session import get_db, get_tenant_db
 from src.core.security import get_current_user_token
 from src.core.config import settings
 from src.models.base import Organization, SubscriptionTier
+from src.services.tenant_cache import tenant_cache
+from src.services.tier_cache import tier_cache
 from src.schemas import (
     SubscriptionResponse, CreateCheckoutSessionRequest,
     CreateCheckoutSessionResponse, MessageResponse
@@ -20,34 +23,42 @@ stripe.api_key = settings.STRIPE_SECRET_KEY
 @router.get("/current", response_model=SubscriptionResponse)
 async def get_current_subscription(
     current_user: dict = Depends(get_current_user_token),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_tenant_db)
 ):
     """
     Get current organization's subscription details
     """
     organization_id = current_user.get("organization_id")
     
-    organization = db.query(Organization).filter(Organization.id == organization_id).first()
+    async def load():
+        organization = (await db.execute(
+            select(Organization).where(Organization.id == organization_id)
+        )).scalars().first()
+        if not organization:
+            return None
+        return SubscriptionResponse(
+            tier=organization.subscription_tier,
+            status=organization.subscription_status,
+            stripe_customer_id=organization.stripe_customer_id,
+            stripe_subscription_id=organization.stripe_subscription_id
+        )
     
-    if not organization:
+    subscription = await tenant_cache.get(organization_id, "subscription", SubscriptionResponse, load)
+    
+    if not subscription:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Organization not found"
         )
     
-    return SubscriptionResponse(
-        tier=organization.subscription_tier,
-        status=organization.subscription_status,
-        stripe_customer_id=organization.stripe_customer_id,
-        stripe_subscription_id=organization.stripe_subscription_id
-    )
+    return subscription
 
 
 @router.post("/create-checkout", response_model=CreateCheckoutSessionResponse)
 async def create_checkout_session(
     request: CreateCheckoutSessionRequest,
     current_user: dict = Depends(get_current_user_token),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_tenant_db)
 ):
     """
     Create Stripe checkout session for subscription upgrade
@@ -59,7 +70,9 @@ async def create_checkout_session(
         )
     
     organization_id = current_user.get("organization_id")
-    organization = db.query(Organization).filter(Organization.id == organization_id).first()
+    organization = (await db.execute(
+        select(Organization).where(Organization.id == organization_id)
+    )).scalars().first()
     
     if not organization:
         raise HTTPException(
@@ -90,7 +103,8 @@ async def create_checkout_session(
                 }
             )
             organization.stripe_customer_id = customer.id
-            db.commit()
+            await db.commit()
+            await tenant_cache.invalidate(organization_id)
         
         # Create checkout session
         checkout_session = stripe.checkout.Session.create(
@@ -125,7 +139,7 @@ async def create_checkout_session(
 async def stripe_webhook(
     request: Request,
     stripe_signature: str = Header(None, alias="stripe-signature"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Handle Stripe webhook events
@@ -151,12 +165,16 @@ async def stripe_webhook(
         tier = session["metadata"]["tier"]
         
         # Update organization subscription
-        organization = db.query(Organization).filter(Organization.id == organization_id).first()
+        organization = (await db.execute(
+            select(Organization).where(Organization.id == organization_id)
+        )).scalars().first()
         if organization:
             organization.subscription_tier = SubscriptionTier(tier)
             organization.subscription_status = "active"
             organization.stripe_subscription_id = session.get("subscription")
-            db.commit()
+            await db.commit()
+            await tier_cache.invalidate(organization.id)
+            await tenant_cache.invalidate(organization.id)
     
     elif event["type"] == "customer.subscription.updated":
         subscription = event["data"]["object"]
@@ -167,13 +185,15 @@ async def stripe_webhook(
         subscription = event["data"]["object"]
         # Handle subscription cancellation
         # Find org by stripe_subscription_id and downgrade to free
-        organization = db.query(Organization).filter(
-            Organization.stripe_subscription_id == subscription["id"]
-        ).first()
+        organization = (await db.execute(
+            select(Organization).where(Organization.stripe_subscription_id == subscription["id"])
+        )).scalars().first()
         
         if organization:
             organization.subscription_tier = SubscriptionTier.FREE
             organization.subscription_status = "canceled"
-            db.commit()
+            await db.commit()
+            await tier_cache.invalidate(organization.id)
+            await tenant_cache.invalidate(organization.id)
     
     return MessageResponse(message="Webhook processed")
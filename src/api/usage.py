@@ -0,0 +1,73 @@
+from datetime import datetime, timedelta
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import BigInteger, cast, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.config import settings
+from src.core.security import get_current_user_token
+from src.core.timestamps import naive_utc
+from src.database.session import get_tenant_db
+from src.models.base import UsageHourly
+from src.schemas import UsageBucket, UsageResponse
+
+router = APIRouter()
+
+
+@router.get("", response_model=UsageResponse)
+async def get_usage(
+    start: Optional[datetime] = Query(None, description="Defaults to 24 hours before end"),
+    end: Optional[datetime] = Query(None, description="Defaults to now"),
+    granularity: str = Query("hour", pattern="^(hour|day|month)$", description="Bucket size"),
+    by_route: bool = Query(False, description="Split buckets by method and route"),
+    current_user: dict = Depends(get_current_user_token),
+    db: AsyncSession = Depends(get_tenant_db)
+):
+    """
+    Request counts for the organization (admin only)
+    Served from the hourly rollup, the latest requests show up after the next
+    rollup run (USAGE_ROLLUP_INTERVAL)
+    """
+    if current_user.get("role") != "admin":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only admins can view usage"
+        )
+
+    end = naive_utc(end) if end else datetime.utcnow()
+    start = naive_utc(start) if start else end - timedelta(hours=24)
+    if start >= end:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="start must be before end"
+        )
+    if end - start > timedelta(days=settings.USAGE_MAX_RANGE_DAYS):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Range is limited to {settings.USAGE_MAX_RANGE_DAYS} days"
+        )
+
+    period = func.date_trunc(granularity, UsageHourly.hour).label("period")
+    group_by = [period, UsageHourly.method, UsageHourly.route] if by_route else [period]
+    query = (
+        select(*group_by, cast(func.sum(UsageHourly.request_count), BigInteger).label("request_count"))
+        # Hours that started inside the range, served by the primary key
+        .where(
+            UsageHourly.organization_id == current_user.get("organization_id"),
+            UsageHourly.hour >= start.replace(minute=0, second=0, microsecond=0),
+            UsageHourly.hour < end
+        )
+        .group_by(*group_by)
+        .order_by(*group_by)
+    )
+    rows = (await db.execute(query)).all()
+
+    items = [UsageBucket(**row._mapping) for row in rows]
+    return UsageResponse(
+        start=start,
+        end=end,
+        granularity=granularity,
+        total_requests=sum(item.request_count for item in items),
+        items=items
+    )
@@ -1,31 +1,48 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Request
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, File, HTTPException, Query, status, Request, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import any_, bindparam, delete, or_, select, tuple_, update
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as PG_UUID
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
 from uuid import UUID
 
-from src.database.session import get_db, set_tenant_context
-from src.core.security import get_current_user_token, get_password_hash
+from src.database.session import get_tenant_db
+from src.core.config import settings
+from src.core.security import get_current_user_token, get_password_hash_async
+from src.core.pagination import encode_cursor, decode_timestamp_cursor
 from src.models.base import User, UserRole
-from src.schemas import UserResponse, UserCreate, UserUpdate, MessageResponse
+from src.services.tenant_cache import tenant_cache
+from src.services.user_import import detect_import_format, import_users, read_import_records
+from src.schemas import (
+    UserResponse, UserListResponse, UserCreate, UserUpdate, UserImportResponse, MessageResponse,
+    UserBatchRequest, UserBatchResponse, UserBatchResult
+)
+from src.schemas.adapters import user_list_serializer
 
 router = APIRouter()
 
+# Columns of UserResponse, lists are built from row tuples instead of ORM objects
+LIST_COLUMNS = [
+    User.id, User.organization_id, User.email, User.full_name, User.role,
+    User.is_active, User.created_at, User.last_login
+]
+
 
 @router.get("/me", response_model=UserResponse)
 async def get_current_user(
     current_user: dict = Depends(get_current_user_token),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_tenant_db)
 ):
     """
     Get current user profile
     """
     user_id = current_user.get("sub")
-    organization_id = current_user.get("organization_id")
     
-    # Set tenant context for RLS
-    set_tenant_context(db, organization_id)
+    async def load():
+        return (await db.execute(select(User).where(User.id == user_id))).scalars().first()
     
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await tenant_cache.get(current_user.get("organization_id"), f"user:{user_id}", UserResponse, load)
     
     if not user:
         raise HTTPException(
@@ -36,13 +53,19 @@ async def get_current_user(
     return user
 
 
-@router.get("/", response_model=List[UserResponse])
+@router.get("/", response_model=UserListResponse)
 async def list_users(
+    role: Optional[UserRole] = Query(None, description="Filter by role"),
+    is_active: Optional[bool] = Query(None, description="Filter by active status"),
+    search: Optional[str] = Query(None, min_length=1, max_length=255, description="Part of the email or full name"),
+    limit: int = Query(100, ge=1, le=1000, description="Number of users to return"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
     current_user: dict = Depends(get_current_user_token),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_tenant_db)
 ):
     """
-    List all users in the organization (admin only)
+    List users in the organization (admin only)
+    Keyset paginated oldest first, follow next_cursor for the next page
     """
     if current_user.get("role") != "admin":
         raise HTTPException(
@@ -52,19 +75,44 @@ async def list_users(
     
     organization_id = current_user.get("organization_id")
     
-    # Set tenant context
-    set_tenant_context(db, organization_id)
+    query = select(*LIST_COLUMNS).where(User.organization_id == organization_id)
+    
+    if role is not None:
+        query = query.where(User.role == role)
+    
+    if is_active is not None:
+        query = query.where(User.is_active == is_active)
+    
+    if search:
+        # ILIKE '%...%', served by the trigram indexes on email and full_name
+        query = query.where(or_(
+            User.email.icontains(search, autoescape=True),
+            User.full_name.icontains(search, autoescape=True)
+        ))
+    
+    # Resume strictly after the last row of the previous page
+    if cursor:
+        after = decode_timestamp_cursor(cursor)
+        query = query.where(tuple_(User.created_at, User.id) > after)
+    
+    query = query.order_by(User.created_at, User.id)
+    
+    # Fetch one extra row to know whether another page exists
+    rows = (await db.execute(query.limit(limit + 1))).all()
     
-    users = db.query(User).filter(User.organization_id == organization_id).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
     
-    return users
+    return user_list_serializer.response((row._mapping for row in rows), next_cursor)
 
 
 @router.post("/", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
 async def create_user(
     user_data: UserCreate,
     current_user: dict = Depends(get_current_user_token),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_tenant_db)
 ):
     """
     Create a new user in the organization (admin only)
@@ -77,36 +125,154 @@ async def create_user(
     
     organization_id = current_user.get("organization_id")
     
-    # Check if email already exists
-    existing_user = db.query(User).filter(User.email == user_data.email).first()
-    if existing_user:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Email already registered"
-        )
+    # Hash before the first query so no pooled connection is held while bcrypt runs
+    hashed_password = await get_password_hash_async(user_data.password)
     
-    # Create user
+    # Create user, a taken email is caught by the unique index rather than a
+    # pre-check, which RLS would limit to this organization's users
     user = User(
         organization_id=organization_id,
         email=user_data.email,
-        hashed_password=get_password_hash(user_data.password),
+        hashed_password=hashed_password,
         full_name=user_data.full_name,
         role=user_data.role
     )
     
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Email already registered"
+        )
+    await db.refresh(user)
     
     return user
 
 
+@router.post("/import", response_model=UserImportResponse)
+async def import_users_from_file(
+    file: UploadFile = File(..., description="CSV with a header row, or NDJSON"),
+    import_format: Optional[str] = Query(
+        None, alias="format", pattern="^(csv|ndjson)$", description="csv or ndjson, detected from the file name by default"
+    ),
+    current_user: dict = Depends(get_current_user_token),
+    db: AsyncSession = Depends(get_tenant_db)
+):
+    """
+    Bulk import users into the organization (admin only)
+    Records (email, password, full_name, role) are inserted and committed in
+    batches, passwords are hashed between transactions on a pool of their own.
+    Uploads are limited to USER_IMPORT_MAX_ROWS records, the CLI handles larger
+    files. The response reports the outcome of every record
+    """
+    if current_user.get("role") != "admin":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only admins can import users"
+        )
+    
+    if file.size is not None and file.size > settings.USER_IMPORT_MAX_BYTES:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Import files are limited to {settings.USER_IMPORT_MAX_BYTES} bytes, use the CLI for larger imports"
+        )
+    
+    import_format = import_format or detect_import_format(file.filename, file.content_type)
+    try:
+        records = await run_in_threadpool(
+            read_import_records, file.file, import_format, settings.USER_IMPORT_MAX_ROWS
+        )
+    except UnicodeDecodeError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Import file must be UTF-8 encoded"
+        )
+    if len(records) > settings.USER_IMPORT_MAX_ROWS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Imports are limited to {settings.USER_IMPORT_MAX_ROWS} records, use the CLI for larger imports"
+        )
+    
+    return await import_users(db, current_user.get("organization_id"), records)
+
+
+@router.post("/batch", response_model=UserBatchResponse)
+async def batch_update_users(
+    batch: UserBatchRequest,
+    current_user: dict = Depends(get_current_user_token),
+    db: AsyncSession = Depends(get_tenant_db)
+):
+    """
+    Update or delete many users at once (admin only)
+    Runs as one set-based UPDATE/DELETE ... WHERE id = ANY(:ids) and reports every id
+    """
+    if current_user.get("role") != "admin":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only admins can update users"
+        )
+    
+    organization_id = current_user.get("organization_id")
+    user_ids = list(dict.fromkeys(batch.user_ids))
+    results = {}
+    
+    if batch.operation == "update":
+        values = batch.update.model_dump(exclude_none=True) if batch.update else {}
+        if not values:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="No fields to update"
+            )
+        statement = update(User).values(**values)
+        done = "updated"
+    else:
+        # Can't delete yourself
+        own_id = current_user.get("sub")
+        for user_id in user_ids:
+            if str(user_id) == own_id:
+                results[user_id] = UserBatchResult(
+                    user_id=user_id, status="skipped", detail="Cannot delete your own account"
+                )
+        statement = delete(User)
+        done = "deleted"
+    
+    targets = [user_id for user_id in user_ids if user_id not in results]
+    if targets:
+        ids = bindparam("ids", targets, type_=ARRAY(PG_UUID(as_uuid=True)))
+        statement = (
+            statement
+            .where(User.id == any_(ids), User.organization_id == organization_id)
+            .returning(User.id)
+            .execution_options(synchronize_session=False)
+        )
+        found = set((await db.execute(statement)).scalars())
+        await db.commit()
+        if found:
+            await tenant_cache.invalidate(organization_id)
+    else:
+        found = set()
+    
+    for user_id in targets:
+        results[user_id] = UserBatchResult(
+            user_id=user_id, status=done if user_id in found else "not_found"
+        )
+    
+    return UserBatchResponse(
+        found=len(found),
+        not_found=len(targets) - len(found),
+        results=[results[user_id] for user_id in user_ids]
+    )
+
+
 @router.patch("/{user_id}", response_model=UserResponse)
 async def update_user(
     user_id: UUID,
     update_data: UserUpdate,
     current_user: dict = Depends(get_current_user_token),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_tenant_db)
 ):
     """
     Update a user (admin only)
@@ -118,12 +284,12 @@ async def update_user(
         )
     
     organization_id = current_user.get("organization_id")
-    set_tenant_context(db, organization_id)
-    
-    user = db.query(User).filter(
-        User.id == user_id,
-        User.organization_id == organization_id
-    ).first()
+    user = (await db.execute(
+        select(User).where(
+            User.id == user_id,
+            User.organization_id == organization_id
+        )
+    )).scalars().first()
     
     if not user:
         raise HTTPException(
@@ -139,8 +305,9 @@ async def update_user(
     if update_data.is_active is not None:
         user.is_active = update_data.is_active
     
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
+    await tenant_cache.invalidate(organization_id)
     
     return user
 
@@ -149,7 +316,7 @@ async def update_user(
 async def delete_user(
     user_id: UUID,
     current_user: dict = Depends(get_current_user_token),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_tenant_db)
 ):
     """
     Delete a user (admin only)
@@ -161,12 +328,12 @@ async def delete_user(
         )
     
     organization_id = current_user.get("organization_id")
-    set_tenant_context(db, organization_id)
-    
-    user = db.query(User).filter(
-        User.id == user_id,
-        User.organization_id == organization_id
-    ).first()
+    user = (await db.execute(
+        select(User).where(
+            User.id == user_id,
+            User.organization_id == organization_id
+        )
+    )).scalars().first()
     
     if not user:
         raise HTTPException(
@@ -181,7 +348,8 @@ async def delete_user(
             detail="Cannot delete your own account"
         )
     
-    db.delete(user)
-    db.commit()
+    await db.delete(user)
+    await db.commit()
+    await tenant_cache.invalidate(organization_id)
     
     return MessageResponse(message="User deleted successfully")
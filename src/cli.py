@@ -3,13 +3,20 @@
 # CLI tool for common tasks
 # Usage: python -m src.cli <command>
 
+import os
 import sys
 import argparse
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
 from sqlalchemy.orm import Session
 
 from src.database.session import SessionLocal
 from src.models.base import Organization, User, UserRole
+from src.core.config import settings
+from src.core.redis_client import sync_redis_client
 from src.core.security import get_password_hash
+from src.services.audit_retention import RetentionProgress
+from src.services.user_import import IMPORT_FORMATS, detect_import_format, import_users_sync, iter_import_records
 
 
 def create_superuser(email: str, password: str, org_name: str, org_slug: str):
@@ -57,6 +64,51 @@ def create_superuser(email: str, password: str, org_name: str, org_slug: str):
         db.close()
 
 
+def import_users(path: str, org_slug: str, import_format: str, workers: int, batch_size: int):
+    """Bulk import users from a CSV or NDJSON file, hashing passwords on every core"""
+    db = SessionLocal()
+    
+    try:
+        org = db.query(Organization).filter(Organization.slug == org_slug).first()
+        if not org:
+            print(f"Organization {org_slug} not found")
+            sys.exit(1)
+        
+        import_format = import_format or detect_import_format(path)
+        with open(path, encoding="utf-8-sig", newline="") as stream, \
+                ProcessPoolExecutor(max_workers=workers) as pool:
+            def hash_passwords(passwords):
+                return list(pool.map(get_password_hash, passwords, chunksize=max(1, len(passwords) // (workers * 4))))
+            
+            report = import_users_sync(
+                db, org.id, iter_import_records(stream, import_format), hash_passwords, batch_size
+            )
+        
+        for result in report.results:
+            if result.status != "created":
+                print(f"line {result.line}: {result.status} {result.email or ''} {result.detail or ''}".rstrip())
+        print(f"Created {report.created}, duplicates {report.duplicates}, invalid {report.invalid}")
+        
+    except Exception as e:
+        print(f"Error: {e}")
+        db.rollback()
+        sys.exit(1)
+    finally:
+        db.close()
+
+
+def audit_retention_status(run_id: str):
+    """Show how far an audit log retention run got"""
+    report = RetentionProgress(sync_redis_client, run_id).report()
+    if not report["started_at"]:
+        print(f"No retention run {run_id}")
+        sys.exit(1)
+    print(
+        f"Run {run_id} started {report['started_at']}: "
+        f"{report['tenants_done']}/{report['tenants']} tenants done, {report['deleted']} rows deleted"
+    )
+
+
 def main():
     parser = argparse.ArgumentParser(description="CLI tool for Multi-Tenant SaaS")
     subparsers = parser.add_subparsers(dest="command", help="Command to run")
@@ -68,10 +120,28 @@ def main():
     superuser_parser.add_argument("--org-name", default="Default Org", help="Organization name")
     superuser_parser.add_argument("--org-slug", default="default-org", help="Organization slug")
     
+    # Import users command
+    import_parser = subparsers.add_parser("import-users", help="Bulk import users from a CSV or NDJSON file")
+    import_parser.add_argument("path", help="File with email, password, full_name and role per record")
+    import_parser.add_argument("--org-slug", required=True, help="Organization to import into")
+    import_parser.add_argument("--format", choices=IMPORT_FORMATS, help="Defaults to the file extension")
+    import_parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Hashing processes")
+    import_parser.add_argument("--batch-size", type=int, default=settings.USER_IMPORT_BATCH_SIZE, help="Rows per INSERT")
+    
+    # Audit log retention progress
+    retention_parser = subparsers.add_parser("audit-retention-status", help="Show audit log retention progress")
+    retention_parser.add_argument(
+        "--run-id", default=datetime.utcnow().date().isoformat(), help="Run date (UTC), defaults to today"
+    )
+    
     args = parser.parse_args()
     
     if args.command == "create-superuser":
         create_superuser(args.email, args.password, args.org_name, args.org_slug)
+    elif args.command == "import-users":
+        import_users(args.path, args.org_slug, args.format, args.workers, args.batch_size)
+    elif args.command == "audit-retention-status":
+        audit_retention_status(args.run_id)
     else:
         parser.print_help()
 
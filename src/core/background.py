@@ -0,0 +1,44 @@
+import asyncio
+from typing import Awaitable, Callable, Optional
+
+
+class PeriodicTask:
+    """
+    Runs an async callable every `interval` seconds on the event loop
+    Started and stopped from the application lifespan, runs once more on stop
+    so nothing buffered in memory is lost at shutdown
+    """
+
+    def __init__(self, name: str, interval: float, func: Callable[[], Awaitable]):
+        self.name = name
+        self.interval = interval
+        self.func = func
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self, final_run: bool = True):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        if final_run:
+            await self.run_once()
+
+    async def run_once(self):
+        try:
+            await self.func()
+        except Exception as e:
+            # Keep the loop alive, the next run retries
+            print(f"Periodic task {self.name} error: {e}")
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.run_once()
@@ -0,0 +1,59 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+
+class LRUCache:
+    """
+    Bounded in-process LRU map with optional per-entry expiry
+    Safe to share between the event loop and threadpool workers
+    """
+
+    def __init__(self, maxsize: int, ttl: Optional[float] = None, timer: Callable[[], float] = time.time):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.timer = timer
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return a live entry, dropping it if it has expired"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            value, expires_at = entry
+            if expires_at is not None and self.timer() >= expires_at:
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None, expires_at: Optional[float] = None):
+        """
+        Store a value
+        expires_at is an absolute time on the cache's timer and wins over ttl
+        """
+        if self.maxsize <= 0:
+            return
+        if expires_at is None:
+            ttl = self.ttl if ttl is None else ttl
+            expires_at = self.timer() + ttl if ttl is not None else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.pop(key, None)
+        return entry[0] if entry is not None else default
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
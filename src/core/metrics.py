@@ -0,0 +1,58 @@
+import threading
+from collections import defaultdict
+from typing import Dict, Tuple
+
+LabelKey = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+
+class Metrics:
+    """
+    Minimal in-process metrics registry
+    Counters and gauges per worker, rendered in Prometheus text format by /metrics
+    """
+
+    def __init__(self):
+        self._counters: Dict[LabelKey, float] = defaultdict(float)
+        self._gauges: Dict[LabelKey, float] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(name: str, labels: dict) -> LabelKey:
+        return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+    def inc(self, name: str, value: float = 1, **labels):
+        """Increment a counter"""
+        key = self._key(name, labels)
+        with self._lock:
+            self._counters[key] += value
+
+    def set(self, name: str, value: float, **labels):
+        """Set a gauge"""
+        key = self._key(name, labels)
+        with self._lock:
+            self._gauges[key] = value
+
+    def get(self, name: str, **labels) -> float:
+        key = self._key(name, labels)
+        with self._lock:
+            if key in self._gauges:
+                return self._gauges[key]
+            return self._counters.get(key, 0)
+
+    def render(self) -> str:
+        """Prometheus text exposition of every metric"""
+        with self._lock:
+            items = sorted(list(self._counters.items()) + list(self._gauges.items()))
+        lines = []
+        for (name, labels), value in items:
+            label_str = ",".join(f'{k}="{v}"' for k, v in labels)
+            lines.append(f"{name}{{{label_str}}} {value:g}" if label_str else f"{name} {value:g}")
+        return "\n".join(lines) + "\n"
+
+    def clear(self):
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+
+
+metrics = Metrics()
@@ -0,0 +1,53 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Tuple
+from uuid import UUID
+
+from fastapi import HTTPException, status
+
+
+def encode_cursor(*values: Any) -> str:
+    """
+    Build an opaque keyset cursor from the sort key of the last row of a page
+    Values are JSON encoded (datetimes and UUIDs as strings) and base64url wrapped
+    """
+    raw = json.dumps([v.isoformat() if hasattr(v, "isoformat") else str(v) for v in values])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> List[str]:
+    """Decode a cursor produced by encode_cursor, expecting `size` values"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(values, list) or len(values) != size:
+            raise ValueError("unexpected cursor shape")
+        if not all(isinstance(value, str) for value in values):
+            raise ValueError("unexpected cursor value")
+        return values
+    except (ValueError, TypeError):
+        raise _invalid_cursor()
+
+
+def decode_timestamp_cursor(cursor: str) -> Tuple[datetime, UUID]:
+    """
+    Decode a (timestamp, id) cursor
+    Timestamps are stored naive UTC, an offset in the cursor is rejected since
+    it cannot be compared with them
+    """
+    timestamp, row_id = decode_cursor(cursor, 2)
+    try:
+        after = (datetime.fromisoformat(timestamp), UUID(row_id))
+    except ValueError:
+        raise _invalid_cursor()
+    if after[0].tzinfo is not None:
+        raise _invalid_cursor()
+    return after
+
+
+def _invalid_cursor() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Invalid cursor"
+    )
@@ -1,14 +1,50 @@
 import redis
+import redis.asyncio as aioredis
 from src.core.config import settings
 
+# Shared pool for the API, sized explicitly so a burst of requests waits for a
+# free connection (up to REDIS_POOL_TIMEOUT) instead of opening new ones
+redis_pool = aioredis.BlockingConnectionPool.from_url(
+    settings.REDIS_URL,
+    decode_responses=True,
+    encoding="utf-8",
+    max_connections=settings.REDIS_MAX_CONNECTIONS,
+    timeout=settings.REDIS_POOL_TIMEOUT,
+    socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+    socket_connect_timeout=settings.REDIS_CONNECT_TIMEOUT,
+    health_check_interval=settings.REDIS_HEALTH_CHECK_INTERVAL
+)
+
 # Redis client for caching and rate limiting
-redis_client = redis.from_url(
+redis_client = aioredis.Redis(connection_pool=redis_pool)
+
+# Blocking client for Celery tasks and the CLI, which run outside the event loop
+sync_redis_client = redis.from_url(
     settings.REDIS_URL,
     decode_responses=True,
-    encoding="utf-8"
+    encoding="utf-8",
+    socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+    socket_connect_timeout=settings.REDIS_CONNECT_TIMEOUT
 )
 
 
+async def init_redis():
+    """
+    Open the first pooled connection at startup
+    The app still starts without Redis, rate limiting fails open
+    """
+    try:
+        await redis_client.ping()
+    except Exception as e:
+        print(f"Redis unavailable at startup: {e}")
+
+
+async def close_redis():
+    """Close pooled connections on shutdown"""
+    await redis_client.aclose()
+    await redis_pool.disconnect()
+
+
 def get_redis():
     """Dependency for getting Redis client"""
     return redis_client
@@ -0,0 +1,44 @@
+import uuid
+
+# KEYS[1] lock, ARGV[1] owner token, ARGV[2] TTL in seconds
+RENEW_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('EXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+# KEYS[1] lock, ARGV[1] owner token
+RELEASE_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+class RedisLock:
+    """
+    Single-holder lock for periodic jobs that must not overlap
+    SET NX EX with an owner token, renew() and release() only act while the
+    token still matches so a holder whose lock expired never frees another's
+    Blocking client, for Celery tasks
+    """
+
+    def __init__(self, redis, key: str, ttl: int):
+        self.redis = redis
+        self.key = key
+        self.ttl = ttl
+        self.token = uuid.uuid4().hex
+        self._renew = redis.register_script(RENEW_LOCK_SCRIPT)
+        self._release = redis.register_script(RELEASE_LOCK_SCRIPT)
+
+    def acquire(self) -> bool:
+        return bool(self.redis.set(self.key, self.token, nx=True, ex=self.ttl))
+
+    def renew(self) -> bool:
+        """Extend the lock, False once it has expired and may be held by someone else"""
+        return bool(self._renew(keys=[self.key], args=[self.token, self.ttl]))
+
+    def release(self):
+        self._release(keys=[self.key], args=[self.token])
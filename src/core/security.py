@@ -1,15 +1,24 @@
+import asyncio
+import hashlib
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Callable, Optional
 from jose import JWTError, jwt
 from passlib.context import CryptContext
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 
+from src.core.cache import LRUCache
 from src.core.config import settings
+from src.core.metrics import metrics
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 security = HTTPBearer()
 
+# Claims of recently verified tokens, keyed by SHA-256 of the raw token
+verified_token_cache = LRUCache(maxsize=settings.JWT_CACHE_MAX_SIZE)
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against a hash"""
@@ -21,6 +30,81 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+class PasswordHashingPool:
+    """
+    Dedicated thread pool for bcrypt so hashing never runs on the event loop
+    bcrypt releases the GIL while hashing, so threads hash in parallel
+
+    At most max_workers calls run and max_pending wait for a thread, callers
+    beyond that get a 503 instead of queueing unbounded CPU work
+    """
+
+    def __init__(
+        self,
+        max_workers: int = settings.PASSWORD_HASH_WORKERS,
+        max_pending: int = settings.PASSWORD_HASH_MAX_PENDING,
+    ):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._in_flight = 0  # waiting + running
+
+    def _update_gauges(self):
+        metrics.set("password_hash_in_flight", self._in_flight)
+        metrics.set("password_hash_queue_depth", max(self._in_flight - self.max_workers, 0))
+
+    async def run(self, operation: str, func: Callable, *args):
+        if self._in_flight >= self.max_workers + self.max_pending:
+            metrics.inc("password_hash_rejected_total", operation=operation)
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Server busy, please retry",
+                headers={"Retry-After": "1"},
+            )
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="password-hash")
+
+        submitted = time.perf_counter()
+
+        def timed():
+            started = time.perf_counter()
+            metrics.inc("password_hash_wait_seconds_total", started - submitted, operation=operation)
+            try:
+                return func(*args)
+            finally:
+                metrics.inc("password_hash_seconds_total", time.perf_counter() - started, operation=operation)
+
+        self._in_flight += 1
+        self._update_gauges()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, timed)
+        finally:
+            self._in_flight -= 1
+            self._update_gauges()
+            metrics.inc("password_hash_total", operation=operation)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+
+password_hashing_pool = PasswordHashingPool()
+# API imports hash on their own threads, so a large upload never fills the
+# pool logins and registrations wait on
+import_hashing_pool = PasswordHashingPool(max_workers=settings.USER_IMPORT_HASH_WORKERS)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password on the hashing pool"""
+    return await password_hashing_pool.run("verify", verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """Hash a password on the hashing pool"""
+    return await password_hashing_pool.run("hash", get_password_hash, password)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create JWT access token"""
     to_encode = data.copy()
@@ -46,25 +130,49 @@ def create_refresh_token(data: dict) -> str:
 
 
 def decode_token(token: str) -> dict:
-    """Decode and verify JWT token"""
+    """
+    Decode and verify JWT token
+    Verified claims are cached until the token expires, so repeat requests
+    with the same token skip the signature check and JSON parsing
+    """
+    digest = hashlib.sha256(token.encode()).digest()
+    payload = verified_token_cache.get(digest)
+    if payload is not None:
+        # A copy, callers must not be able to change the cached claims
+        return dict(payload)
+    
     try:
         payload = jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
-        return payload
     except JWTError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Could not validate credentials",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    
+    exp = payload.get("exp")
+    if isinstance(exp, (int, float)):
+        # jose accepts a token while exp >= the current whole second,
+        # i.e. up to (but not including) exp + 1
+        verified_token_cache.set(digest, dict(payload), expires_at=int(exp) + 1)
+    return payload
 
 
-async def get_current_user_token(credentials: HTTPAuthorizationCredentials = Depends(security)) -> dict:
+async def get_current_user_token(
+    request: Request,
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+) -> dict:
     """
     Dependency to get current user from JWT token
     Returns the decoded token payload
+    Reuses the claims verified by TenantContextMiddleware when available
     """
     token = credentials.credentials
-    payload = decode_token(token)
+    context = getattr(request.state, "request_context", None)
+    if context is not None and context.token_payload is not None and context.token == token:
+        payload = context.token_payload
+    else:
+        payload = decode_token(token)
     
     # Verify it's an access token
     if payload.get("type") != "access":
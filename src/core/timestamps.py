@@ -0,0 +1,11 @@
+from datetime import datetime, timezone
+
+
+def naive_utc(value: datetime) -> datetime:
+    """
+    Convert a datetime to naive UTC, the form timestamp columns store
+    asyncpg refuses offset-aware values for timestamp without time zone
+    """
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
@@ -0,0 +1,110 @@
+"""
+Monthly range partitions for the audit_logs table
+
+Each month lives in its own partition named audit_logs_yYYYYmMM, plus a DEFAULT
+partition that only catches rows outside every pre-created range. Retention
+detaches and drops whole partitions, so its cost doesn't grow with the table.
+"""
+import re
+from datetime import date, datetime
+from typing import List, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+AUDIT_LOGS_TABLE = "audit_logs"
+DEFAULT_PARTITION = f"{AUDIT_LOGS_TABLE}_default"
+PARTITION_NAME_RE = re.compile(rf"^{AUDIT_LOGS_TABLE}_y(\d{{4}})m(\d{{2}})$")
+
+RLS_POLICY_SQL = """
+    CREATE POLICY {policy} ON {table}
+    FOR ALL
+    USING (organization_id = current_setting('app.current_organization_id', TRUE)::uuid)
+"""
+
+
+def month_start(value: date) -> date:
+    return date(value.year, value.month, 1)
+
+
+def add_months(value: date, months: int) -> date:
+    index = value.year * 12 + value.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"{AUDIT_LOGS_TABLE}_y{month.year}m{month.month:02d}"
+
+
+def enable_rls(conn: Connection, table: str):
+    """Enable RLS on a table with the tenant isolation policy"""
+    conn.execute(text(f"ALTER TABLE {table} ENABLE ROW LEVEL SECURITY"))
+    conn.execute(text(RLS_POLICY_SQL.format(policy=f"{table}_isolation_policy", table=table)))
+
+
+def create_audit_log_partition(conn: Connection, month: date) -> bool:
+    """
+    Create the partition holding `month`, with RLS enabled on it
+    Returns False if it already exists
+    """
+    month = month_start(month)
+    name = partition_name(month)
+    exists = conn.execute(text("SELECT to_regclass(:name)"), {"name": name}).scalar()
+    if exists:
+        return False
+
+    conn.execute(text(
+        f"CREATE TABLE {name} PARTITION OF {AUDIT_LOGS_TABLE} "
+        f"FOR VALUES FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')"
+    ))
+    enable_rls(conn, name)
+    return True
+
+
+def ensure_audit_log_partitions(conn: Connection, months_ahead: int, start: date = None) -> List[str]:
+    """Make sure partitions exist from `start` (default: this month) up to months_ahead months out"""
+    month = month_start(start or datetime.utcnow().date())
+    last = add_months(month_start(datetime.utcnow().date()), months_ahead)
+    created = []
+    while month <= last:
+        if create_audit_log_partition(conn, month):
+            created.append(partition_name(month))
+        month = add_months(month, 1)
+    return created
+
+
+def list_audit_log_partitions(conn: Connection) -> List[Tuple[str, date]]:
+    """Monthly partitions attached to audit_logs, as (name, first day of month)"""
+    rows = conn.execute(text("""
+        SELECT child.relname
+        FROM pg_inherits
+        JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+        JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+        WHERE parent.relname = :table
+    """), {"table": AUDIT_LOGS_TABLE}).scalars().all()
+
+    partitions = []
+    for name in rows:
+        match = PARTITION_NAME_RE.match(name)
+        if match:
+            partitions.append((name, date(int(match.group(1)), int(match.group(2)), 1)))
+    return sorted(partitions, key=lambda p: p[1])
+
+
+def drop_expired_audit_log_partitions(conn: Connection, cutoff: datetime, detach_only: bool = False) -> List[str]:
+    """
+    Detach and drop partitions whose whole month is older than cutoff
+    Retention granularity is one month: a partition is kept until its last row expires
+    """
+    # Don't queue behind long-running queries on the parent while holding its lock
+    conn.execute(text("SET LOCAL lock_timeout = '5s'"))
+
+    dropped = []
+    for name, month in list_audit_log_partitions(conn):
+        if datetime.combine(add_months(month, 1), datetime.min.time()) > cutoff:
+            continue
+        conn.execute(text(f"ALTER TABLE {AUDIT_LOGS_TABLE} DETACH PARTITION {name}"))
+        if not detach_only:
+            conn.execute(text(f"DROP TABLE {name}"))
+        dropped.append(name)
+    return dropped
@@ -1,12 +1,42 @@
-from typing import Generator
+from typing import AsyncGenerator
+from uuid import uuid4
 from fastapi import Depends
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
 
 from src.core.config import settings
+from src.core.security import get_current_user_token
+
+
+def get_async_database_url(url: str) -> str:
+    """Return the asyncpg flavour of a postgresql:// URL"""
+    if url.startswith("postgresql+asyncpg://"):
+        return url
+    for prefix in ("postgresql+psycopg2://", "postgresql://", "postgres://"):
+        if url.startswith(prefix):
+            return "postgresql+asyncpg://" + url[len(prefix):]
+    return url
+
+
+def get_async_connect_args() -> dict:
+    """
+    asyncpg connection arguments
+    PgBouncer in transaction mode hands each transaction to a different backend,
+    so named prepared statements can't be cached on the connection
+    """
+    if not settings.DATABASE_PGBOUNCER_TRANSACTION_MODE:
+        return {}
+    return {
+        "statement_cache_size": 0,
+        "prepared_statement_cache_size": 0,
+        "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+    }
+
 
 # Create SQLAlchemy engine
+# Sync engine is kept for Celery tasks, the CLI and Alembic
 engine = create_engine(
     settings.DATABASE_URL,
     pool_pre_ping=True,
@@ -17,26 +47,85 @@ engine = create_engine(
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine used by the API so queries don't block the event loop
+async_engine = create_async_engine(
+    get_async_database_url(settings.DATABASE_URL),
+    pool_pre_ping=True,
+    pool_size=settings.DATABASE_POOL_SIZE,
+    max_overflow=settings.DATABASE_MAX_OVERFLOW,
+    echo=settings.DEBUG,
+    connect_args=get_async_connect_args()
+)
+
+# expire_on_commit=False so attributes can still be read after commit
+# without triggering a lazy load (not allowed under asyncio)
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    autoflush=False,
+    expire_on_commit=False
+)
+
 Base = declarative_base()
 
+# set_config(..., true) is the function form of SET LOCAL and accepts bind parameters
+SET_TENANT_SQL = text("SELECT set_config('app.current_organization_id', :org_id, true)")
+
 
-def get_db() -> Generator[Session, None, None]:
+@event.listens_for(Session, "after_begin")
+def _apply_tenant_context(session, transaction, connection):
+    """
+    Re-apply the tenant for every transaction a tenant-bound session begins
+    The setting is transaction-local, so it never leaks onto a pooled connection
+    and survives commits made halfway through a request
+    """
+    organization_id = session.info.get("organization_id")
+    if organization_id:
+        connection.execute(SET_TENANT_SQL, {"org_id": organization_id})
+
+
+async def get_db() -> AsyncGenerator[AsyncSession, None]:
     """
     Database dependency for FastAPI routes
-    Sets tenant context for RLS
+    Yields an AsyncSession bound to the asyncpg engine
     """
-    db = SessionLocal()
-    try:
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
 
-def set_tenant_context(db: Session, organization_id: str):
+async def set_tenant_context(db: AsyncSession, organization_id: str):
+    """
+    Bind a session to an organization for RLS
+    Applied with SET LOCAL semantics inside the session's own transaction,
+    no extra commit is needed
+    """
+    db.info["organization_id"] = str(organization_id)
+    if db.in_transaction():
+        # Transaction already started without a tenant, apply it now
+        await db.execute(SET_TENANT_SQL, {"org_id": str(organization_id)})
+
+
+def get_session_factory() -> async_sessionmaker:
+    """
+    Dependency returning the session factory itself
+    For routes whose work outlives the request's dependencies, e.g. streaming responses
+    """
+    return AsyncSessionLocal
+
+
+def tenant_session(organization_id: str, factory: async_sessionmaker = AsyncSessionLocal) -> AsyncSession:
+    """Create a session bound to an organization"""
+    db = factory()
+    db.info["organization_id"] = str(organization_id)
+    return db
+
+
+async def get_tenant_db(
+    current_user: dict = Depends(get_current_user_token),
+    db: AsyncSession = Depends(get_db)
+) -> AsyncSession:
     """
-    Set the current organization ID for RLS
-    This is called by the TenantContextMiddleware
+    Database dependency for tenant-scoped routes
+    Same session as get_db, bound to the caller's organization
     """
-    # Set session variable for PostgreSQL RLS using parameterized query to prevent SQL injection
-    db.execute(text("SET app.current_organization_id = :org_id"), {"org_id": organization_id})
-    db.commit()
+    await set_tenant_context(db, current_user.get("organization_id"))
+    return db
@@ -1,22 +1,69 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse, PlainTextResponse
+from sqlalchemy import text
 import time
 
 from src.core.config import settings
+from src.core.metrics import metrics
 from src.middleware.tenant_context import TenantContextMiddleware
 from src.middleware.rate_limiter import RateLimiterMiddleware
 from src.middleware.audit_logger import AuditLoggerMiddleware
-from src.api import auth, organizations, users, subscriptions, audit_logs
-from src.database.session import engine
+from src.middleware.usage_meter import UsageMeterMiddleware
+from src.api import auth, organizations, users, subscriptions, audit_logs, usage
+from src.database.session import async_engine
+from src.core.background import PeriodicTask
+from src.core.redis_client import close_redis, init_redis, redis_client
+from src.core.security import import_hashing_pool, password_hashing_pool
+from src.services.activity import activity_tracker
+from src.services.audit_writer import audit_log_writer
+from src.services.last_login import last_login_recorder
+from src.services.rate_limit import hybrid_rate_limiter
+from src.services.usage import usage_meter
 from src.models import base  # Import to register models
 
+
+rate_limit_sync = PeriodicTask("rate-limit-sync", settings.RATE_LIMIT_SYNC_INTERVAL, hybrid_rate_limiter.flush)
+last_login_flush = PeriodicTask("last-login-flush", settings.LAST_LOGIN_FLUSH_INTERVAL, last_login_recorder.flush)
+activity_flush = PeriodicTask("activity-flush", settings.ACTIVITY_FLUSH_INTERVAL, activity_tracker.flush)
+usage_flush = PeriodicTask("usage-flush", settings.USAGE_FLUSH_INTERVAL, usage_meter.flush)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Application startup/shutdown hooks"""
+    await init_redis()
+    await audit_log_writer.start()
+    await last_login_flush.start()
+    await activity_flush.start()
+    await usage_flush.start()
+    if settings.RATE_LIMIT_HYBRID_ENABLED:
+        await rate_limit_sync.start()
+    yield
+    # Report locally admitted requests before exiting
+    await rate_limit_sync.stop()
+    # Drain queued audit rows and logins before the engine goes away
+    await audit_log_writer.stop()
+    await last_login_flush.stop()
+    await activity_flush.stop()
+    await usage_flush.stop()
+    # Close pooled asyncpg connections on shutdown
+    await async_engine.dispose()
+    # Last, the rate limit sync above still needs Redis
+    await close_redis()
+    password_hashing_pool.shutdown()
+    import_hashing_pool.shutdown()
+
+
 app = FastAPI(
     title=settings.APP_NAME,
     version=settings.APP_VERSION,
     docs_url="/docs",
     redoc_url="/redoc",
-    openapi_url="/openapi.json"
+    openapi_url="/openapi.json",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
 # CORS
@@ -30,6 +77,8 @@ app.add_middleware(
 
 # Custom middleware - order matters!
 app.add_middleware(AuditLoggerMiddleware)
+# Inside the rate limiter, rejected requests aren't metered
+app.add_middleware(UsageMeterMiddleware)
 app.add_middleware(RateLimiterMiddleware)
 app.add_middleware(TenantContextMiddleware)
 
@@ -40,6 +89,7 @@ app.include_router(organizations.router, prefix=f"{settings.API_V1_PREFIX}/organ
 app.include_router(users.router, prefix=f"{settings.API_V1_PREFIX}/users", tags=["Users"])
 app.include_router(subscriptions.router, prefix=f"{settings.API_V1_PREFIX}/subscriptions", tags=["Subscriptions"])
 app.include_router(audit_logs.router, prefix=f"{settings.API_V1_PREFIX}/audit-logs", tags=["Audit Logs"])
+app.include_router(usage.router, prefix=f"{settings.API_V1_PREFIX}/usage", tags=["Usage"])
 
 
 @app.get("/")
@@ -55,9 +105,6 @@ async def root():
 async def health_check():
     """Health check endpoint for monitoring"""
     # TODO: add more comprehensive checks
-    from src.database.session import SessionLocal
-    from src.core.redis_client import redis_client
-    
     health_status = {
         "status": "healthy",
         "version": settings.APP_VERSION,
@@ -66,9 +113,8 @@ async def health_check():
     
     # Check database
     try:
-        db = SessionLocal()
-        db.execute("SELECT 1")
-        db.close()
+        async with async_engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
         health_status["database"] = "connected"
     except Exception as e:
         health_status["database"] = f"error: {str(e)}"
@@ -76,7 +122,7 @@ async def health_check():
     
     # Check Redis
     try:
-        redis_client.ping()
+        await redis_client.ping()
         health_status["redis"] = "connected"
     except Exception as e:
         health_status["redis"] = f"error: {str(e)}"
@@ -85,6 +131,12 @@ async def health_check():
     return health_status
 
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics_endpoint():
+    """Per-worker metrics in Prometheus text format"""
+    return metrics.render()
+
+
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
     """Global exception handler - catches unhandled exceptions"""
@@ -2,5 +2,9 @@
 from src.middleware.tenant_context import TenantContextMiddleware
 from src.middleware.rate_limiter import RateLimiterMiddleware
 from src.middleware.audit_logger import AuditLoggerMiddleware
+from src.middleware.context import RequestContext, get_request_context
 
-__all__ = ["TenantContextMiddleware", "RateLimiterMiddleware", "AuditLoggerMiddleware"]
+__all__ = [
+    "TenantContextMiddleware", "RateLimiterMiddleware", "AuditLoggerMiddleware",
+    "RequestContext", "get_request_context"
+]
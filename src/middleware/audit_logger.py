@@ -1,61 +1,83 @@
-from starlette.middleware.base import BaseHTTPMiddleware
-from fastapi import Request
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 import time
 import json
-from src.database.session import SessionLocal
-from src.models.base import AuditLog
 from src.core.config import settings
+from src.services.audit_writer import audit_log_writer
+from src.middleware.context import get_request_context
 
+# Skip audit logging for health checks and docs
+SKIP_PATHS = {"/health", "/metrics", "/docs", "/redoc", "/openapi.json"}
 
-class AuditLoggerMiddleware(BaseHTTPMiddleware):
+
+class AuditLoggerMiddleware:
     """
     Middleware to log all API requests to audit_logs table
     """
-    
-    async def dispatch(self, request: Request, call_next):
-        if not settings.ENABLE_AUDIT_LOGS:
-            return await call_next(request)
-        
-        # Skip audit logging for health checks and docs
-        skip_paths = ["/health", "/docs", "/redoc", "/openapi.json"]
-        if request.url.path in skip_paths:
-            return await call_next(request)
-        
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or not settings.ENABLE_AUDIT_LOGS:
+            await self.app(scope, receive, send)
+            return
+
+        path = scope["path"]
+        method = scope["method"]
+        if path in SKIP_PATHS:
+            await self.app(scope, receive, send)
+            return
+
         start_time = time.time()
-        
+
         # Get request details
-        organization_id = getattr(request.state, "organization_id", None)
-        user_id = getattr(request.state, "user_id", None)
-        
-        response = await call_next(request)
-        
+        context = get_request_context(scope)
+        organization_id = context.organization_id
+        user_id = context.user_id
+
         # Only log if we have org context and it's not a GET request
         # (to avoid cluttering logs with read operations)
-        if organization_id and request.method != "GET":
-            process_time = time.time() - start_time
-            
-            # Determine action based on method and path
-            action = self._determine_action(request.method, request.url.path)
-            resource_type = self._extract_resource_type(request.url.path)
-            
-            details = {
-                "method": request.method,
-                "path": request.url.path,
-                "status_code": response.status_code,
-                "process_time": round(process_time, 3)
-            }
-            
-            # Save to database in background to avoid blocking the request
-            # Using queue-based approach with Celery would be better for production
-            import asyncio
-            asyncio.create_task(self._log_to_database(
-                organization_id, user_id, action, resource_type,
-                details, request.client.host if request.client else None,
-                request.headers.get("user-agent")
-            ))
-        
-        return response
-    
+        if not organization_id or method == "GET":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_capturing_status(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        await self.app(scope, receive, send_capturing_status)
+
+        process_time = time.time() - start_time
+
+        # Determine action based on method and path
+        action = self._determine_action(method, path)
+        resource_type = self._extract_resource_type(path)
+
+        details = {
+            "method": method,
+            "path": path,
+            "status_code": status_code,
+            "process_time": round(process_time, 3)
+        }
+
+        client = scope.get("client")
+
+        # Hand off to the batched writer, the request never waits on the database
+        await audit_log_writer.enqueue(
+            organization_id=organization_id,
+            user_id=user_id,
+            action=action,
+            resource_type=resource_type,
+            details=json.dumps(details),
+            ip_address=client[0] if client else None,
+            user_agent=Headers(scope=scope).get("user-agent")
+        )
+
     def _determine_action(self, method: str, path: str) -> str:
         """Determine action name from method and path"""
         if method == "POST":
@@ -66,7 +88,7 @@ class AuditLoggerMiddleware(BaseHTTPMiddleware):
             return "delete"
         else:
             return method.lower()
-    
+
     def _extract_resource_type(self, path: str) -> str:
         """Extract resource type from path"""
         # Simple extraction: /api/v1/users -> users
@@ -74,24 +96,3 @@ class AuditLoggerMiddleware(BaseHTTPMiddleware):
         if len(parts) >= 4:
             return parts[3]
         return "unknown"
-    
-    async def _log_to_database(self, organization_id, user_id, action, 
-                                resource_type, details, ip_address, user_agent):
-        """Background task to save audit log to database"""
-        try:
-            db = SessionLocal()
-            audit_log = AuditLog(
-                organization_id=organization_id,
-                user_id=user_id,
-                action=action,
-                resource_type=resource_type,
-                details=json.dumps(details),
-                ip_address=ip_address,
-                user_agent=user_agent
-            )
-            db.add(audit_log)
-            db.commit()
-            db.close()
-        except Exception as e:
-            # Don't fail request if audit logging fails
-            print(f"Audit log error: {e}")
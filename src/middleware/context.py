@@ -0,0 +1,27 @@
+import time
+from dataclasses import dataclass, field
+from typing import Optional
+
+from starlette.types import Scope
+
+
+@dataclass
+class RequestContext:
+    """
+    Per-request state shared by the middleware stack and dependencies
+    Lives in scope["state"], so it is also reachable as request.state.request_context
+    """
+    token: Optional[str] = None
+    token_payload: Optional[dict] = None
+    organization_id: Optional[str] = None
+    user_id: Optional[str] = None
+    start_time: float = field(default_factory=time.time)
+
+
+def get_request_context(scope: Scope) -> RequestContext:
+    """Return the request's context, creating it on first access"""
+    state = scope.setdefault("state", {})
+    context = state.get("request_context")
+    if context is None:
+        context = state["request_context"] = RequestContext()
+    return context
@@ -1,84 +1,75 @@
-from starlette.middleware.base import BaseHTTPMiddleware
-from fastapi import Request, HTTPException, status
+from fastapi import status
 from fastapi.responses import JSONResponse
-import time
-from src.core.redis_client import redis_client
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 from src.core.config import settings
+from src.middleware.context import get_request_context
+from src.services.rate_limit import check_rate_limit
+from src.services.tier_cache import tier_cache
 
+PUBLIC_PATHS = {"/", "/health", "/metrics", "/docs", "/redoc", "/openapi.json"}
 
-class RateLimiterMiddleware(BaseHTTPMiddleware):
+
+class RateLimiterMiddleware:
     """
     Rate limiting middleware using Redis
-    Implements sliding window algorithm per organization
+    GCRA per organization, evaluated atomically by a Lua script, or batched
+    through per-worker buckets for the tiers in RATE_LIMIT_HYBRID_TIERS
+    Falls back to an in-process limiter while the Redis circuit breaker is open
     """
-    
-    async def dispatch(self, request: Request, call_next):
-        if not settings.RATE_LIMIT_ENABLED:
-            return await call_next(request)
-        
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or not settings.RATE_LIMIT_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
         # Skip rate limiting for public endpoints
-        public_paths = ["/", "/health", "/docs", "/redoc", "/openapi.json"]
-        if request.url.path in public_paths:
-            return await call_next(request)
-        
-        # Get organization_id from request state (set by TenantContextMiddleware)
-        organization_id = getattr(request.state, "organization_id", None)
-        
+        if scope["path"] in PUBLIC_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        # Get organization_id from the request context (set by TenantContextMiddleware)
+        context = get_request_context(scope)
+        organization_id = context.organization_id
+
         if not organization_id:
             # No org context, skip rate limiting (will fail auth anyway)
-            return await call_next(request)
-        
-        # Get rate limit based on subscription tier
-        # TODO: fetch actual tier from database
-        # For now, assume free tier
-        rate_limit = settings.RATE_LIMIT_FREE_TIER
-        window = 3600  # 1 hour in seconds
-        
-        # Redis key for this organization
-        key = f"rate_limit:{organization_id}"
-        
+            await self.app(scope, receive, send)
+            return
+
         try:
-            current_time = int(time.time())
-            
-            # Sliding window implementation
-            pipe = redis_client.pipeline()
-            
-            # Remove old entries
-            pipe.zremrangebyscore(key, 0, current_time - window)
-            
-            # Count requests in current window
-            pipe.zcard(key)
-            
-            # Add current request
-            user_id = getattr(request.state, "user_id", "anonymous")
-            pipe.zadd(key, {f"{current_time}:{user_id}": current_time})
-            
-            # Set expiry
-            pipe.expire(key, window)
-            
-            results = pipe.execute()
-            request_count = results[1]
-            
-            # Check if rate limit exceeded
-            if request_count >= rate_limit:
-                return JSONResponse(
-                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                    content={
-                        "detail": "Rate limit exceeded",
-                        "limit": rate_limit,
-                        "window": "1 hour"
-                    }
-                )
-            
-            # Add rate limit headers to response
-            response = await call_next(request)
-            response.headers["X-RateLimit-Limit"] = str(rate_limit)
-            response.headers["X-RateLimit-Remaining"] = str(rate_limit - request_count - 1)
-            response.headers["X-RateLimit-Reset"] = str(current_time + window)
-            
-            return response
-            
+            # Get rate limit based on subscription tier (cached, no DB hit on the hot path)
+            tier = await tier_cache.get_tier(organization_id)
+            result = await check_rate_limit(organization_id, tier)
         except Exception as e:
-            # If Redis fails, allow request but log error
+            # If the tier can't be resolved, allow request but log error
             print(f"Rate limiter error: {e}")
-            return await call_next(request)
+            await self.app(scope, receive, send)
+            return
+
+        # Check if rate limit exceeded
+        if not result.allowed:
+            response = JSONResponse(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                content={
+                    "detail": "Rate limit exceeded",
+                    "limit": result.limit,
+                    "window": f"{settings.RATE_LIMIT_WINDOW_SECONDS} seconds",
+                    "retry_after": int(result.headers["Retry-After"])
+                },
+                headers=result.headers
+            )
+            await response(scope, receive, send)
+            return
+
+        # Add rate limit headers to response
+        async def send_with_headers(message: Message):
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers.update(result.headers)
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
@@ -1,44 +1,58 @@
-from starlette.middleware.base import BaseHTTPMiddleware
-from fastapi import Request
-from src.database.session import SessionLocal, set_tenant_context
+from fastapi import HTTPException
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Receive, Scope, Send
+
 from src.core.security import decode_token
-from jose import JWTError
+from src.middleware.context import get_request_context
+from src.services.activity import activity_tracker
+
+PUBLIC_PATHS = {"/", "/health", "/metrics", "/docs", "/redoc", "/openapi.json", "/api/v1/auth/register", "/api/v1/auth/login"}
+WEBHOOK_PREFIX = "/api/v1/subscriptions/webhook"
 
 
-class TenantContextMiddleware(BaseHTTPMiddleware):
+class TenantContextMiddleware:
     """
     Middleware to set tenant context for RLS
-    Extracts organization_id from JWT and sets it in the database session
+    Extracts organization_id from JWT and stores it in the request context
     """
-    
-    async def dispatch(self, request: Request, call_next):
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        context = get_request_context(scope)
+        path = scope["path"]
+
         # Skip for public endpoints
-        public_paths = ["/", "/health", "/docs", "/redoc", "/openapi.json", "/api/v1/auth/register", "/api/v1/auth/login"]
-        
-        if request.url.path in public_paths or request.url.path.startswith("/api/v1/subscriptions/webhook"):
-            return await call_next(request)
-        
+        if path in PUBLIC_PATHS or path.startswith(WEBHOOK_PREFIX):
+            await self.app(scope, receive, send)
+            return
+
         # Extract token from Authorization header
-        auth_header = request.headers.get("Authorization")
-        
+        auth_header = Headers(scope=scope).get("authorization")
+
         if auth_header and auth_header.startswith("Bearer "):
             token = auth_header.replace("Bearer ", "")
-            
+
             try:
                 payload = decode_token(token)
-                organization_id = payload.get("organization_id")
-                
-                if organization_id:
-                    # Store in request state for use in endpoints
-                    request.state.organization_id = organization_id
-                    request.state.user_id = payload.get("sub")
-                    
-                    # Set tenant context in database session
-                    # This happens per-request in the dependency, not here
-                    # We just store it in request state
-                    
-            except JWTError:
+
+                # Verified once here, reused by get_current_user_token
+                context.token = token
+                context.token_payload = payload
+
+                # The tenant is applied to the database session by get_tenant_db,
+                # here it is only recorded for the rest of the stack
+                if payload.get("organization_id"):
+                    context.organization_id = payload.get("organization_id")
+                    context.user_id = payload.get("sub")
+                    activity_tracker.record(context.organization_id)
+
+            except HTTPException:
                 pass  # Will be handled by endpoint authentication
-        
-        response = await call_next(request)
-        return response
+
+        await self.app(scope, receive, send)
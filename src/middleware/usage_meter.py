@@ -0,0 +1,30 @@
+from starlette.types import ASGIApp, Receive, Scope, Send
+from src.core.config import settings
+from src.middleware.context import get_request_context
+from src.services.usage import UsageMeter, usage_meter
+
+
+class UsageMeterMiddleware:
+    """
+    Counts requests per organization, route template and hour
+    Only increments an in-process counter, the meter flushes to Redis in the
+    background. Requests that match no route are not counted
+    """
+
+    def __init__(self, app: ASGIApp, meter: UsageMeter = usage_meter):
+        self.app = app
+        self.meter = meter
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or not settings.USAGE_METERING_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            # Set by the tenant middleware before, and by the router during, the request
+            organization_id = get_request_context(scope).organization_id
+            route = scope.get("route")
+            if organization_id and route is not None:
+                self.meter.record(organization_id, scope["method"], route.path)
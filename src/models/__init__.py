@@ -1,4 +1,4 @@
 # Import all models here for Alembic to detect
-from src.models.base import Organization, User, AuditLog, SubscriptionTier, UserRole
+from src.models.base import Organization, User, AuditLog, UsageHourly, SubscriptionTier, UserRole
 
-__all__ = ["Organization", "User", "AuditLog", "SubscriptionTier", "UserRole"]
+__all__ = ["Organization", "User", "AuditLog", "UsageHourly", "SubscriptionTier", "UserRole"]
@@ -1,6 +1,6 @@
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, DateTime, Boolean, ForeignKey, Integer, Text, Enum as SQLEnum
+from sqlalchemy import Column, String, DateTime, Boolean, ForeignKey, Integer, BigInteger, Text, Enum as SQLEnum, DDL, Index, event
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 import enum
@@ -31,6 +31,8 @@ class Organization(Base):
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
     is_active = Column(Boolean, default=True, nullable=False)
+    # Day precision, rolled up from Redis by src.tasks.activity_tasks
+    last_activity_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     
     # Relationships
     users = relationship("User", back_populates="organization", cascade="all, delete-orphan")
@@ -47,9 +49,11 @@ class User(Base):
     __tablename__ = "users"
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    organization_id = Column(UUID(as_uuid=True), ForeignKey("organizations.id"), nullable=False, index=True)
+    # Indexed together with created_at and id below
+    organization_id = Column(UUID(as_uuid=True), ForeignKey("organizations.id"), nullable=False)
     
-    email = Column(String(255), nullable=False, index=True)
+    # Unique across organizations, login looks users up by email alone
+    email = Column(String(255), nullable=False, unique=True, index=True)
     hashed_password = Column(String(255), nullable=False)
     full_name = Column(String(255), nullable=True)
     
@@ -67,9 +71,13 @@ class User(Base):
 
 class AuditLog(Base):
     __tablename__ = "audit_logs"
+    # Range partitioned by month, see src/database/partitions.py
+    __table_args__ = {"postgresql_partition_by": "RANGE (timestamp)"}
     
+    # The partition key has to be part of the primary key
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    organization_id = Column(UUID(as_uuid=True), ForeignKey("organizations.id"), nullable=False, index=True)
+    # Indexed together with timestamp and id below
+    organization_id = Column(UUID(as_uuid=True), ForeignKey("organizations.id"), nullable=False)
     user_id = Column(UUID(as_uuid=True), nullable=True)  # nullable for system actions
     
     action = Column(String(100), nullable=False, index=True)
@@ -80,7 +88,56 @@ class AuditLog(Base):
     ip_address = Column(String(45), nullable=True)
     user_agent = Column(String(500), nullable=True)
     
-    timestamp = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
+    timestamp = Column(DateTime, default=datetime.utcnow, primary_key=True, nullable=False, index=True)
     
     # Relationships
     organization = relationship("Organization", back_populates="audit_logs")
+
+
+class UsageHourly(Base):
+    """Requests per organization, route and hour, rolled up from Redis by src.tasks.usage_tasks"""
+    __tablename__ = "usage_hourly"
+    
+    # The primary key is the upsert conflict target and serves per-tenant time ranges
+    organization_id = Column(UUID(as_uuid=True), ForeignKey("organizations.id"), primary_key=True)
+    hour = Column(DateTime, primary_key=True)
+    method = Column(String(10), primary_key=True)
+    route = Column(String(255), primary_key=True)  # route template, e.g. /api/v1/users/{user_id}
+    
+    request_count = Column(BigInteger, default=0, nullable=False)
+
+
+# Serves the inactive organization sweep, which only looks at active organizations
+Index(
+    "ix_organizations_active_last_activity_at",
+    Organization.last_activity_at,
+    postgresql_where=Organization.is_active
+)
+
+# Serves the tenant filter and keyset pagination of users ordered by (created_at, id)
+Index("ix_users_org_created_at_id", User.organization_id, User.created_at, User.id)
+
+# Trigram indexes for substring search on email and full name (ILIKE '%...%')
+Index("ix_users_email_trgm", User.email, postgresql_using="gin", postgresql_ops={"email": "gin_trgm_ops"})
+Index("ix_users_full_name_trgm", User.full_name, postgresql_using="gin", postgresql_ops={"full_name": "gin_trgm_ops"})
+
+# Needed by the trigram indexes when tables are created via metadata.create_all
+event.listen(
+    User.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql")
+)
+
+# Serves the tenant filter and keyset pagination ordered by (timestamp, id) newest first
+Index(
+    "ix_audit_logs_org_timestamp_id",
+    AuditLog.organization_id, AuditLog.timestamp.desc(), AuditLog.id.desc()
+)
+
+# Tables created via metadata.create_all (tests, local setups) need somewhere to
+# put rows before any monthly partition exists
+event.listen(
+    AuditLog.__table__,
+    "after_create",
+    DDL("CREATE TABLE IF NOT EXISTS audit_logs_default PARTITION OF audit_logs DEFAULT").execute_if(dialect="postgresql")
+)
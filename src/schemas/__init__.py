@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr, Field, validator
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 from uuid import UUID
 import re
@@ -74,6 +74,43 @@ class UserResponse(UserBase):
         from_attributes = True
 
 
+class UserListResponse(BaseModel):
+    items: List[UserResponse]
+    next_cursor: Optional[str] = None  # pass back as ?cursor= for the next page
+
+
+class UserBatchRequest(BaseModel):
+    user_ids: List[UUID] = Field(..., min_length=1, max_length=1000)
+    operation: str = Field(..., pattern="^(update|delete)$")
+    update: Optional[UserUpdate] = None  # fields to set, required for update
+
+
+class UserBatchResult(BaseModel):
+    user_id: UUID
+    status: str  # updated, deleted, not_found or skipped
+    detail: Optional[str] = None
+
+
+class UserBatchResponse(BaseModel):
+    found: int
+    not_found: int
+    results: List[UserBatchResult]
+
+
+class UserImportRowResult(BaseModel):
+    line: int  # line of the record in the uploaded file
+    email: Optional[str] = None
+    status: str  # created, duplicate or invalid
+    detail: Optional[str] = None
+
+
+class UserImportResponse(BaseModel):
+    created: int
+    duplicates: int
+    invalid: int
+    results: List[UserImportRowResult]
+
+
 # ============================================
 # Auth Schemas
 # ============================================
@@ -143,6 +180,30 @@ class AuditLogResponse(BaseModel):
         from_attributes = True
 
 
+class AuditLogListResponse(BaseModel):
+    items: List[AuditLogResponse]
+    next_cursor: Optional[str] = None  # pass back as ?cursor= for the next page
+
+
+# ============================================
+# Usage Schemas
+# ============================================
+
+class UsageBucket(BaseModel):
+    period: datetime  # start of the hour, day or month
+    method: Optional[str] = None  # set when grouped by route
+    route: Optional[str] = None
+    request_count: int
+
+
+class UsageResponse(BaseModel):
+    start: datetime
+    end: datetime
+    granularity: str
+    total_requests: int
+    items: List[UsageBucket]
+
+
 # ============================================
 # Generic Responses
 # ============================================
@@ -0,0 +1,37 @@
+from typing import Iterable, Mapping, Optional, Type
+
+from fastapi.responses import Response
+from pydantic import BaseModel, TypeAdapter
+
+from src.schemas import AuditLogListResponse, AuditLogResponse, UserListResponse, UserResponse
+
+
+class ListSerializer:
+    """
+    Precompiled serializer for a keyset-paginated list response
+    Pages are built from row mappings rather than ORM objects. The rows come
+    from typed columns, so items are constructed without re-validation
+    (EmailStr checks alone cost more than everything else) and dumped to JSON
+    bytes in one pass by a TypeAdapter built at import time
+    """
+
+    def __init__(self, response_model: Type[BaseModel], item_model: Type[BaseModel]):
+        self.response_model = response_model
+        self.item_model = item_model
+        self.adapter = TypeAdapter(response_model)
+
+    def dump_json(self, rows: Iterable[Mapping], next_cursor: Optional[str] = None) -> bytes:
+        construct = self.item_model.model_construct
+        page = self.response_model.model_construct(
+            items=[construct(**row) for row in rows],
+            next_cursor=next_cursor
+        )
+        return self.adapter.dump_json(page)
+
+    def response(self, rows: Iterable[Mapping], next_cursor: Optional[str] = None) -> Response:
+        """Returning a Response skips FastAPI's own response_model pass"""
+        return Response(content=self.dump_json(rows, next_cursor), media_type="application/json")
+
+
+user_list_serializer = ListSerializer(UserListResponse, UserResponse)
+audit_log_list_serializer = ListSerializer(AuditLogListResponse, AuditLogResponse)
@@ -0,0 +1,127 @@
+import uuid
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Set
+
+from sqlalchemy import DateTime, column, update, values
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.engine import Engine
+
+from src.core.config import settings
+from src.core.metrics import metrics
+from src.core.redis_client import redis_client
+from src.models.base import Organization
+from src.services.circuit_breaker import CircuitBreaker, redis_breaker
+
+KEY_PREFIX = "activity:"
+
+
+def activity_key(day: date) -> str:
+    """Redis set of organizations active on a UTC day"""
+    return f"{KEY_PREFIX}{day.isoformat()}"
+
+
+class ActivityTracker:
+    """
+    Per-day record of active organizations
+    Requests mark their organization in memory, once per worker and day, and
+    flush() adds the newly seen ones to the day's Redis set with one SADD.
+    Nothing is written to the database per request, the rollup task copies
+    the sets into organizations.last_activity_at
+    Run periodically from the application lifespan
+    """
+
+    def __init__(
+        self,
+        redis,
+        key_ttl: int = settings.ACTIVITY_KEY_TTL,
+        breaker: CircuitBreaker = redis_breaker,
+        clock=datetime.utcnow,
+    ):
+        self.redis = redis
+        self.key_ttl = key_ttl
+        self.breaker = breaker
+        self.clock = clock
+        self._day = None
+        self._seen: Set[str] = set()
+        self._pending: Dict[date, Set[str]] = {}
+
+    def record(self, organization_id: str):
+        day = self.clock().date()
+        if day != self._day:
+            self._day = day
+            self._seen = set()
+        if organization_id in self._seen:
+            return
+        self._seen.add(organization_id)
+        self._pending.setdefault(day, set()).add(organization_id)
+
+    async def flush(self):
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, {}
+        try:
+            await self.breaker.call(self._write, pending)
+        except Exception:
+            # Forget them, the next request of each organization records it again
+            self._seen -= pending.get(self._day, set())
+            raise
+        metrics.inc("activity_recorded_total", sum(len(orgs) for orgs in pending.values()))
+
+    async def _write(self, pending: Dict[date, Set[str]]):
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for day, organizations in pending.items():
+                pipe.sadd(activity_key(day), *organizations)
+                pipe.expire(activity_key(day), self.key_ttl)
+            await pipe.execute()
+
+
+def _update(rows: List[tuple]):
+    activity = values(
+        column("id", UUID(as_uuid=True)),
+        column("last_activity_at", DateTime),
+        name="activity"
+    ).data(rows)
+    return (
+        update(Organization)
+        .where(Organization.id == activity.c.id)
+        .where(Organization.last_activity_at < activity.c.last_activity_at)
+        .values(last_activity_at=activity.c.last_activity_at)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def _organization_ids(members: Iterable[str]) -> List[uuid.UUID]:
+    ids = []
+    for member in members:
+        try:
+            ids.append(uuid.UUID(member))
+        except ValueError:
+            continue
+    return ids
+
+
+def rollup_activity(
+    engine: Engine,
+    redis,
+    today: date = None,
+    batch_size: int = settings.ACTIVITY_ROLLUP_BATCH_SIZE,
+) -> int:
+    """
+    Move yesterday's and today's active organizations into last_activity_at
+    One UPDATE ... FROM (VALUES ...) per batch, last_activity_at only moves
+    forward and has day precision, so repeated rollups of a day are no-ops
+    Returns the number of organizations updated
+    """
+    today = today or datetime.utcnow().date()
+    updated = 0
+    for day in (today - timedelta(days=1), today):
+        at = datetime.combine(day, datetime.min.time())
+        rows = [(organization_id, at) for organization_id in _organization_ids(redis.smembers(activity_key(day)))]
+        for i in range(0, len(rows), batch_size):
+            with engine.begin() as conn:
+                updated += conn.execute(_update(rows[i:i + batch_size])).rowcount
+    metrics.inc("activity_rollup_updated_total", updated)
+    return updated
+
+
+activity_tracker = ActivityTracker(redis_client)
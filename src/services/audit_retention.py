@@ -0,0 +1,148 @@
+"""
+Per-tenant audit log retention
+
+Every tier keeps audit logs for its own number of days. Whole monthly
+partitions are dropped once they are older than the longest retention
+(src/database/partitions.py). Tenants on shorter retentions have their expired
+rows deleted from the partitions that are kept, in primary-key ordered batches
+of one short transaction each. Progress is checkpointed in Redis so an
+interrupted run resumes where it stopped.
+"""
+import json
+import uuid
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import delete, select, text, tuple_
+from sqlalchemy.engine import Connection
+
+from src.core.config import settings
+from src.models.base import AuditLog, SubscriptionTier
+
+# (timestamp, id) of the last deleted row, the audit_logs primary key
+Checkpoint = Tuple[datetime, uuid.UUID]
+
+
+def retention_days_for_tier(tier: SubscriptionTier) -> int:
+    """Days of audit logs kept for a subscription tier"""
+    return {
+        SubscriptionTier.FREE: settings.AUDIT_LOG_RETENTION_DAYS_FREE,
+        SubscriptionTier.PRO: settings.AUDIT_LOG_RETENTION_DAYS_PRO,
+        SubscriptionTier.ENTERPRISE: settings.AUDIT_LOG_RETENTION_DAYS_ENTERPRISE,
+    }.get(tier, settings.AUDIT_LOG_RETENTION_DAYS_FREE)
+
+
+def longest_retention_days() -> int:
+    return max(retention_days_for_tier(tier) for tier in SubscriptionTier)
+
+
+def expired_batch_query(organization_id, cutoff: datetime, after: Optional[Checkpoint], batch_size: int):
+    """
+    DELETE of the next batch of an organization's rows older than cutoff
+    Walks the (organization_id, timestamp, id) index from the checkpoint, so
+    each batch skips the dead tuples left by the previous ones
+    """
+    conditions = [AuditLog.organization_id == organization_id, AuditLog.timestamp < cutoff]
+    if after:
+        conditions.append(tuple_(AuditLog.timestamp, AuditLog.id) > tuple_(*after))
+    batch = (
+        select(AuditLog.timestamp, AuditLog.id)
+        .where(*conditions)
+        .order_by(AuditLog.timestamp, AuditLog.id)
+        .limit(batch_size)
+        .cte("batch")
+    )
+    return (
+        delete(AuditLog)
+        .where(AuditLog.timestamp == batch.c.timestamp, AuditLog.id == batch.c.id)
+        .returning(AuditLog.timestamp, AuditLog.id)
+    )
+
+
+def delete_expired_batch(
+    conn: Connection,
+    organization_id,
+    cutoff: datetime,
+    after: Optional[Checkpoint],
+    batch_size: int = settings.AUDIT_LOG_RETENTION_BATCH_SIZE,
+) -> Tuple[int, Optional[Checkpoint]]:
+    """
+    Delete one batch inside the caller's transaction
+    Returns the number of rows deleted and the new checkpoint
+    """
+    # Give up quickly rather than queue behind, or hold locks for, long statements
+    conn.execute(text("SET LOCAL lock_timeout = '5s'"))
+    conn.execute(text("SET LOCAL statement_timeout = '60s'"))
+    conn.execute(
+        text("SELECT set_config('app.current_organization_id', :org_id, true)"),
+        {"org_id": str(organization_id)}
+    )
+    rows = conn.execute(expired_batch_query(organization_id, cutoff, after, batch_size)).all()
+    if not rows:
+        return 0, after
+    return len(rows), max((row.timestamp, row.id) for row in rows)
+
+
+class RetentionProgress:
+    """
+    Redis checkpoints and progress counters of one retention run
+    A run is identified by its date, re-running the job that day skips the
+    tenants already finished and resumes the others from their checkpoint
+    """
+
+    def __init__(self, redis, run_id: str, ttl: int = 7 * 86400):
+        self.redis = redis
+        self.run_id = run_id
+        self.ttl = ttl
+        self.key = f"audit_retention:{run_id}"
+        self.checkpoints_key = f"{self.key}:checkpoints"
+        self.done_key = f"{self.key}:done"
+
+    def start(self, tenants: int):
+        pipe = self.redis.pipeline()
+        pipe.hset(self.key, mapping={"tenants": tenants})
+        pipe.hsetnx(self.key, "started_at", datetime.utcnow().isoformat())
+        pipe.expire(self.key, self.ttl)
+        pipe.execute()
+
+    def finished_tenants(self) -> set:
+        return self.redis.smembers(self.done_key)
+
+    def checkpoint(self, organization_id) -> Tuple[Optional[Checkpoint], int]:
+        """Last deleted key and rows deleted so far for a tenant"""
+        raw = self.redis.hget(self.checkpoints_key, str(organization_id))
+        if not raw:
+            return None, 0
+        saved = json.loads(raw)
+        after = (datetime.fromisoformat(saved["timestamp"]), uuid.UUID(saved["id"]))
+        return after, saved["deleted"]
+
+    def save(self, organization_id, after: Checkpoint, deleted: int, batch: int):
+        pipe = self.redis.pipeline()
+        pipe.hset(self.checkpoints_key, str(organization_id), json.dumps({
+            "timestamp": after[0].isoformat(),
+            "id": str(after[1]),
+            "deleted": deleted,
+        }))
+        pipe.expire(self.checkpoints_key, self.ttl)
+        pipe.hincrby(self.key, "deleted", batch)
+        pipe.execute()
+
+    def finish(self, organization_id):
+        if self.redis.sadd(self.done_key, str(organization_id)):
+            pipe = self.redis.pipeline()
+            pipe.hincrby(self.key, "tenants_done", 1)
+            pipe.expire(self.done_key, self.ttl)
+            pipe.execute()
+
+    def report(self) -> Dict[str, object]:
+        """Tenants finished out of the total and rows deleted so far"""
+        summary = self.redis.hgetall(self.key)
+        return {
+            "run_id": self.run_id,
+            "started_at": summary.get("started_at"),
+            "tenants": int(summary.get("tenants", 0)),
+            "tenants_done": int(summary.get("tenants_done", 0)),
+            "deleted": int(summary.get("deleted", 0)),
+        }
+
@@ -0,0 +1,155 @@
+import asyncio
+import uuid
+from datetime import datetime
+from itertools import groupby
+from typing import List, Optional
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from src.core.config import settings
+from src.core.metrics import metrics
+from src.database.session import SET_TENANT_SQL, AsyncSessionLocal
+from src.models.base import AuditLog
+
+_STOP = object()
+
+
+def _organization_key(entry: dict) -> str:
+    return str(entry["organization_id"])
+
+
+class AuditLogWriter:
+    """
+    In-process audit log pipeline
+    Requests enqueue rows into a bounded queue, a single worker writes them with
+    one multi-row INSERT per batch, flushing when the batch is full or
+    flush_interval seconds after its first row. Each organization's rows are
+    inserted with its tenant set, as RLS requires
+    """
+
+    def __init__(
+        self,
+        max_queue_size: int = settings.AUDIT_LOG_QUEUE_SIZE,
+        batch_size: int = settings.AUDIT_LOG_BATCH_SIZE,
+        flush_interval: float = settings.AUDIT_LOG_FLUSH_INTERVAL,
+        enqueue_timeout: float = settings.AUDIT_LOG_ENQUEUE_TIMEOUT,
+        session_factory: async_sessionmaker = AsyncSessionLocal,
+    ):
+        self.session_factory = session_factory
+        self.max_queue_size = max_queue_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.enqueue_timeout = enqueue_timeout
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._stopping = False
+
+    @property
+    def running(self) -> bool:
+        return self._worker is not None and not self._stopping
+
+    async def start(self):
+        """Start the flush worker on the running event loop"""
+        if self._worker is not None:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._stopping = False
+        self._worker = asyncio.create_task(self._run())
+
+    async def stop(self, timeout: float = settings.AUDIT_LOG_SHUTDOWN_TIMEOUT):
+        """Stop accepting rows and write everything still queued"""
+        if self._worker is None:
+            return
+        self._stopping = True
+        try:
+            # Queuing the stop marker waits for space too, e.g. while the database
+            # is down, so it counts against the timeout
+            await asyncio.wait_for(self._drain(), timeout)
+        except asyncio.TimeoutError:
+            self._worker.cancel()
+            metrics.inc("audit_log_dropped_total", self._queue.qsize(), reason="shutdown")
+        finally:
+            self._worker = None
+
+    async def _drain(self):
+        await self._queue.put(_STOP)
+        await self._worker
+
+    async def enqueue(self, **entry) -> bool:
+        """
+        Queue one audit row
+        When the queue is full, wait up to enqueue_timeout for space (back-pressure)
+        and drop the row if there is still none
+        """
+        if not self.running:
+            metrics.inc("audit_log_dropped_total", reason="not_running")
+            return False
+
+        entry.setdefault("id", uuid.uuid4())
+        entry.setdefault("timestamp", datetime.utcnow())
+        try:
+            self._queue.put_nowait(entry)
+        except asyncio.QueueFull:
+            if self.enqueue_timeout <= 0:
+                metrics.inc("audit_log_dropped_total", reason="queue_full")
+                return False
+            try:
+                await asyncio.wait_for(self._queue.put(entry), self.enqueue_timeout)
+            except asyncio.TimeoutError:
+                metrics.inc("audit_log_dropped_total", reason="queue_full")
+                return False
+
+        metrics.inc("audit_log_enqueued_total")
+        metrics.set("audit_log_queue_depth", self._queue.qsize())
+        return True
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            item = await self._queue.get()
+            if item is _STOP:
+                return
+            batch = [item]
+            deadline = loop.time() + self.flush_interval
+            stop = False
+
+            while len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(self._queue.get(), timeout)
+                    except asyncio.TimeoutError:
+                        break
+                if item is _STOP:
+                    stop = True
+                    break
+                batch.append(item)
+
+            await self._write(batch)
+            metrics.set("audit_log_queue_depth", self._queue.qsize())
+            if stop:
+                return
+
+    async def _write(self, batch: List[dict]):
+        """Write a batch with a single multi-row INSERT"""
+        try:
+            async with self.session_factory() as db:
+                # One transaction, the tenant is switched before each organization's rows
+                for organization_id, rows in groupby(sorted(batch, key=_organization_key), key=_organization_key):
+                    await db.execute(SET_TENANT_SQL, {"org_id": organization_id})
+                    await db.execute(insert(AuditLog).values(list(rows)))
+                await db.commit()
+            metrics.inc("audit_log_written_total", len(batch))
+            metrics.inc("audit_log_batches_total")
+        except Exception as e:
+            # Don't let a failed batch kill the worker
+            metrics.inc("audit_log_failed_total", len(batch))
+            print(f"Audit log batch error ({len(batch)} rows): {e}")
+
+
+audit_log_writer = AuditLogWriter()
@@ -0,0 +1,112 @@
+import time
+from typing import Awaitable, Callable, Optional
+
+from src.core.config import settings
+from src.core.metrics import metrics
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling the dependency while the breaker is open"""
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker for calls to a shared dependency
+
+    Closed: calls go through, consecutive failures or slow calls are counted.
+    Open: after failure_threshold of them calls fail fast with CircuitOpenError.
+    Half-open: once reset_timeout has passed a single probe call is let through,
+    success closes the breaker, a failure or slow call opens it again.
+
+    Meant for the event loop, state is per worker process
+    """
+
+    CLOSED = "closed"
+    HALF_OPEN = "half_open"
+    OPEN = "open"
+    STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = settings.REDIS_BREAKER_FAILURE_THRESHOLD,
+        slow_call_threshold: float = settings.REDIS_BREAKER_SLOW_CALL_SECONDS,
+        reset_timeout: float = settings.REDIS_BREAKER_RESET_TIMEOUT,
+        timer: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.slow_call_threshold = slow_call_threshold
+        self.reset_timeout = reset_timeout
+        self.timer = timer
+        self.failures = 0
+        self._state = self.CLOSED
+        self._opened_at: Optional[float] = None
+        self._probing = False
+        metrics.set("circuit_breaker_state", 0, breaker=name)
+
+    @property
+    def state(self) -> str:
+        if self._state == self.OPEN and self.timer() - self._opened_at >= self.reset_timeout:
+            self._transition(self.HALF_OPEN)
+        return self._state
+
+    def _transition(self, state: str):
+        self._state = state
+        if state == self.OPEN:
+            self._opened_at = self.timer()
+        elif state == self.CLOSED:
+            self.failures = 0
+        metrics.set("circuit_breaker_state", self.STATE_VALUES[state], breaker=self.name)
+        metrics.inc("circuit_breaker_transitions_total", breaker=self.name, state=state)
+        print(f"Circuit breaker {self.name} is {state}")
+
+    def _allow(self) -> bool:
+        state = self.state
+        if state == self.CLOSED:
+            return True
+        if state == self.HALF_OPEN and not self._probing:
+            self._probing = True
+            return True
+        return False
+
+    def _record_success(self, probe: bool):
+        if probe and self._state == self.HALF_OPEN:
+            self._transition(self.CLOSED)
+        self.failures = 0
+
+    def _record_failure(self):
+        self.failures += 1
+        if self._state == self.HALF_OPEN or (self._state == self.CLOSED and self.failures >= self.failure_threshold):
+            self._transition(self.OPEN)
+
+    async def call(self, func: Callable[..., Awaitable], *args, **kwargs):
+        """Run func through the breaker, errors from func are re-raised"""
+        if not self._allow():
+            metrics.inc("circuit_breaker_rejected_total", breaker=self.name)
+            raise CircuitOpenError(f"Circuit breaker {self.name} is open")
+
+        probe = self._state == self.HALF_OPEN
+        started = self.timer()
+        try:
+            result = await func(*args, **kwargs)
+        except Exception:
+            metrics.inc("circuit_breaker_failures_total", breaker=self.name)
+            self._record_failure()
+            raise
+        finally:
+            if probe:
+                # Also on cancellation, or no probe would ever run again
+                self._probing = False
+
+        if self.timer() - started >= self.slow_call_threshold:
+            # The call worked, but a dependency this slow still counts against it
+            metrics.inc("circuit_breaker_slow_calls_total", breaker=self.name)
+            self._record_failure()
+        else:
+            self._record_success(probe)
+        return result
+
+
+# Guards Redis calls made on the request path
+redis_breaker = CircuitBreaker("redis")
@@ -0,0 +1,466 @@
+import json
+import random
+import smtplib
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from email.message import EmailMessage
+from string import Template
+from typing import Callable, Dict, List, Optional, Tuple
+
+from src.core.config import settings
+from src.core.metrics import metrics
+from src.core.redis_client import sync_redis_client
+from src.core.redis_lock import RedisLock
+
+# Compiled once at import, rendering is a single substitute() per field
+TEMPLATES: Dict[str, Tuple[Template, Template]] = {
+    "welcome": (
+        Template("Welcome to $organization_name"),
+        Template(
+            "Hi,\n\n"
+            "You have been added to $organization_name. Sign in with $email to get started.\n"
+        ),
+    ),
+    "subscription_confirmation": (
+        Template("Your $tier subscription is active"),
+        Template(
+            "Hi,\n\n"
+            "Thanks for subscribing. Your organization is now on the $tier plan.\n"
+        ),
+    ),
+    "invoice": (
+        Template("Your invoice is ready"),
+        Template(
+            "Hi,\n\n"
+            "Your latest invoice is available at $invoice_url\n"
+        ),
+    ),
+}
+
+
+def render_email(template: str, to: str, context: dict, sender: str = settings.SMTP_FROM) -> EmailMessage:
+    """
+    Build a message from one of TEMPLATES
+    Raises KeyError for an unknown template or a missing context value
+    """
+    subject, body = TEMPLATES[template]
+    values = {**context, "email": to}
+    message = EmailMessage()
+    message["From"] = sender
+    message["To"] = to
+    message["Subject"] = subject.substitute(values)
+    message.set_content(body.substitute(values))
+    return message
+
+
+class RateShaper:
+    """
+    Token bucket pacing sends to one provider
+    Holds up to one second of tokens, acquire() sleeps until the next one is
+    available so bursts are smoothed to the provider's rate. A rate of 0
+    disables shaping
+    """
+
+    def __init__(self, rate: float, timer=time.monotonic, sleep=time.sleep):
+        self.rate = rate
+        self.capacity = max(rate, 1.0)
+        self.tokens = self.capacity
+        self.timer = timer
+        self.sleep = sleep
+        self.updated_at = timer()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        if self.rate <= 0:
+            return
+        with self._lock:
+            now = self.timer()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+            self.updated_at = now
+            self.tokens -= 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+        if wait:
+            metrics.inc("email_rate_shaped_seconds_total", wait)
+            self.sleep(wait)
+
+
+# Reserve the next send slot of a provider, GCRA with up to `burst` ms of sends
+# allowed at once. Shared by every worker, Redis' clock
+#
+# KEYS[1] provider key, ARGV[1] interval in ms, ARGV[2] burst in ms
+# Returns the ms to wait before sending
+SHAPE_SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+local tat = tonumber(redis.call('GET', KEYS[1]))
+if not tat or tat < now then
+    tat = now
+end
+local new_tat = tat + tonumber(ARGV[1])
+redis.call('SET', KEYS[1], new_tat, 'PX', math.ceil(new_tat - now) + 1)
+return math.max(0, math.ceil(new_tat - now - tonumber(ARGV[2])))
+"""
+
+
+class SharedRateShaper:
+    """
+    RateShaper whose bucket lives in Redis
+    Every worker sending through the same provider draws from one bucket, so
+    the provider's rate holds however many deliveries run at once
+    """
+
+    key_prefix = "email:rate:"
+
+    def __init__(self, redis, host: str, rate: Optional[float] = None, sleep=time.sleep):
+        self.key = self.key_prefix + host
+        self.rate = provider_rate(host) if rate is None else rate
+        self.sleep = sleep
+        self._script = redis.register_script(SHAPE_SCRIPT)
+
+    def acquire(self):
+        if self.rate <= 0:
+            return
+        interval = 1000 / self.rate
+        wait = self._script(keys=[self.key], args=[interval, max(self.rate, 1.0) * interval]) / 1000
+        if wait:
+            metrics.inc("email_rate_shaped_seconds_total", wait)
+            self.sleep(wait)
+
+
+def provider_rate(host: str) -> float:
+    """Messages per second allowed for an SMTP host, EMAIL_PROVIDER_RATES overrides the default"""
+    return settings.EMAIL_PROVIDER_RATES.get(host, settings.EMAIL_RATE_PER_SECOND)
+
+
+class PooledConnection:
+    def __init__(self, smtp: smtplib.SMTP, timer):
+        self.smtp = smtp
+        self.sent = 0
+        self.last_used = timer()
+
+
+class SMTPConnectionPool:
+    """
+    Persistent SMTP connections for one worker process
+    Connections are kept open between batches, checked with NOOP after being
+    idle for max_idle seconds and replaced after messages_per_connection sends
+    (most providers cap messages per session)
+    """
+
+    def __init__(
+        self,
+        host: str = settings.SMTP_HOST,
+        port: int = settings.SMTP_PORT,
+        user: str = settings.SMTP_USER,
+        password: str = settings.SMTP_PASSWORD,
+        starttls: bool = settings.SMTP_STARTTLS,
+        timeout: float = settings.SMTP_TIMEOUT,
+        size: int = settings.SMTP_POOL_SIZE,
+        messages_per_connection: int = settings.SMTP_MESSAGES_PER_CONNECTION,
+        max_idle: float = settings.SMTP_MAX_IDLE,
+        timer=time.monotonic,
+    ):
+        self.host = host
+        self.port = port
+        self.user = user
+        self.password = password
+        self.starttls = starttls
+        self.timeout = timeout
+        self.size = size
+        self.messages_per_connection = messages_per_connection
+        self.max_idle = max_idle
+        self.timer = timer
+        self._idle: List[PooledConnection] = []
+        self._lock = threading.Lock()
+
+    def _connect(self) -> PooledConnection:
+        smtp = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            if self.starttls:
+                smtp.starttls()
+            if self.user:
+                smtp.login(self.user, self.password)
+        except Exception:
+            self._close(smtp)
+            raise
+        metrics.inc("email_smtp_connections_total")
+        return PooledConnection(smtp, self.timer)
+
+    @staticmethod
+    def _close(smtp: smtplib.SMTP):
+        try:
+            smtp.quit()
+        except (smtplib.SMTPException, OSError):
+            smtp.close()
+
+    def acquire(self) -> PooledConnection:
+        """An idle connection that still answers, or a new one"""
+        while True:
+            with self._lock:
+                conn = self._idle.pop() if self._idle else None
+            if conn is None:
+                return self._connect()
+            if self.timer() - conn.last_used < self.max_idle:
+                return conn
+            try:
+                if conn.smtp.noop()[0] == 250:
+                    return conn
+            except (smtplib.SMTPException, OSError):
+                pass
+            self.discard(conn)
+
+    def release(self, conn: PooledConnection):
+        conn.last_used = self.timer()
+        with self._lock:
+            if conn.sent < self.messages_per_connection and len(self._idle) < self.size:
+                self._idle.append(conn)
+                return
+        self._close(conn.smtp)
+
+    def discard(self, conn: PooledConnection):
+        """Drop a connection after an error, it is not reused"""
+        conn.smtp.close()
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            self._close(conn.smtp)
+
+
+class EmailOutbox:
+    """
+    Redis-backed queue of messages waiting to be sent
+    Producers push JSON items onto a list, deliveries pop them in batches.
+    Messages sent on behalf of an organization go to a list of its own, and
+    on_backlog(organization_id) is called when that list goes from empty to
+    non-empty so a delivery can be scheduled for the tenant. Failed items wait
+    in a sorted set scored by their next attempt and are moved back to their
+    list once due. Items out of attempts go to a dead list
+    """
+
+    def __init__(
+        self,
+        redis,
+        key: str = "email:outbox",
+        on_backlog: Optional[Callable[[str], None]] = None,
+    ):
+        self.redis = redis
+        self.key = key
+        self.retry_key = f"{key}:retry"
+        self.dead_key = f"{key}:dead"
+        self.on_backlog = on_backlog
+
+    def queue_key(self, organization_id: Optional[str] = None) -> str:
+        return f"{self.key}:org:{organization_id}" if organization_id else self.key
+
+    def _push(self, organization_id: Optional[str], items: List[str]):
+        length = self.redis.rpush(self.queue_key(organization_id), *items)
+        if organization_id and self.on_backlog and length == len(items):
+            self.on_backlog(organization_id)
+
+    def enqueue(self, template: str, to: str, context: dict, organization_id: Optional[str] = None) -> str:
+        if template not in TEMPLATES:
+            raise KeyError(f"Unknown email template {template!r}")
+        item_id = uuid.uuid4().hex
+        organization_id = str(organization_id) if organization_id else None
+        item = {
+            "id": item_id,
+            "template": template,
+            "to": to,
+            "context": context,
+            "attempts": 0,
+            "organization_id": organization_id,
+        }
+        self._push(organization_id, [json.dumps(item)])
+        metrics.inc("email_queued_total", template=template)
+        return item_id
+
+    def take(self, count: int, organization_id: Optional[str] = None) -> List[dict]:
+        raw = self.redis.lpop(self.queue_key(organization_id), count)
+        return [json.loads(item) for item in raw or []]
+
+    def pending(self, organization_id: Optional[str] = None) -> int:
+        return self.redis.llen(self.queue_key(organization_id))
+
+    def promote_due(self, now: Optional[float] = None) -> int:
+        """Move retries whose backoff has elapsed back onto their queue"""
+        due = self.redis.zrangebyscore(self.retry_key, "-inf", now or time.time())
+        if not due:
+            return 0
+        # Only the worker whose ZREM succeeds requeues an item
+        pipe = self.redis.pipeline()
+        for item in due:
+            pipe.zrem(self.retry_key, item)
+        removed = [item for item, ok in zip(due, pipe.execute()) if ok]
+        by_organization: Dict[Optional[str], List[str]] = {}
+        for item in removed:
+            by_organization.setdefault(json.loads(item).get("organization_id"), []).append(item)
+        for organization_id, items in by_organization.items():
+            self._push(organization_id, items)
+        return len(removed)
+
+    def retry(self, items: List[Tuple[dict, float]], now: Optional[float] = None):
+        if not items:
+            return
+        now = now or time.time()
+        self.redis.zadd(self.retry_key, {json.dumps(item): now + delay for item, delay in items})
+
+    def dead(self, items: List[Tuple[dict, str]]):
+        if not items:
+            return
+        self.redis.rpush(self.dead_key, *(json.dumps({**item, "error": error}) for item, error in items))
+
+    def size(self) -> Dict[str, int]:
+        pipe = self.redis.pipeline()
+        pipe.llen(self.key)
+        pipe.zcard(self.retry_key)
+        pipe.llen(self.dead_key)
+        queued, retrying, dead = pipe.execute()
+        return {"queued": queued, "retrying": retrying, "dead": dead}
+
+
+@dataclass
+class BatchResult:
+    sent: List[dict] = field(default_factory=list)
+    retry: List[Tuple[dict, float]] = field(default_factory=list)
+    dead: List[Tuple[dict, str]] = field(default_factory=list)
+
+
+class EmailDispatcher:
+    """
+    Sends outbox batches over pooled SMTP connections
+    Each batch reuses one connection, paced by the provider's RateShaper.
+    4xx replies and dropped connections are retried with exponential backoff
+    and jitter, 5xx replies are permanent. Without SMTP_HOST messages are
+    printed instead of sent
+    """
+
+    def __init__(
+        self,
+        outbox: EmailOutbox,
+        pool: Optional[SMTPConnectionPool],
+        shaper: Optional[RateShaper] = None,
+        batch_size: int = settings.EMAIL_BATCH_SIZE,
+        max_retries: int = settings.EMAIL_MAX_RETRIES,
+        backoff: float = settings.EMAIL_RETRY_BACKOFF,
+    ):
+        self.outbox = outbox
+        self.pool = pool
+        self.shaper = shaper or RateShaper(provider_rate(pool.host) if pool else 0)
+        self.batch_size = batch_size
+        self.max_retries = max_retries
+        self.backoff = backoff
+
+    def _retry_delay(self, attempts: int) -> float:
+        return self.backoff * 2 ** (attempts - 1) * random.uniform(0.5, 1.0)
+
+    def _failed(self, result: BatchResult, item: dict, error: str, permanent: bool = False):
+        item = {**item, "attempts": item["attempts"] + 1}
+        if permanent or item["attempts"] > self.max_retries:
+            result.dead.append((item, error))
+        else:
+            result.retry.append((item, self._retry_delay(item["attempts"])))
+
+    def send_batch(self, items: List[dict]) -> BatchResult:
+        result = BatchResult()
+        conn = None
+        for index, item in enumerate(items):
+            try:
+                message = render_email(item["template"], item["to"], item["context"])
+            except (KeyError, ValueError) as e:
+                result.dead.append((item, f"Render failed: {e}"))
+                continue
+
+            if self.pool is None:
+                print(f"Sending {item['template']} email to {item['to']}: {message['Subject']}")
+                result.sent.append(item)
+                continue
+
+            self.shaper.acquire()
+            if conn is None:
+                try:
+                    conn = self.pool.acquire()
+                except (smtplib.SMTPException, OSError) as e:
+                    # Provider unreachable, the rest of the batch waits for the next attempt
+                    for pending in items[index:]:
+                        self._failed(result, pending, f"Connect failed: {e}")
+                    break
+
+            try:
+                conn.smtp.send_message(message)
+            except smtplib.SMTPRecipientsRefused as e:
+                code, reply = next(iter(e.recipients.values()))
+                self._failed(result, item, f"{code} {reply!r}", permanent=code >= 500)
+            except smtplib.SMTPResponseException as e:
+                self._failed(result, item, f"{e.smtp_code} {e.smtp_error!r}", permanent=e.smtp_code >= 500)
+            except (smtplib.SMTPServerDisconnected, OSError) as e:
+                self.pool.discard(conn)
+                conn = None
+                self._failed(result, item, f"Disconnected: {e}")
+            except smtplib.SMTPException as e:
+                self._failed(result, item, str(e))
+            else:
+                conn.sent += 1
+                result.sent.append(item)
+                if conn.sent >= self.pool.messages_per_connection:
+                    self.pool.release(conn)
+                    conn = None
+
+        if conn is not None:
+            self.pool.release(conn)
+        return result
+
+    def run(
+        self,
+        max_batches: int = settings.EMAIL_MAX_BATCHES_PER_RUN,
+        lock: Optional[RedisLock] = None,
+        organization_id: Optional[str] = None,
+    ) -> Dict[str, int]:
+        """
+        Drain up to max_batches from the shared outbox, or an organization's
+        With a lock, it is renewed before every batch and the run stops once it is lost.
+        Due retries are promoted by runs of the shared outbox only
+        """
+        totals = {"sent": 0, "retried": 0, "dead": 0}
+        if organization_id is None:
+            self.outbox.promote_due()
+        for _ in range(max_batches):
+            if lock and not lock.renew():
+                break
+            items = self.outbox.take(self.batch_size, organization_id)
+            if not items:
+                break
+            try:
+                result = self.send_batch(items)
+            except Exception:
+                # Popped items must not be lost
+                self.outbox.retry([(item, self.backoff) for item in items])
+                raise
+            self.outbox.retry(result.retry)
+            self.outbox.dead(result.dead)
+            totals["sent"] += len(result.sent)
+            totals["retried"] += len(result.retry)
+            totals["dead"] += len(result.dead)
+        metrics.inc("email_sent_total", totals["sent"])
+        metrics.inc("email_retried_total", totals["retried"])
+        metrics.inc("email_dead_total", totals["dead"])
+        return totals
+
+
+email_outbox = EmailOutbox(sync_redis_client)
+email_dispatcher = EmailDispatcher(
+    email_outbox,
+    SMTPConnectionPool() if settings.SMTP_HOST else None,
+    SharedRateShaper(sync_redis_client, settings.SMTP_HOST) if settings.SMTP_HOST else None,
+)
+
+
+def queue_email(template: str, to: str, organization_id: Optional[str] = None, **context) -> str:
+    """
+    Queue a templated message for the next delivery run
+    With an organization it is delivered by a per-tenant job on the tenant scheduler
+    """
+    return email_outbox.enqueue(template, to, context, organization_id)
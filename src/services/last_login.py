@@ -0,0 +1,94 @@
+import uuid
+from datetime import datetime
+from typing import Dict, Optional, Set
+
+from sqlalchemy import DateTime, column, or_, update, values
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from src.core.config import settings
+from src.core.metrics import metrics
+from src.database.session import AsyncSessionLocal
+from src.models.base import User
+from src.services.tenant_cache import TenantCache, tenant_cache
+
+
+class LastLoginRecorder:
+    """
+    Deferred last_login writes
+    Logins record a timestamp in memory (one entry per user, the latest wins),
+    flush() writes them with one UPDATE ... FROM (VALUES ...) per batch and
+    invalidates the cached responses of the organizations it touched.
+    At most max_pending users are held, further logins are dropped while the
+    database can't be reached
+    Run periodically from the application lifespan
+    """
+
+    def __init__(
+        self,
+        batch_size: int = settings.LAST_LOGIN_BATCH_SIZE,
+        max_pending: int = settings.LAST_LOGIN_MAX_PENDING,
+        session_factory: async_sessionmaker = AsyncSessionLocal,
+        cache: TenantCache = tenant_cache,
+    ):
+        self.batch_size = batch_size
+        self.max_pending = max_pending
+        self.session_factory = session_factory
+        self.cache = cache
+        self._pending: Dict[uuid.UUID, datetime] = {}
+
+    def _keep(self, user_id: uuid.UUID, at: datetime):
+        if user_id not in self._pending and len(self._pending) >= self.max_pending:
+            metrics.inc("last_login_dropped_total")
+            return
+        self._pending[user_id] = at
+
+    def record(self, user_id, at: Optional[datetime] = None):
+        """Remember a login, written on the next flush"""
+        self._keep(uuid.UUID(str(user_id)), at or datetime.utcnow())
+        metrics.set("last_login_pending", len(self._pending))
+
+    async def flush(self):
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, {}
+        rows = list(pending.items())
+        organizations: Set[uuid.UUID] = set()
+        try:
+            async with self.session_factory() as db:
+                for i in range(0, len(rows), self.batch_size):
+                    result = await db.execute(self._update(rows[i:i + self.batch_size]))
+                    organizations.update(result.scalars())
+                await db.commit()
+        except Exception:
+            # Keep them for the next flush, unless a newer login was recorded meanwhile
+            for user_id, at in pending.items():
+                if self._pending.get(user_id, at) <= at:
+                    self._keep(user_id, at)
+            metrics.set("last_login_pending", len(self._pending))
+            raise
+        metrics.inc("last_login_written_total", len(rows))
+        metrics.set("last_login_pending", len(self._pending))
+        # /users/me responses embed last_login
+        for organization_id in organizations:
+            await self.cache.invalidate(organization_id)
+
+    @staticmethod
+    def _update(rows):
+        logins = values(
+            column("id", UUID(as_uuid=True)),
+            column("last_login", DateTime),
+            name="logins"
+        ).data(rows)
+        # Never move last_login backwards, e.g. when a retried flush lands late
+        return (
+            update(User)
+            .where(User.id == logins.c.id)
+            .where(or_(User.last_login.is_(None), User.last_login < logins.c.last_login))
+            .values(last_login=logins.c.last_login)
+            .returning(User.organization_id)
+            .execution_options(synchronize_session=False)
+        )
+
+
+last_login_recorder = LastLoginRecorder()
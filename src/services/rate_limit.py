@@ -0,0 +1,321 @@
+import math
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict
+
+from src.core.cache import LRUCache
+from src.core.config import settings
+from src.core.metrics import metrics
+from src.core.redis_client import redis_client
+from src.models.base import SubscriptionTier
+from src.services.circuit_breaker import CircuitBreaker, CircuitOpenError, redis_breaker
+
+# Generic cell rate algorithm (GCRA)
+# The only state per key is the theoretical arrival time (TAT) of the next
+# request, so memory is constant however many requests a tenant sends.
+# Runs atomically in Redis with Redis' own clock, one round trip per call.
+#
+# KEYS[1] key, ARGV[1] limit, ARGV[2] period in ms, ARGV[3] cost,
+# ARGV[4] 1 to record requests that were already admitted elsewhere (never denies)
+# Returns {allowed, remaining, reset_after_ms, retry_after_ms, now_ms}
+GCRA_SCRIPT = """
+local limit = tonumber(ARGV[1])
+local period = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local force = tonumber(ARGV[4]) == 1
+local interval = period / limit
+
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+
+local tat = tonumber(redis.call('GET', KEYS[1]))
+if not tat or tat < now then
+    tat = now
+end
+
+local new_tat = tat + interval * cost
+local allow_at = new_tat - period
+if allow_at > now and not force then
+    return {0, 0, math.ceil(tat - now), math.ceil(allow_at - now), now}
+end
+
+if new_tat > now then
+    redis.call('SET', KEYS[1], new_tat, 'PX', math.ceil(new_tat - now))
+end
+local remaining = math.max(0, math.floor((period - (new_tat - now)) / interval))
+return {1, remaining, math.ceil(new_tat - now), 0, now}
+"""
+
+
+def rate_limit_for_tier(tier: SubscriptionTier) -> int:
+    """Requests per window allowed for a subscription tier"""
+    return {
+        SubscriptionTier.FREE: settings.RATE_LIMIT_FREE_TIER,
+        SubscriptionTier.PRO: settings.RATE_LIMIT_PRO_TIER,
+        SubscriptionTier.ENTERPRISE: settings.RATE_LIMIT_ENTERPRISE_TIER,
+    }.get(tier, settings.RATE_LIMIT_FREE_TIER)
+
+
+@dataclass
+class RateLimitResult:
+    allowed: bool
+    limit: int
+    remaining: int
+    reset_after: float  # seconds until the window is fully replenished
+    retry_after: float  # seconds until the next request is allowed, 0 if allowed
+    now: float  # limiter clock, epoch seconds
+
+    @property
+    def headers(self) -> dict:
+        headers = {
+            "X-RateLimit-Limit": str(self.limit),
+            "X-RateLimit-Remaining": str(max(self.remaining, 0)),
+            "X-RateLimit-Reset": str(math.ceil(self.now + self.reset_after)),
+        }
+        if not self.allowed:
+            headers["Retry-After"] = str(max(math.ceil(self.retry_after), 1))
+        return headers
+
+    @classmethod
+    def from_script(cls, limit: int, reply) -> "RateLimitResult":
+        allowed, remaining, reset_after_ms, retry_after_ms, now_ms = (int(v) for v in reply)
+        return cls(
+            allowed=bool(allowed),
+            limit=limit,
+            remaining=remaining,
+            reset_after=reset_after_ms / 1000,
+            retry_after=retry_after_ms / 1000,
+            now=now_ms / 1000,
+        )
+
+
+class RedisRateLimiter:
+    """
+    Strict per-key limiter, every request is checked against Redis
+    Allows `limit` requests per `period` seconds with bursts up to `limit`
+    """
+
+    key_prefix = "rate_limit:gcra:"
+
+    def __init__(
+        self,
+        redis,
+        period: int = settings.RATE_LIMIT_WINDOW_SECONDS,
+        breaker: CircuitBreaker = redis_breaker,
+    ):
+        self.period = period
+        self.breaker = breaker
+        self._script = redis.register_script(GCRA_SCRIPT)
+
+    async def hit(self, key: str, limit: int, cost: int = 1) -> RateLimitResult:
+        reply = await self.breaker.call(
+            self._script, keys=[self.key_prefix + key], args=[limit, self.period * 1000, cost, 0]
+        )
+        return RateLimitResult.from_script(limit, reply)
+
+
+@dataclass
+class _LocalBucket:
+    limit: int
+    tokens: int = 0  # requests this worker may still admit before syncing
+    pending: int = 0  # admitted since the last sync, not yet recorded in Redis
+    remaining: int = 0  # global remaining as of the last sync
+    reset_after: float = 0.0
+    now: float = 0.0  # Redis clock at the last sync
+    synced_at: float = 0.0  # local monotonic time of the last sync
+    used_at: float = 0.0
+
+
+class HybridRateLimiter:
+    """
+    Per-worker token buckets reconciled with the shared GCRA state in batches
+
+    After each sync a worker may admit up to limit * error_bound requests on
+    its own (never more than the global remaining). Admitted requests are
+    recorded in Redis on the next sync, which happens when the local
+    allowance runs out or every sync_interval seconds via flush(). The
+    global limit can be exceeded by at most limit * error_bound per worker
+    between syncs, in exchange for one Redis call per batch instead of one
+    per request. Only syncs go through the circuit breaker, requests answered
+    from the local allowance never touch Redis
+    """
+
+    def __init__(
+        self,
+        redis,
+        period: int = settings.RATE_LIMIT_WINDOW_SECONDS,
+        sync_interval: float = settings.RATE_LIMIT_SYNC_INTERVAL,
+        error_bound: float = settings.RATE_LIMIT_HYBRID_ERROR_BOUND,
+        breaker: CircuitBreaker = redis_breaker,
+    ):
+        self.redis = redis
+        self.period = period
+        self.sync_interval = sync_interval
+        self.error_bound = error_bound
+        self.breaker = breaker
+        self._script = redis.register_script(GCRA_SCRIPT)
+        self._buckets: Dict[str, _LocalBucket] = {}
+
+    def _allowance(self, limit: int) -> int:
+        return max(1, int(limit * self.error_bound))
+
+    def _apply(self, bucket: _LocalBucket, reply):
+        result = RateLimitResult.from_script(bucket.limit, reply)
+        bucket.remaining = result.remaining
+        bucket.reset_after = result.reset_after
+        bucket.now = result.now
+        bucket.synced_at = time.monotonic()
+        # Requests admitted while the call was in flight come out of the new allowance
+        bucket.tokens = min(result.remaining, self._allowance(bucket.limit)) - bucket.pending
+
+    async def _sync(self, key: str, bucket: _LocalBucket):
+        """Record pending requests in Redis and refresh the local allowance"""
+        # Taken before awaiting so concurrent syncs never report the same requests twice
+        recorded, bucket.pending = bucket.pending, 0
+        try:
+            reply = await self.breaker.call(
+                self._script,
+                keys=[RedisRateLimiter.key_prefix + key],
+                args=[bucket.limit, self.period * 1000, recorded, 1]
+            )
+        except Exception:
+            bucket.pending += recorded
+            raise
+        self._apply(bucket, reply)
+
+    async def hit(self, key: str, limit: int) -> RateLimitResult:
+        now = time.monotonic()
+        bucket = self._buckets.get(key)
+        if bucket is None or bucket.limit != limit:
+            bucket = self._buckets[key] = _LocalBucket(limit=limit, pending=bucket.pending if bucket else 0)
+            await self._sync(key, bucket)
+        elif bucket.tokens <= 0 or now - bucket.synced_at >= self.sync_interval:
+            await self._sync(key, bucket)
+        bucket.used_at = now
+
+        elapsed = max(time.monotonic() - bucket.synced_at, 0)
+        if bucket.tokens <= 0:
+            return RateLimitResult(
+                allowed=False,
+                limit=limit,
+                remaining=0,
+                reset_after=max(bucket.reset_after - elapsed, 0),
+                retry_after=self.period / limit,
+                now=bucket.now + elapsed,
+            )
+
+        bucket.tokens -= 1
+        bucket.pending += 1
+        return RateLimitResult(
+            allowed=True,
+            limit=limit,
+            remaining=max(bucket.remaining - bucket.pending, 0),
+            reset_after=min(bucket.reset_after - elapsed + bucket.pending * self.period / limit, self.period),
+            retry_after=0,
+            now=bucket.now + elapsed,
+        )
+
+    async def flush(self):
+        """
+        Reconcile every bucket with pending requests in one pipeline
+        Buckets idle for a whole window are dropped
+        """
+        now = time.monotonic()
+        for key in [k for k, b in self._buckets.items() if not b.pending and now - b.used_at > self.period]:
+            del self._buckets[key]
+
+        dirty = [(key, bucket, bucket.pending) for key, bucket in self._buckets.items() if bucket.pending]
+        if not dirty:
+            return
+        for key, bucket, recorded in dirty:
+            bucket.pending -= recorded
+        try:
+            replies = await self.breaker.call(self._record, dirty)
+        except Exception:
+            # Report them again on the next sync
+            for key, bucket, recorded in dirty:
+                bucket.pending += recorded
+            raise
+        for (key, bucket, recorded), reply in zip(dirty, replies):
+            self._apply(bucket, reply)
+
+    async def _record(self, dirty):
+        async with self.redis.pipeline() as pipe:
+            for key, bucket, recorded in dirty:
+                await self._script(
+                    keys=[RedisRateLimiter.key_prefix + key],
+                    args=[bucket.limit, self.period * 1000, recorded, 1],
+                    client=pipe
+                )
+            return await pipe.execute()
+
+
+class LocalRateLimiter:
+    """
+    In-process GCRA used while Redis is unavailable
+    Each worker enforces limit / RATE_LIMIT_DEGRADED_WORKERS on its own, so the
+    shared limit is only approximated until Redis is back
+    """
+
+    def __init__(
+        self,
+        period: int = settings.RATE_LIMIT_WINDOW_SECONDS,
+        workers: int = settings.RATE_LIMIT_DEGRADED_WORKERS,
+        maxsize: int = settings.RATE_LIMIT_DEGRADED_MAX_KEYS,
+        timer: Callable[[], float] = time.time,
+    ):
+        self.period = period
+        self.workers = max(1, workers)
+        self.timer = timer
+        # Entries expire with their TAT, the LRU bound caps memory during long outages
+        self._tats = LRUCache(maxsize=maxsize, timer=timer)
+
+    def hit(self, key: str, limit: int, cost: int = 1) -> RateLimitResult:
+        share = max(1, limit // self.workers)
+        interval = self.period / share
+        now = self.timer()
+        tat = max(self._tats.get(key, now), now)
+
+        new_tat = tat + interval * cost
+        allow_at = new_tat - self.period
+        if allow_at > now:
+            return RateLimitResult(
+                allowed=False, limit=limit, remaining=0,
+                reset_after=tat - now, retry_after=allow_at - now, now=now,
+            )
+
+        self._tats.set(key, new_tat, expires_at=new_tat)
+        return RateLimitResult(
+            allowed=True, limit=limit,
+            remaining=max(0, int((self.period - (new_tat - now)) / interval)),
+            reset_after=new_tat - now, retry_after=0, now=now,
+        )
+
+
+strict_rate_limiter = RedisRateLimiter(redis_client)
+hybrid_rate_limiter = HybridRateLimiter(redis_client)
+local_rate_limiter = LocalRateLimiter()
+
+
+def get_rate_limiter(tier: SubscriptionTier):
+    """Hybrid limiter for the tiers configured for it, strict otherwise"""
+    if settings.RATE_LIMIT_HYBRID_ENABLED and tier.value in settings.RATE_LIMIT_HYBRID_TIERS:
+        return hybrid_rate_limiter
+    return strict_rate_limiter
+
+
+async def check_rate_limit(organization_id: str, tier: SubscriptionTier) -> RateLimitResult:
+    """
+    Count a request against an organization's limit
+    The limiters call Redis through the circuit breaker, while Redis is failing
+    or slow requests are limited in-process instead of waiting on socket timeouts
+    """
+    limit = rate_limit_for_tier(tier)
+    try:
+        return await get_rate_limiter(tier).hit(organization_id, limit)
+    except CircuitOpenError:
+        pass
+    except Exception as e:
+        print(f"Rate limiter error: {e}")
+    metrics.inc("rate_limit_degraded_total")
+    return local_rate_limiter.hit(organization_id, limit)
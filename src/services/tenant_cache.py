@@ -0,0 +1,123 @@
+from typing import Awaitable, Callable, Optional, Type, TypeVar
+
+from pydantic import BaseModel
+
+from src.core.cache import LRUCache
+from src.core.config import settings
+from src.core.metrics import metrics
+from src.core.redis_client import redis_client
+from src.services.circuit_breaker import CircuitBreaker, redis_breaker
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+
+class TenantCache:
+    """
+    Read-through cache for per-organization API responses
+    Entries are response models, kept in an in-process LRU and serialized as
+    JSON in Redis under keys that embed the organization's cache version
+
+    Invalidating an organization bumps its version in Redis, which orphans
+    every entry of the previous version at once, orphaned entries expire on
+    their own. Workers re-read the version every TENANT_CACHE_VERSION_TTL
+    seconds, so other workers may serve the previous version that long
+
+    While the Redis circuit breaker is open nothing is cached, reads go
+    straight to the loader because invalidations can't be seen
+    """
+
+    def __init__(
+        self,
+        redis,
+        ttl: int = settings.TENANT_CACHE_TTL,
+        local_ttl: float = settings.TENANT_CACHE_LOCAL_TTL,
+        version_ttl: float = settings.TENANT_CACHE_VERSION_TTL,
+        maxsize: int = settings.TENANT_CACHE_MAX_SIZE,
+        breaker: CircuitBreaker = redis_breaker,
+    ):
+        self.redis = redis
+        self.ttl = ttl
+        self.breaker = breaker
+        self._local = LRUCache(maxsize=maxsize, ttl=local_ttl)
+        self._versions = LRUCache(maxsize=maxsize, ttl=version_ttl)
+
+    @staticmethod
+    def version_key(organization_id: str) -> str:
+        return f"tenant:{organization_id}:version"
+
+    @staticmethod
+    def entry_key(organization_id: str, version: int, name: str) -> str:
+        return f"tenant:{organization_id}:v{version}:{name}"
+
+    async def _version(self, organization_id: str) -> int:
+        version = self._versions.get(organization_id)
+        if version is None:
+            version = int(await self.breaker.call(self.redis.get, self.version_key(organization_id)) or 0)
+            self._versions.set(organization_id, version)
+        return version
+
+    async def get(
+        self,
+        organization_id,
+        name: str,
+        model: Type[ModelT],
+        loader: Callable[[], Awaitable[Optional[object]]],
+    ) -> Optional[ModelT]:
+        """
+        Return the cached `name` entry of an organization, loading it on a miss
+        loader returns an ORM object or model to validate into `model`, or None
+        when there is nothing to cache (e.g. the row doesn't exist)
+        """
+        organization_id = str(organization_id)
+        try:
+            version = await self._version(organization_id)
+        except Exception:
+            metrics.inc("tenant_cache_requests_total", result="bypass")
+            return await self._load(model, loader)
+
+        local_key = (organization_id, version, name)
+        value = self._local.get(local_key)
+        if value is not None:
+            metrics.inc("tenant_cache_requests_total", result="local_hit")
+            return value
+
+        key = self.entry_key(organization_id, version, name)
+        try:
+            payload = await self.breaker.call(self.redis.get, key)
+        except Exception:
+            payload = None
+        if payload is not None:
+            metrics.inc("tenant_cache_requests_total", result="redis_hit")
+            value = model.model_validate_json(payload)
+            self._local.set(local_key, value)
+            return value
+
+        metrics.inc("tenant_cache_requests_total", result="miss")
+        value = await self._load(model, loader)
+        if value is None:
+            return None
+        self._local.set(local_key, value)
+        try:
+            await self.breaker.call(self.redis.set, key, value.model_dump_json(), ex=self.ttl)
+        except Exception as e:
+            print(f"Tenant cache write error: {e}")
+        return value
+
+    @staticmethod
+    async def _load(model: Type[ModelT], loader) -> Optional[ModelT]:
+        obj = await loader()
+        return model.model_validate(obj) if obj is not None else None
+
+    async def invalidate(self, organization_id):
+        """Drop every cached entry of an organization after a write"""
+        organization_id = str(organization_id)
+        self._versions.pop(organization_id)
+        try:
+            version = await self.redis.incr(self.version_key(organization_id))
+            self._versions.set(organization_id, version)
+        except Exception as e:
+            # Worst case other workers serve stale entries until they expire
+            print(f"Tenant cache invalidation error: {e}")
+
+
+tenant_cache = TenantCache(redis_client)
@@ -0,0 +1,94 @@
+from typing import Optional
+
+from sqlalchemy import select
+
+from src.core.cache import LRUCache
+from src.core.config import settings
+from src.core.redis_client import redis_client
+from src.database.session import AsyncSessionLocal
+from src.models.base import Organization, SubscriptionTier
+from src.services.circuit_breaker import CircuitBreaker, redis_breaker
+
+
+class OrganizationTierCache:
+    """
+    Two-level cache of organization subscription tiers
+    An in-process TTL/LRU map in front of a Redis hash per organization,
+    the database is only hit when both miss
+
+    Invalidation clears this worker's entry and the Redis hash, other workers
+    pick up the change once their local entry expires (TIER_CACHE_LOCAL_TTL)
+
+    Lookups go through the Redis circuit breaker, while it is open the Redis
+    layer is skipped and misses are answered by the database
+    """
+
+    def __init__(
+        self,
+        redis,
+        local_ttl: float = settings.TIER_CACHE_LOCAL_TTL,
+        redis_ttl: int = settings.REDIS_CACHE_TTL,
+        maxsize: int = settings.TIER_CACHE_MAX_SIZE,
+        breaker: CircuitBreaker = redis_breaker,
+    ):
+        self.redis = redis
+        self.breaker = breaker
+        self.redis_ttl = redis_ttl
+        self._local = LRUCache(maxsize=maxsize, ttl=local_ttl)
+
+    @staticmethod
+    def redis_key(organization_id: str) -> str:
+        return f"org:{organization_id}:meta"
+
+    async def get_tier(self, organization_id: str) -> SubscriptionTier:
+        tier = self._local.get(organization_id)
+        if tier is not None:
+            return tier
+
+        key = self.redis_key(organization_id)
+        try:
+            value = await self.breaker.call(self.redis.hget, key, "tier")
+            redis_available = True
+        except Exception:
+            value, redis_available = None, False
+
+        if value is None:
+            value = await self._load_tier(organization_id)
+            if value is None:
+                # Unknown organization, fall back to the most restrictive tier
+                return SubscriptionTier.FREE
+            if redis_available:
+                try:
+                    await self.breaker.call(self._store_tier, key, value)
+                except Exception as e:
+                    print(f"Tier cache write error: {e}")
+
+        tier = SubscriptionTier(value)
+        self._local.set(organization_id, tier)
+        return tier
+
+    async def _store_tier(self, key: str, value: str):
+        async with self.redis.pipeline() as pipe:
+            pipe.hset(key, "tier", value)
+            pipe.expire(key, self.redis_ttl)
+            await pipe.execute()
+
+    async def _load_tier(self, organization_id: str) -> Optional[str]:
+        async with AsyncSessionLocal() as db:
+            tier = (await db.execute(
+                select(Organization.subscription_tier).where(Organization.id == organization_id)
+            )).scalar()
+        return tier.value if tier is not None else None
+
+    async def invalidate(self, organization_id: str):
+        """Drop an organization's cached tier after it changes"""
+        organization_id = str(organization_id)
+        self._local.pop(organization_id)
+        try:
+            await self.redis.delete(self.redis_key(organization_id))
+        except Exception as e:
+            # Worst case the old tier is served until the Redis key expires
+            print(f"Tier cache invalidation error: {e}")
+
+
+tier_cache = OrganizationTierCache(redis_client)
@@ -0,0 +1,187 @@
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List, Tuple
+
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.engine import Engine
+
+from src.core.config import settings
+from src.core.metrics import metrics
+from src.core.redis_client import redis_client
+from src.core.redis_lock import RedisLock
+from src.models.base import UsageHourly
+from src.services.circuit_breaker import CircuitBreaker, redis_breaker
+
+KEY_PREFIX = "usage:"
+PENDING_KEY = "usage:pending"  # hashes with increments not rolled up yet
+CLAIMED_KEY = "usage:claimed"  # hashes taken by a rollup, kept until committed
+LOCK_KEY = "usage:rollup:lock"  # one rollup at a time, the upsert adds to stored counts
+HOUR_FORMAT = "%Y%m%d%H"
+
+# (organization id, hour, "METHOD /route/template")
+Counter = Tuple[str, str, str]
+
+# Take a hash for the rollup. Increments that arrive afterwards start a new
+# hash, a claim left over from a failed rollup absorbs the new counts
+#
+# KEYS[1] pending set, KEYS[2] claimed set, KEYS[3] hash, KEYS[4] claimed hash
+CLAIM_SCRIPT = """
+redis.call('SREM', KEYS[1], KEYS[3])
+if redis.call('EXISTS', KEYS[3]) == 0 then
+    return 0
+end
+if redis.call('EXISTS', KEYS[4]) == 0 then
+    redis.call('RENAME', KEYS[3], KEYS[4])
+    redis.call('PERSIST', KEYS[4])
+else
+    local fields = redis.call('HGETALL', KEYS[3])
+    for i = 1, #fields, 2 do
+        redis.call('HINCRBY', KEYS[4], fields[i], fields[i + 1])
+    end
+    redis.call('DEL', KEYS[3])
+end
+redis.call('SADD', KEYS[2], KEYS[4])
+return 1
+"""
+
+
+def usage_key(organization_id: str, hour: str) -> str:
+    """Redis hash of request counts per "METHOD route" for an organization and hour"""
+    return f"{KEY_PREFIX}{organization_id}:{hour}"
+
+
+class UsageMeter:
+    """
+    Per-tenant request accounting
+    Requests increment an in-process counter per organization, hour and route,
+    flush() adds them to a Redis hash per organization and hour with pipelined
+    HINCRBYs. The rollup task moves the hashes into usage_hourly, nothing is
+    written to the database on the request path
+    Run periodically from the application lifespan
+    """
+
+    def __init__(
+        self,
+        redis,
+        key_ttl: int = settings.USAGE_KEY_TTL,
+        breaker: CircuitBreaker = redis_breaker,
+        clock=datetime.utcnow,
+    ):
+        self.redis = redis
+        self.key_ttl = key_ttl
+        self.breaker = breaker
+        self.clock = clock
+        self._pending: Dict[Counter, int] = defaultdict(int)
+
+    def record(self, organization_id: str, method: str, route: str):
+        self._pending[(organization_id, self.clock().strftime(HOUR_FORMAT), f"{method} {route}")] += 1
+
+    async def flush(self):
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, defaultdict(int)
+        try:
+            await self.breaker.call(self._write, pending)
+        except Exception:
+            # Keep the counts for the next flush
+            for counter, count in pending.items():
+                self._pending[counter] += count
+            metrics.set("usage_pending_counters", len(self._pending))
+            raise
+        metrics.inc("usage_requests_flushed_total", sum(pending.values()))
+        metrics.set("usage_pending_counters", len(self._pending))
+
+    async def _write(self, pending: Dict[Counter, int]):
+        keys = set()
+        # MULTI, so a rollup never claims a hash between its HINCRBY and SADD
+        async with self.redis.pipeline(transaction=True) as pipe:
+            for (organization_id, hour, field), count in pending.items():
+                key = usage_key(organization_id, hour)
+                pipe.hincrby(key, field, count)
+                keys.add(key)
+            for key in keys:
+                pipe.expire(key, self.key_ttl)
+            pipe.sadd(PENDING_KEY, *keys)
+            await pipe.execute()
+
+
+def _rows(claimed_key: str, counts: Dict[str, str]) -> List[dict]:
+    _, organization_id, hour, _ = claimed_key.split(":")
+    hour = datetime.strptime(hour, HOUR_FORMAT)
+    rows = []
+    for field, count in counts.items():
+        method, route = field.split(" ", 1)
+        rows.append({
+            "organization_id": organization_id,
+            "hour": hour,
+            "method": method,
+            "route": route,
+            "request_count": int(count),
+        })
+    return rows
+
+
+def _upsert(rows: List[dict]):
+    statement = insert(UsageHourly).values(rows)
+    return statement.on_conflict_do_update(
+        index_elements=[UsageHourly.organization_id, UsageHourly.hour, UsageHourly.method, UsageHourly.route],
+        set_={"request_count": UsageHourly.request_count + statement.excluded.request_count}
+    )
+
+
+def rollup_usage(
+    engine: Engine,
+    redis,
+    batch_size: int = settings.USAGE_ROLLUP_BATCH_SIZE,
+    lock_ttl: int = settings.USAGE_ROLLUP_LOCK_TTL,
+) -> int:
+    """
+    Move pending usage hashes from Redis into usage_hourly
+    Hashes are claimed first, then written batch_size hashes at a time with one
+    INSERT ... ON CONFLICT DO UPDATE adding to the stored counts, and deleted
+    once committed. A failed rollup leaves its claims for the next run, counts
+    are applied at least once
+    Runs hold a Redis lock, renewed before each batch, so overlapping runs never
+    add the same claims twice. A run that finds the lock taken does nothing
+    Returns the number of usage_hourly rows written
+    """
+    lock = RedisLock(redis, LOCK_KEY, lock_ttl)
+    if not lock.acquire():
+        metrics.inc("usage_rollup_skipped_total")
+        return 0
+    try:
+        written = _rollup_claims(engine, redis, batch_size, lock)
+    finally:
+        lock.release()
+    metrics.inc("usage_rollup_rows_total", written)
+    return written
+
+
+def _rollup_claims(engine: Engine, redis, batch_size: int, lock: RedisLock) -> int:
+    claim = redis.register_script(CLAIM_SCRIPT)
+    for key in redis.smembers(PENDING_KEY):
+        claim(keys=[PENDING_KEY, CLAIMED_KEY, key, f"{key}:claimed"])
+
+    claimed = sorted(redis.smembers(CLAIMED_KEY))
+    written = 0
+    for i in range(0, len(claimed), batch_size):
+        keys = claimed[i:i + batch_size]
+        if not lock.renew():
+            # Expired and possibly taken by another run, leave the rest to it
+            raise RuntimeError("Usage rollup lock lost")
+        pipe = redis.pipeline(transaction=False)
+        for key in keys:
+            pipe.hgetall(key)
+        rows = [row for key, counts in zip(keys, pipe.execute()) for row in _rows(key, counts)]
+        if rows:
+            with engine.begin() as conn:
+                conn.execute(_upsert(rows))
+        pipe = redis.pipeline(transaction=True)
+        pipe.delete(*keys)
+        pipe.srem(CLAIMED_KEY, *keys)
+        pipe.execute()
+        written += len(rows)
+    return written
+
+
+usage_meter = UsageMeter(redis_client)
@@ -0,0 +1,238 @@
+import asyncio
+import csv
+import io
+import json
+from itertools import islice
+from typing import BinaryIO, Callable, Iterable, Iterator, List, Optional, Set, TextIO, Tuple, Union
+
+from pydantic import ValidationError
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from src.core.config import settings
+from src.core.security import get_password_hash, import_hashing_pool
+from src.models.base import User
+from src.schemas import UserCreate, UserImportResponse, UserImportRowResult
+
+IMPORT_FORMATS = ("csv", "ndjson")
+
+# (line number, fields) or (line number, error) when the record can't be parsed
+Record = Tuple[int, Union[dict, str]]
+
+
+def detect_import_format(filename: Optional[str], content_type: Optional[str] = None) -> str:
+    """NDJSON for .ndjson/.jsonl files or an NDJSON content type, CSV otherwise"""
+    if (filename or "").lower().endswith((".ndjson", ".jsonl")):
+        return "ndjson"
+    if (content_type or "").startswith(("application/x-ndjson", "application/jsonl")):
+        return "ndjson"
+    return "csv"
+
+
+def iter_import_records(stream: TextIO, import_format: str) -> Iterator[Record]:
+    """
+    Read user records one at a time from a CSV (with a header row) or NDJSON stream
+    Fields: email, password, full_name, role. Empty values are treated as missing
+    """
+    if import_format == "csv":
+        reader = csv.DictReader(stream)
+        for record in reader:
+            if None in record:
+                yield reader.line_num, "Too many fields"
+                continue
+            yield reader.line_num, {
+                key.strip(): value.strip() for key, value in record.items()
+                if key and value is not None and value.strip()
+            }
+        return
+
+    for line_number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            yield line_number, "Invalid JSON"
+            continue
+        if not isinstance(record, dict):
+            yield line_number, "Expected a JSON object"
+            continue
+        yield line_number, {key: value for key, value in record.items() if value not in (None, "")}
+
+
+def read_import_records(file: BinaryIO, import_format: str, max_records: int) -> List[Record]:
+    """
+    Parse an uploaded file, blocking, run it off the event loop
+    Stops after max_records + 1 records so callers can tell the file is over the limit
+    """
+    stream = io.TextIOWrapper(file, encoding="utf-8-sig", newline="")
+    try:
+        return list(islice(iter_import_records(stream, import_format), max_records + 1))
+    finally:
+        # Leave closing the file to its owner
+        stream.detach()
+
+
+def iter_batches(records: Iterable[Record], size: int) -> Iterator[List[Record]]:
+    records = iter(records)
+    while batch := list(islice(records, size)):
+        yield batch
+
+
+def _validation_message(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in e['loc']) or 'record'}: {e['msg']}" for e in error.errors()
+    )
+
+
+class UserImport:
+    """
+    State of one import, shared by POST /users/import and the CLI
+    Validates and de-duplicates records batch by batch and keeps the per-row
+    report. Callers check existing emails, hash the remaining passwords in
+    parallel outside any transaction and insert each batch with one multi-row
+    INSERT that skips emails registered in the meantime
+    """
+
+    def __init__(self, organization_id):
+        self.organization_id = organization_id
+        self.results: List[UserImportRowResult] = []
+        self._seen: Set[str] = set()
+
+    def _add(self, line: int, email: Optional[str], status: str, detail: Optional[str] = None):
+        self.results.append(UserImportRowResult(line=line, email=email, status=status, detail=detail))
+
+    def prepare(self, batch: List[Record]) -> List[Tuple[int, UserCreate]]:
+        """Valid records of a batch, first occurrence of each email only"""
+        users = []
+        for line, record in batch:
+            if isinstance(record, str):
+                self._add(line, None, "invalid", record)
+                continue
+            try:
+                user = UserCreate.model_validate(record)
+            except ValidationError as e:
+                email = record.get("email")
+                self._add(line, email if isinstance(email, str) else None, "invalid", _validation_message(e))
+                continue
+            if user.email in self._seen:
+                self._add(line, user.email, "duplicate", "Duplicate email in file")
+                continue
+            self._seen.add(user.email)
+            users.append((line, user))
+        return users
+
+    @staticmethod
+    def existing_emails_query(users: List[Tuple[int, UserCreate]]):
+        return select(User.email).where(User.email.in_([user.email for _, user in users]))
+
+    def drop_existing(self, users: List[Tuple[int, UserCreate]], existing: Set[str]) -> List[Tuple[int, UserCreate]]:
+        """Report emails that are already registered, return the rest"""
+        remaining = []
+        for line, user in users:
+            if user.email in existing:
+                self._add(line, user.email, "duplicate", "Email already registered")
+            else:
+                remaining.append((line, user))
+        return remaining
+
+    # The unique email index applies across organizations, so this also catches
+    # emails taken in other tenants, which the RLS scoped pre-check can't see
+    insert_query = (
+        insert(User).on_conflict_do_nothing(index_elements=[User.email]).returning(User.email)
+    )
+
+    def rows(self, users: List[Tuple[int, UserCreate]], hashes: List[str]) -> List[dict]:
+        return [
+            {
+                "organization_id": self.organization_id,
+                "email": user.email,
+                "hashed_password": hashed,
+                "full_name": user.full_name,
+                "role": user.role,
+            }
+            for (_, user), hashed in zip(users, hashes)
+        ]
+
+    def mark_created(self, users: List[Tuple[int, UserCreate]], created: Set[str]):
+        """Report the rows the INSERT returned, the others hit an existing email"""
+        for line, user in users:
+            if user.email in created:
+                self._add(line, user.email, "created")
+            else:
+                self._add(line, user.email, "duplicate", "Email already registered")
+
+    def report(self) -> UserImportResponse:
+        results = sorted(self.results, key=lambda r: r.line)
+        return UserImportResponse(
+            created=sum(r.status == "created" for r in results),
+            duplicates=sum(r.status == "duplicate" for r in results),
+            invalid=sum(r.status == "invalid" for r in results),
+            results=results,
+        )
+
+
+async def _hash_passwords(passwords: List[str]) -> List[str]:
+    """Hash on the import pool, never more at once than it has threads"""
+    hashes = []
+    step = import_hashing_pool.max_workers
+    for i in range(0, len(passwords), step):
+        hashes += await asyncio.gather(
+            *(import_hashing_pool.run("import", get_password_hash, p) for p in passwords[i:i + step])
+        )
+    return hashes
+
+
+async def import_users(
+    db: AsyncSession,
+    organization_id,
+    records: Iterable[Record],
+    batch_size: int = settings.USER_IMPORT_BATCH_SIZE,
+) -> UserImportResponse:
+    """
+    Import users into an organization, committing one batch at a time
+    Passwords are hashed between transactions, so no connection or lock is
+    held while bcrypt runs
+    """
+    user_import = UserImport(organization_id)
+    for batch in iter_batches(records, batch_size):
+        users = user_import.prepare(batch)
+        if users:
+            existing = set((await db.execute(user_import.existing_emails_query(users))).scalars())
+            # Hand the connection back before hashing
+            await db.commit()
+            users = user_import.drop_existing(users, existing)
+        if not users:
+            continue
+        hashes = await _hash_passwords([user.password for _, user in users])
+        result = await db.execute(user_import.insert_query, user_import.rows(users, hashes))
+        created = set(result.scalars())
+        await db.commit()
+        user_import.mark_created(users, created)
+    return user_import.report()
+
+
+def import_users_sync(
+    db: Session,
+    organization_id,
+    records: Iterable[Record],
+    hash_passwords: Callable[[List[str]], List[str]],
+    batch_size: int = settings.USER_IMPORT_BATCH_SIZE,
+) -> UserImportResponse:
+    """Blocking variant for the CLI, hash_passwords is expected to fan out over processes"""
+    user_import = UserImport(organization_id)
+    for batch in iter_batches(records, batch_size):
+        users = user_import.prepare(batch)
+        if users:
+            existing = set(db.execute(user_import.existing_emails_query(users)).scalars())
+            db.commit()
+            users = user_import.drop_existing(users, existing)
+        if not users:
+            continue
+        hashes = hash_passwords([user.password for _, user in users])
+        created = set(db.execute(user_import.insert_query, user_import.rows(users, hashes)).scalars())
+        db.commit()
+        user_import.mark_created(users, created)
+    return user_import.report()
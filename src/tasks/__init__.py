@@ -1,5 +1,5 @@
 # Tasks package
 from src.tasks.celery_app import celery_app
-from src.tasks import email_tasks, cleanup_tasks
+from src.tasks import email_tasks, cleanup_tasks, dispatch, activity_tasks, usage_tasks
 
-__all__ = ["celery_app", "email_tasks", "cleanup_tasks"]
+__all__ = ["celery_app", "email_tasks", "cleanup_tasks", "dispatch", "activity_tasks", "usage_tasks"]
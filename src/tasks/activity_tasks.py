@@ -0,0 +1,14 @@
+from src.tasks.celery_app import celery_app
+from src.core.redis_client import sync_redis_client
+from src.database.session import engine
+from src.services.activity import rollup_activity
+
+
+@celery_app.task(name="src.tasks.activity_tasks.rollup_organization_activity")
+def rollup_organization_activity():
+    """
+    Copy the per-day active organization sets from Redis into last_activity_at
+    Runs every ACTIVITY_ROLLUP_INTERVAL seconds via Celery Beat
+    """
+    updated = rollup_activity(engine, sync_redis_client)
+    return {"updated": updated}
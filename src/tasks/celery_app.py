@@ -1,6 +1,12 @@
 from celery import Celery
+from kombu import Queue
 from src.core.config import settings
 
+# Priority lanes, each its own broker queue so bulk work never sits in front
+# of latency-sensitive tasks. Per-organization fairness within a lane is
+# handled by src.tasks.dispatch
+TASK_LANES = ("high", "default", "bulk")
+
 celery_app = Celery(
     "saas_tasks",
     broker=settings.CELERY_BROKER_URL,
@@ -13,10 +19,20 @@ celery_app.conf.update(
     result_serializer="json",
     timezone="UTC",
     enable_utc=True,
+    task_queues=[Queue(lane) for lane in TASK_LANES],
+    task_default_queue="default",
+    task_routes={
+        "src.tasks.dispatch.*": {"queue": "high"},
+        # Long drains stay off the lane dispatch_tenant_tasks runs on
+        "src.tasks.email_tasks.deliver_emails": {"queue": "default"},
+        "src.tasks.cleanup_tasks.*": {"queue": "bulk"},
+    },
+    # Take one task at a time so a worker never holds back jobs it can't start yet
+    worker_prefetch_multiplier=1,
 )
 
 # Import tasks
-from src.tasks import email_tasks, cleanup_tasks
+from src.tasks import email_tasks, cleanup_tasks, dispatch, activity_tasks, usage_tasks
 
 # Configure periodic tasks
 celery_app.conf.beat_schedule = {
@@ -24,4 +40,26 @@ celery_app.conf.beat_schedule = {
         "task": "src.tasks.cleanup_tasks.cleanup_old_audit_logs",
         "schedule": 86400.0,  # Run daily
     },
+    "deliver-emails": {
+        "task": "src.tasks.email_tasks.deliver_emails",
+        "schedule": settings.EMAIL_DELIVERY_INTERVAL,
+        # Runs still waiting when the next one is due are dropped
+        "options": {"expires": settings.EMAIL_DELIVERY_INTERVAL},
+    },
+    "dispatch-tenant-tasks": {
+        "task": "src.tasks.dispatch.dispatch_tenant_tasks",
+        "schedule": settings.TASK_DISPATCH_INTERVAL,
+    },
+    "rollup-organization-activity": {
+        "task": "src.tasks.activity_tasks.rollup_organization_activity",
+        "schedule": settings.ACTIVITY_ROLLUP_INTERVAL,
+    },
+    "rollup-usage-counters": {
+        "task": "src.tasks.usage_tasks.rollup_usage_counters",
+        "schedule": settings.USAGE_ROLLUP_INTERVAL,
+    },
+    "cleanup-inactive-organizations": {
+        "task": "src.tasks.cleanup_tasks.cleanup_inactive_organizations",
+        "schedule": 86400.0,  # Run daily
+    },
 }
@@ -1,43 +1,176 @@
+import time
 from datetime import datetime, timedelta
+
+from sqlalchemy import or_, select, update
+
 from src.tasks.celery_app import celery_app
-from src.database.session import SessionLocal
-from src.models.base import AuditLog
+from src.core.config import settings
+from src.core.redis_client import sync_redis_client
+from src.database.session import engine
+from src.database.partitions import ensure_audit_log_partitions, drop_expired_audit_log_partitions
+from src.models.base import Organization
+from src.services.activity import rollup_activity
+from src.services.audit_retention import (
+    RetentionProgress,
+    delete_expired_batch,
+    longest_retention_days,
+    retention_days_for_tier,
+)
+from src.services.tenant_cache import TenantCache
+from src.tasks.dispatch import tenant_scheduler
+
+# Stripe statuses of a subscription that is still being paid for
+PAID_SUBSCRIPTION_STATUSES = ("active", "trialing", "past_due")
+
+PURGE_TASK = "src.tasks.cleanup_tasks.purge_expired_audit_logs"
+PURGE_MAX_RETRIES = 5
 
 
 @celery_app.task(name="src.tasks.cleanup_tasks.cleanup_old_audit_logs")
-def cleanup_old_audit_logs(days_to_keep: int = 90):
+def cleanup_old_audit_logs():
     """
-    Delete audit logs older than specified days
-    Runs daily via Celery Beat
+    Apply audit log retention
+    Pre-creates upcoming monthly partitions and drops the ones past the longest
+    tier retention, then submits one purge task per tenant on a shorter
+    retention to the bulk lane of the tenant scheduler
+    Runs daily via Celery Beat, a second run the same day resumes the first
     """
-    db = SessionLocal()
+    run_day = datetime.combine(datetime.utcnow().date(), datetime.min.time())
+    run_id = run_day.date().isoformat()
+    longest = longest_retention_days()
+    cutoff_date = run_day - timedelta(days=longest)
     
     try:
-        cutoff_date = datetime.utcnow() - timedelta(days=days_to_keep)
+        with engine.begin() as conn:
+            created = ensure_audit_log_partitions(conn, settings.AUDIT_LOG_PARTITIONS_AHEAD)
+        
+        with engine.begin() as conn:
+            dropped = drop_expired_audit_log_partitions(conn, cutoff_date)
         
-        deleted_count = db.query(AuditLog).filter(
-            AuditLog.timestamp < cutoff_date
-        ).delete()
+        with engine.connect() as conn:
+            organizations = conn.execute(select(Organization.id, Organization.subscription_tier)).all()
         
-        db.commit()
+        progress = RetentionProgress(sync_redis_client, run_id)
+        finished = progress.finished_tenants()
+        purges = [
+            (str(organization_id), tier, run_day - timedelta(days=retention_days_for_tier(tier)))
+            for organization_id, tier in organizations
+            if retention_days_for_tier(tier) < longest
+        ]
+        progress.start(len(purges))
+        pending = [purge for purge in purges if purge[0] not in finished]
+        for organization_id, tier, cutoff in pending:
+            tenant_scheduler.submit(
+                PURGE_TASK, organization_id, args=(organization_id, cutoff.isoformat(), run_id),
+                lane="bulk", tier=tier
+            )
         
-        print(f"Deleted {deleted_count} audit logs older than {days_to_keep} days")
-        return {"deleted_count": deleted_count, "cutoff_date": cutoff_date.isoformat()}
+        print(
+            f"Created audit log partitions {created}, dropped {dropped} (older than {longest} days), "
+            f"purging {len(pending)} of {len(purges)} tenants (run {run_id})"
+        )
+        return {
+            "created_partitions": created,
+            "dropped_partitions": dropped,
+            "cutoff_date": cutoff_date.isoformat(),
+            "run_id": run_id,
+            "tenants_queued": len(pending),
+        }
         
     except Exception as e:
-        db.rollback()
-        print(f"Error cleaning up audit logs: {e}")
+        print(f"Error maintaining audit log partitions: {e}")
         raise
-    finally:
-        db.close()
+
+
+@celery_app.task(bind=True, name=PURGE_TASK)
+def purge_expired_audit_logs(self, organization_id: str, cutoff: str, run_id: str, retries: int = 0):
+    """
+    Delete one tenant's audit logs older than cutoff
+    Batches of AUDIT_LOG_RETENTION_BATCH_SIZE rows in primary-key order, each in
+    its own transaction, checkpointed in Redis after every batch. After
+    AUDIT_LOG_RETENTION_TASK_SECONDS, or on an error, the task submits itself
+    to the tenant scheduler again so other tenants' purges get the worker, and
+    resumes from the checkpoint
+    """
+    progress = RetentionProgress(sync_redis_client, run_id)
+    after, deleted = progress.checkpoint(organization_id)
+    batch_size = settings.AUDIT_LOG_RETENTION_BATCH_SIZE
+    deadline = time.monotonic() + settings.AUDIT_LOG_RETENTION_TASK_SECONDS
+    
+    try:
+        while True:
+            with engine.begin() as conn:
+                count, after = delete_expired_batch(
+                    conn, organization_id, datetime.fromisoformat(cutoff), after, batch_size
+                )
+            if count:
+                deleted += count
+                progress.save(organization_id, after, deleted, count)
+                if self.request.id:
+                    self.update_state(
+                        state="PROGRESS", meta={"organization_id": organization_id, "deleted": deleted}
+                    )
+            if count < batch_size:
+                progress.finish(organization_id)
+                return {"organization_id": organization_id, "deleted": deleted, "status": "done"}
+            if time.monotonic() > deadline:
+                tenant_scheduler.submit(PURGE_TASK, organization_id, args=(organization_id, cutoff, run_id), lane="bulk")
+                return {"organization_id": organization_id, "deleted": deleted, "status": "continued"}
+    
+    except Exception as e:
+        # Lock or statement timeouts, the retry resumes from the last checkpoint
+        print(f"Error purging audit logs for organization {organization_id}: {e}")
+        if retries >= PURGE_MAX_RETRIES:
+            raise
+        tenant_scheduler.submit(
+            PURGE_TASK, organization_id, args=(organization_id, cutoff, run_id),
+            kwargs={"retries": retries + 1}, lane="bulk"
+        )
+        return {"organization_id": organization_id, "deleted": deleted, "status": "retrying"}
 
 
 @celery_app.task(name="src.tasks.cleanup_tasks.cleanup_inactive_organizations")
-def cleanup_inactive_organizations(days_inactive: int = 180):
+def cleanup_inactive_organizations(days_inactive: int = settings.ORGANIZATION_INACTIVE_DAYS):
     """
-    Mark organizations as inactive if no activity for X days
-    TODO: implement this properly
+    Deactivate organizations with no activity for days_inactive days
+    Rolls up the latest activity first, then one UPDATE served by the partial
+    index on last_activity_at of active organizations. Organizations with a
+    live paid subscription are never deactivated
+    Runs daily via Celery Beat
     """
-    print(f"Checking for organizations inactive for {days_inactive} days")
-    # Implementation would check last_activity timestamp
-    return {"status": "checked"}
+    cutoff_date = datetime.utcnow() - timedelta(days=days_inactive)
+    
+    try:
+        rollup_activity(engine, sync_redis_client)
+        
+        with engine.begin() as conn:
+            deactivated = conn.execute(
+                update(Organization)
+                .where(
+                    Organization.is_active == True,  # noqa: E712, matches the partial index predicate
+                    Organization.last_activity_at < cutoff_date,
+                    or_(
+                        Organization.subscription_status.is_(None),
+                        Organization.subscription_status.notin_(PAID_SUBSCRIPTION_STATUSES)
+                    )
+                )
+                .values(is_active=False, updated_at=datetime.utcnow())
+                .returning(Organization.id)
+            ).scalars().all()
+        
+        # Cached organization responses still say active
+        if deactivated:
+            pipe = sync_redis_client.pipeline(transaction=False)
+            for organization_id in deactivated:
+                pipe.incr(TenantCache.version_key(str(organization_id)))
+            pipe.execute()
+        
+        print(f"Deactivated {len(deactivated)} organizations inactive for {days_inactive} days")
+        return {
+            "deactivated": len(deactivated),
+            "cutoff_date": cutoff_date.isoformat()
+        }
+        
+    except Exception as e:
+        print(f"Error deactivating inactive organizations: {e}")
+        raise
@@ -0,0 +1,287 @@
+import json
+import time
+from typing import Callable, Dict, List, Optional
+
+from celery.signals import task_postrun, task_prerun
+
+from src.core.config import settings
+from src.core.metrics import metrics
+from src.core.redis_client import sync_redis_client
+from src.tasks.celery_app import TASK_LANES, celery_app
+
+# Queue a job for an organization, the organization joins the lane's
+# round-robin ring when its sub-queue goes from empty to non-empty
+#
+# KEYS[1] org sub-queue, KEYS[2] ring, KEYS[3] weights hash
+# ARGV[1] job, ARGV[2] organization id, ARGV[3] weight, empty to keep the current one
+SUBMIT_SCRIPT = """
+if redis.call('RPUSH', KEYS[1], ARGV[1]) == 1 then
+    redis.call('RPUSH', KEYS[2], ARGV[2])
+end
+if ARGV[3] ~= '' then
+    redis.call('HSET', KEYS[3], ARGV[2], ARGV[3])
+end
+"""
+
+# Put jobs the broker didn't take back at the head of an organization's
+# sub-queue and free their concurrency slots. The organization rejoins the
+# ring if TAKE_SCRIPT removed it after draining the sub-queue
+#
+# KEYS[1] org sub-queue, KEYS[2] ring, KEYS[3] running counter
+# ARGV[1] organization id, ARGV[2...] jobs in queue order
+REQUEUE_SCRIPT = """
+local queued = redis.call('LLEN', KEYS[1])
+for i = #ARGV, 2, -1 do
+    redis.call('LPUSH', KEYS[1], ARGV[i])
+end
+if queued == 0 then
+    redis.call('RPUSH', KEYS[2], ARGV[1])
+end
+if redis.call('DECRBY', KEYS[3], #ARGV - 1) <= 0 then
+    redis.call('DEL', KEYS[3])
+end
+"""
+
+# One round-robin turn: rotate the ring and take up to `weight` jobs from the
+# organization at its head, never more than its free concurrency slots.
+# Organizations whose sub-queue is drained leave the ring
+#
+# KEYS[1] ring, KEYS[2] weights hash
+# ARGV[1] sub-queue prefix, ARGV[2] running counter prefix, ARGV[3] max concurrency,
+# ARGV[4] default weight, ARGV[5] running counter TTL, ARGV[6] remaining lane budget
+# Returns {organization id, job...}, empty when the ring is empty
+TAKE_SCRIPT = """
+local org = redis.call('LMOVE', KEYS[1], KEYS[1], 'LEFT', 'RIGHT')
+if not org then
+    return {}
+end
+local queue = ARGV[1] .. org
+local running_key = ARGV[2] .. org
+local running = tonumber(redis.call('GET', running_key) or '0')
+local weight = tonumber(redis.call('HGET', KEYS[2], org) or ARGV[4])
+local slots = math.min(weight, tonumber(ARGV[3]) - running, tonumber(ARGV[6]))
+
+local reply = {org}
+if slots > 0 then
+    local jobs = redis.call('LPOP', queue, slots)
+    if jobs then
+        redis.call('INCRBY', running_key, #jobs)
+        redis.call('EXPIRE', running_key, tonumber(ARGV[5]))
+        for _, job in ipairs(jobs) do
+            table.insert(reply, job)
+        end
+    end
+end
+if redis.call('LLEN', queue) == 0 then
+    redis.call('LREM', KEYS[1], 0, org)
+    redis.call('HDEL', KEYS[2], org)
+end
+return reply
+"""
+
+# KEYS[1] running counter
+FINISH_SCRIPT = """
+if redis.call('DECR', KEYS[1]) <= 0 then
+    redis.call('DEL', KEYS[1])
+end
+"""
+
+
+def tier_weight(tier) -> int:
+    """Jobs an organization may release per round-robin turn"""
+    return settings.TASK_TIER_WEIGHTS.get(getattr(tier, "value", tier), 1)
+
+
+class TenantScheduler:
+    """
+    Fair dispatch of per-organization Celery tasks
+    Jobs wait in a Redis sub-queue per organization and lane instead of going
+    straight to the broker. Each dispatch run walks the lanes in priority order
+    and releases jobs by weighted round-robin across organizations, so one
+    tenant's burst only delays its own jobs. Running tasks are counted per
+    organization (across lanes) and capped at TASK_TENANT_MAX_CONCURRENCY
+
+    Time from submit() to a worker starting the task is recorded per
+    organization and lane in the metrics registry and in Redis
+    """
+
+    prefix = "tasks"
+
+    def __init__(
+        self,
+        redis,
+        send_task: Optional[Callable] = None,
+        lane_budgets: Optional[Dict[str, int]] = None,
+        max_concurrency: int = settings.TASK_TENANT_MAX_CONCURRENCY,
+        running_ttl: int = settings.TASK_RUNNING_TTL,
+    ):
+        self.redis = redis
+        self.send_task = send_task or celery_app.send_task
+        self.lane_budgets = lane_budgets or settings.TASK_LANE_BUDGETS
+        self.max_concurrency = max_concurrency
+        self.running_ttl = running_ttl
+        self._submit = redis.register_script(SUBMIT_SCRIPT)
+        self._take = redis.register_script(TAKE_SCRIPT)
+        self._requeue = redis.register_script(REQUEUE_SCRIPT)
+        self._finish = redis.register_script(FINISH_SCRIPT)
+
+    def queue_key(self, lane: str, organization_id: str = "") -> str:
+        return f"{self.prefix}:{lane}:org:{organization_id}"
+
+    def ring_key(self, lane: str) -> str:
+        return f"{self.prefix}:{lane}:ring"
+
+    def weights_key(self, lane: str) -> str:
+        return f"{self.prefix}:{lane}:weights"
+
+    def running_key(self, organization_id: str = "") -> str:
+        return f"{self.prefix}:running:{organization_id}"
+
+    def submit(
+        self,
+        task_name: str,
+        organization_id,
+        args: tuple = (),
+        kwargs: Optional[dict] = None,
+        lane: str = "default",
+        tier=None,
+    ):
+        """
+        Queue a task on behalf of an organization, released by the next dispatch run
+        Without a tier the organization keeps its current weight in the lane
+        """
+        if lane not in TASK_LANES:
+            raise ValueError(f"Unknown task lane {lane!r}")
+        organization_id = str(organization_id)
+        job = json.dumps({
+            "task": task_name,
+            "args": list(args),
+            "kwargs": kwargs or {},
+            "enqueued_at": time.time(),
+        })
+        self._submit(
+            keys=[self.queue_key(lane, organization_id), self.ring_key(lane), self.weights_key(lane)],
+            args=[job, organization_id, tier_weight(tier) if tier is not None else ""],
+        )
+        metrics.inc("task_submitted_total", lane=lane)
+
+    def _release(self, lane: str, organization_id: str, jobs: List[str]):
+        for i, raw in enumerate(jobs):
+            job = json.loads(raw)
+            try:
+                self.send_task(
+                    job["task"],
+                    args=job["args"],
+                    kwargs=job["kwargs"],
+                    queue=lane,
+                    headers={
+                        "organization_id": organization_id,
+                        "tenant_lane": lane,
+                        "enqueued_at": job["enqueued_at"],
+                    },
+                )
+            except Exception:
+                # Broker unavailable, put the rest back at the head of the sub-queue
+                self._requeue(
+                    keys=[
+                        self.queue_key(lane, organization_id),
+                        self.ring_key(lane),
+                        self.running_key(organization_id),
+                    ],
+                    args=[organization_id, *jobs[i:]],
+                )
+                raise
+
+    def dispatch_lane(self, lane: str, budget: int) -> int:
+        released = 0
+        idle_turns = 0
+        ring_size = self.redis.llen(self.ring_key(lane))
+        # Stop when the budget is spent or a full turn of the ring released nothing
+        while released < budget and idle_turns < ring_size:
+            reply = self._take(
+                keys=[self.ring_key(lane), self.weights_key(lane)],
+                args=[
+                    self.queue_key(lane),
+                    self.running_key(),
+                    self.max_concurrency,
+                    1,
+                    self.running_ttl,
+                    budget - released,
+                ],
+            )
+            if not reply:
+                break
+            organization_id, jobs = reply[0], reply[1:]
+            if not jobs:
+                idle_turns += 1
+                continue
+            idle_turns = 0
+            self._release(lane, organization_id, jobs)
+            released += len(jobs)
+        return released
+
+    def dispatch(self) -> Dict[str, int]:
+        """Release queued jobs to the broker, higher priority lanes first"""
+        released = {}
+        for lane in TASK_LANES:
+            released[lane] = self.dispatch_lane(lane, self.lane_budgets.get(lane, 0))
+            metrics.inc("task_dispatched_total", released[lane], lane=lane)
+            metrics.set("task_tenants_waiting", self.redis.llen(self.ring_key(lane)), lane=lane)
+        return released
+
+    def started(self, organization_id: str, lane: str, enqueued_at: float):
+        wait = max(time.time() - enqueued_at, 0.0)
+        metrics.inc("task_queue_wait_seconds_total", wait, organization=organization_id, lane=lane)
+        metrics.inc("task_queue_wait_total", organization=organization_id, lane=lane)
+        # Fleet-wide totals, worker registries are per process
+        field = f"{lane}:{organization_id}"
+        pipe = self.redis.pipeline()
+        pipe.hincrbyfloat(f"{self.prefix}:wait:seconds", field, wait)
+        pipe.hincrby(f"{self.prefix}:wait:count", field, 1)
+        pipe.execute()
+
+    def finished(self, organization_id: str):
+        self._finish(keys=[self.running_key(organization_id)])
+
+    def stats(self) -> Dict[str, Dict[str, dict]]:
+        """Pending jobs and mean queue wait per lane and organization"""
+        seconds = self.redis.hgetall(f"{self.prefix}:wait:seconds")
+        counts = self.redis.hgetall(f"{self.prefix}:wait:count")
+        result: Dict[str, Dict[str, dict]] = {lane: {} for lane in TASK_LANES}
+        for field, count in counts.items():
+            lane, organization_id = field.split(":", 1)
+            result.setdefault(lane, {})[organization_id] = {
+                "pending": 0,
+                "mean_wait_seconds": float(seconds.get(field, 0)) / int(count),
+            }
+        for lane in TASK_LANES:
+            for organization_id in set(self.redis.lrange(self.ring_key(lane), 0, -1)):
+                entry = result[lane].setdefault(organization_id, {"pending": 0, "mean_wait_seconds": 0.0})
+                entry["pending"] = self.redis.llen(self.queue_key(lane, organization_id))
+        return result
+
+
+tenant_scheduler = TenantScheduler(sync_redis_client)
+
+
+@task_prerun.connect
+def _record_queue_wait(task=None, **kwargs):
+    organization_id = getattr(task.request, "organization_id", None)
+    if organization_id:
+        tenant_scheduler.started(organization_id, task.request.tenant_lane, float(task.request.enqueued_at))
+
+
+@task_postrun.connect
+def _release_concurrency_slot(task=None, **kwargs):
+    organization_id = getattr(task.request, "organization_id", None)
+    if organization_id:
+        tenant_scheduler.finished(organization_id)
+
+
+@celery_app.task(name="src.tasks.dispatch.dispatch_tenant_tasks")
+def dispatch_tenant_tasks():
+    """
+    Release per-organization jobs to the Celery lanes
+    Runs every TASK_DISPATCH_INTERVAL seconds via Celery Beat
+    """
+    return tenant_scheduler.dispatch()
@@ -1,30 +1,82 @@
+from typing import Optional
+
 from src.tasks.celery_app import celery_app
+from src.core.config import settings
+from src.core.redis_client import sync_redis_client
+from src.core.redis_lock import RedisLock
+from src.services.email import email_dispatcher, email_outbox, queue_email
+from src.tasks.dispatch import tenant_scheduler
+
+DELIVERY_LOCK_KEY = "email:delivery:lock"
+DELIVER_TENANT_TASK = "src.tasks.email_tasks.deliver_tenant_emails"
+
+
+def schedule_tenant_delivery(organization_id: str):
+    """Queue a delivery of an organization's outbox on the tenant scheduler"""
+    tenant_scheduler.submit(DELIVER_TENANT_TASK, organization_id, args=(organization_id,), lane="default")
+
+
+email_outbox.on_backlog = schedule_tenant_delivery
 
 
 @celery_app.task(name="src.tasks.email_tasks.send_welcome_email")
-def send_welcome_email(user_email: str, organization_name: str):
+def send_welcome_email(user_email: str, organization_name: str, organization_id: Optional[str] = None):
     """
-    Send welcome email to new user
-    TODO: implement actual email sending
+    Queue welcome email to new user
     """
-    print(f"Sending welcome email to {user_email} for org {organization_name}")
-    # In production, use an email service like SendGrid, SES, etc.
-    return {"status": "sent", "email": user_email}
+    queue_email("welcome", user_email, organization_id, organization_name=organization_name)
+    return {"status": "queued", "email": user_email}
 
 
 @celery_app.task(name="src.tasks.email_tasks.send_subscription_confirmation")
-def send_subscription_confirmation(user_email: str, tier: str):
+def send_subscription_confirmation(user_email: str, tier: str, organization_id: Optional[str] = None):
     """
-    Send subscription confirmation email
+    Queue subscription confirmation email
     """
-    print(f"Sending subscription confirmation to {user_email} for tier {tier}")
-    return {"status": "sent", "email": user_email}
+    queue_email("subscription_confirmation", user_email, organization_id, tier=tier)
+    return {"status": "queued", "email": user_email}
 
 
 @celery_app.task(name="src.tasks.email_tasks.send_invoice")
-def send_invoice(user_email: str, invoice_url: str):
+def send_invoice(user_email: str, invoice_url: str, organization_id: Optional[str] = None):
+    """
+    Queue invoice email
+    """
+    queue_email("invoice", user_email, organization_id, invoice_url=invoice_url)
+    return {"status": "queued", "email": user_email}
+
+
+@celery_app.task(name="src.tasks.email_tasks.deliver_emails")
+def deliver_emails():
+    """
+    Send queued emails in batches over pooled SMTP connections
+    Runs every EMAIL_DELIVERY_INTERVAL seconds via Celery Beat, a run that
+    finds the previous one still draining does nothing. Drains the shared
+    outbox and moves due retries back to theirs
+    """
+    lock = RedisLock(sync_redis_client, DELIVERY_LOCK_KEY, settings.EMAIL_DELIVERY_LOCK_TTL)
+    if not lock.acquire():
+        return {"skipped": True}
+    try:
+        totals = email_dispatcher.run(lock=lock)
+    finally:
+        lock.release()
+    if any(totals.values()):
+        print(f"Delivered emails: {totals}")
+    return totals
+
+
+@celery_app.task(name=DELIVER_TENANT_TASK)
+def deliver_tenant_emails(organization_id: str):
     """
-    Send invoice email
+    Send an organization's queued emails
+    Submitted through the tenant scheduler when its outbox goes from empty to
+    non-empty, and again while a run leaves messages behind, so one tenant's
+    burst takes turns with everyone else's
     """
-    print(f"Sending invoice to {user_email}: {invoice_url}")
-    return {"status": "sent", "email": user_email}
+    try:
+        return email_dispatcher.run(organization_id=organization_id)
+    finally:
+        # Nothing else schedules a delivery while the outbox is non-empty
+        if email_outbox.pending(organization_id):
+            schedule_tenant_delivery(organization_id)
@@ -0,0 +1,14 @@
+from src.tasks.celery_app import celery_app
+from src.core.redis_client import sync_redis_client
+from src.database.session import engine
+from src.services.usage import rollup_usage
+
+
+@celery_app.task(name="src.tasks.usage_tasks.rollup_usage_counters")
+def rollup_usage_counters():
+    """
+    Move per-tenant request counters from Redis into usage_hourly
+    Runs every USAGE_ROLLUP_INTERVAL seconds via Celery Beat
+    """
+    written = rollup_usage(engine, sync_redis_client)
+    return {"rows": written}
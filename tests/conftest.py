@@ -1,12 +1,17 @@
 import pytest
+import pytest_asyncio
+import redis.asyncio as aioredis
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 import os
 
 from src.main import app
-from src.database.session import Base, get_db
+from src.database.session import AsyncSessionLocal, Base, get_db, get_async_database_url, get_session_factory
 from src.core.config import settings
+from src.services.last_login import last_login_recorder
 
 # Test database URL - use environment variable or derive from settings
 TEST_DATABASE_URL = os.getenv(
@@ -17,6 +22,11 @@ TEST_DATABASE_URL = os.getenv(
 engine = create_engine(TEST_DATABASE_URL)
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# The app runs inside TestClient's own event loop, so the async engine must not
+# hold pooled connections across loops
+async_engine = create_async_engine(get_async_database_url(TEST_DATABASE_URL), poolclass=NullPool)
+TestingAsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
 
 @pytest.fixture(scope="session")
 def db_engine():
@@ -28,33 +38,35 @@ def db_engine():
 
 @pytest.fixture(scope="function")
 def db_session(db_engine):
-    """Create a new database session for each test"""
-    connection = db_engine.connect()
-    transaction = connection.begin()
-    session = TestingSessionLocal(bind=connection)
+    """Create a new database session for each test and clean up afterwards"""
+    session = TestingSessionLocal()
     
     yield session
     
     session.close()
-    transaction.rollback()
-    connection.close()
+    # Routes commit through their own async sessions, so wipe the tables
+    # instead of rolling back a wrapping transaction
+    with db_engine.begin() as connection:
+        for table in reversed(Base.metadata.sorted_tables):
+            connection.execute(table.delete())
 
 
 @pytest.fixture(scope="function")
 def client(db_session):
     """Create test client with overridden database dependency"""
-    def override_get_db():
-        try:
-            yield db_session
-        finally:
-            pass
+    async def override_get_db():
+        async with TestingAsyncSessionLocal() as session:
+            yield session
     
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_session_factory] = lambda: TestingAsyncSessionLocal
+    last_login_recorder.session_factory = TestingAsyncSessionLocal
     
     with TestClient(app) as test_client:
         yield test_client
     
     app.dependency_overrides.clear()
+    last_login_recorder.session_factory = AsyncSessionLocal
 
 
 @pytest.fixture
@@ -88,3 +100,11 @@ def get_auth_headers(client, test_user_credentials):
         return {"Authorization": f"Bearer {token}"}
     
     return _get_headers
+
+
+@pytest_asyncio.fixture
+async def redis_client():
+    """Client bound to the test's event loop"""
+    client = aioredis.from_url(settings.REDIS_URL, decode_responses=True)
+    yield client
+    await client.aclose()
@@ -0,0 +1,45 @@
+from datetime import datetime
+
+import pytest
+
+from src.services.activity import ActivityTracker, activity_key
+from src.services.circuit_breaker import CircuitBreaker, CircuitOpenError
+
+
+def make_tracker(now: list, breaker: CircuitBreaker = None) -> ActivityTracker:
+    return ActivityTracker(redis=None, breaker=breaker or CircuitBreaker("test-activity"), clock=lambda: now[0])
+
+
+def test_activity_is_recorded_once_per_day():
+    """Test repeated requests of an organization only queue one write per day"""
+    now = [datetime(2026, 10, 17, 9)]
+    tracker = make_tracker(now)
+
+    for _ in range(3):
+        tracker.record("org-a")
+    tracker.record("org-b")
+    now[0] = datetime(2026, 10, 18, 0, 1)
+    tracker.record("org-a")
+
+    assert tracker._pending == {
+        datetime(2026, 10, 17).date(): {"org-a", "org-b"},
+        datetime(2026, 10, 18).date(): {"org-a"},
+    }
+    assert activity_key(datetime(2026, 10, 18).date()) == "activity:2026-10-18"
+
+
+@pytest.mark.asyncio
+async def test_failed_flush_records_again():
+    """Test organizations are recorded again after a flush that didn't reach Redis"""
+    now = [datetime(2026, 10, 17, 9)]
+    breaker = CircuitBreaker("test-activity-open")
+    breaker._transition(CircuitBreaker.OPEN)
+    tracker = make_tracker(now, breaker)
+
+    tracker.record("org-a")
+    with pytest.raises(CircuitOpenError):
+        await tracker.flush()
+    assert not tracker._pending
+
+    tracker.record("org-a")
+    assert tracker._pending == {now[0].date(): {"org-a"}}
@@ -0,0 +1,54 @@
+import pytest
+from fastapi import status
+
+
+def test_list_audit_logs_as_admin(client, get_auth_headers):
+    """Test listing audit logs returns a keyset page"""
+    headers = get_auth_headers()
+    
+    response = client.get("/api/v1/audit-logs/", headers=headers)
+    
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert isinstance(data["items"], list)
+    assert "next_cursor" in data
+
+
+def test_list_audit_logs_invalid_cursor(client, get_auth_headers):
+    """Test a malformed cursor is rejected"""
+    headers = get_auth_headers()
+    
+    response = client.get("/api/v1/audit-logs/?cursor=garbage", headers=headers)
+    
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_audit_log_filters_accept_offset_timestamps(client, get_auth_headers):
+    """Test start_date with a Z suffix is compared as UTC on list and export"""
+    headers = get_auth_headers()
+    
+    for path in ("/api/v1/audit-logs/", "/api/v1/audit-logs/export"):
+        response = client.get(
+            path, params={"start_date": "2026-01-01T00:00:00Z", "end_date": "2099-01-01T02:00:00+02:00"}, headers=headers
+        )
+        assert response.status_code == status.HTTP_200_OK
+
+
+def test_export_audit_logs_csv(client, get_auth_headers):
+    """Test exporting audit logs as CSV starts with the header row"""
+    headers = get_auth_headers()
+    
+    response = client.get("/api/v1/audit-logs/export?format=csv", headers=headers)
+    
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"].startswith("text/csv")
+    assert response.text.splitlines()[0].startswith("id,organization_id")
+
+
+def test_export_audit_logs_invalid_format(client, get_auth_headers):
+    """Test unsupported export formats are rejected"""
+    headers = get_auth_headers()
+    
+    response = client.get("/api/v1/audit-logs/export?format=xml", headers=headers)
+    
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
@@ -0,0 +1,38 @@
+import uuid
+from datetime import datetime
+
+from sqlalchemy.dialects import postgresql
+
+from src.core.config import settings
+from src.models.base import SubscriptionTier
+from src.services.audit_retention import expired_batch_query, longest_retention_days, retention_days_for_tier
+
+
+def compile_sql(statement) -> str:
+    return str(statement.compile(dialect=postgresql.dialect()))
+
+
+def test_retention_follows_tier():
+    """Test each tier keeps its own window and partitions follow the longest"""
+    assert retention_days_for_tier(SubscriptionTier.FREE) == settings.AUDIT_LOG_RETENTION_DAYS_FREE
+    assert retention_days_for_tier(SubscriptionTier.ENTERPRISE) == settings.AUDIT_LOG_RETENTION_DAYS_ENTERPRISE
+    assert longest_retention_days() == max(
+        settings.AUDIT_LOG_RETENTION_DAYS_FREE,
+        settings.AUDIT_LOG_RETENTION_DAYS_PRO,
+        settings.AUDIT_LOG_RETENTION_DAYS_ENTERPRISE,
+    )
+
+
+def test_batch_delete_is_keyed_by_primary_key():
+    """Test batches are bounded and resume after the checkpoint"""
+    organization_id = uuid.uuid4()
+    cutoff = datetime(2026, 1, 1)
+
+    first = compile_sql(expired_batch_query(organization_id, cutoff, None, 1000))
+    assert "LIMIT" in first
+    assert "(audit_logs.timestamp, audit_logs.id) >" not in first
+
+    resumed = compile_sql(expired_batch_query(organization_id, cutoff, (datetime(2025, 6, 1), uuid.uuid4()), 1000))
+    assert "(audit_logs.timestamp, audit_logs.id) >" in resumed
+    assert "DELETE FROM audit_logs USING batch" in resumed
+    assert "ORDER BY audit_logs.timestamp, audit_logs.id" in resumed
@@ -0,0 +1,139 @@
+import asyncio
+
+import pytest
+
+from src.core.metrics import metrics
+from src.services.audit_writer import AuditLogWriter
+
+
+class RecordingWriter(AuditLogWriter):
+    """Writer that records batches instead of inserting them"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.batches = []
+
+    async def _write(self, batch):
+        self.batches.append(batch)
+
+
+def make_entry(n):
+    return {"organization_id": "org-1", "user_id": None, "action": "create", "resource_type": str(n)}
+
+
+@pytest.fixture(autouse=True)
+def reset_metrics():
+    metrics.clear()
+    yield
+    metrics.clear()
+
+
+@pytest.mark.asyncio
+async def test_flushes_full_batches():
+    """Test rows are written in batches of batch_size"""
+    writer = RecordingWriter(max_queue_size=100, batch_size=10, flush_interval=5, enqueue_timeout=0)
+    await writer.start()
+
+    for n in range(25):
+        assert await writer.enqueue(**make_entry(n))
+    await writer.stop()
+
+    assert [len(batch) for batch in writer.batches] == [10, 10, 5]
+
+
+@pytest.mark.asyncio
+async def test_flushes_partial_batch_after_interval():
+    """Test a partial batch is written once flush_interval elapses"""
+    writer = RecordingWriter(max_queue_size=100, batch_size=100, flush_interval=0.05, enqueue_timeout=0)
+    await writer.start()
+
+    await writer.enqueue(**make_entry(1))
+    await asyncio.sleep(0.2)
+
+    assert len(writer.batches) == 1
+    await writer.stop()
+
+
+@pytest.mark.asyncio
+async def test_drops_when_queue_full():
+    """Test rows are dropped and counted when the queue is full"""
+    writer = RecordingWriter(max_queue_size=2, batch_size=10, flush_interval=5, enqueue_timeout=0)
+    await writer.start()
+    # Stop the worker so nothing is consumed
+    writer._worker.cancel()
+
+    results = [await writer.enqueue(**make_entry(n)) for n in range(4)]
+
+    assert results == [True, True, False, False]
+    assert metrics.get("audit_log_dropped_total", reason="queue_full") == 2
+
+
+@pytest.mark.asyncio
+async def test_stop_drains_queue():
+    """Test everything queued before shutdown is written"""
+    writer = RecordingWriter(max_queue_size=1000, batch_size=50, flush_interval=5, enqueue_timeout=0)
+    await writer.start()
+
+    for n in range(120):
+        await writer.enqueue(**make_entry(n))
+    await writer.stop()
+
+    assert sum(len(batch) for batch in writer.batches) == 120
+    assert not await writer.enqueue(**make_entry(0))
+
+
+@pytest.mark.asyncio
+async def test_stop_times_out_with_full_queue():
+    """Test shutdown gives up after the timeout when the queue is full and stuck"""
+    class StuckWriter(AuditLogWriter):
+        async def _write(self, batch):
+            await asyncio.Event().wait()
+
+    writer = StuckWriter(max_queue_size=2, batch_size=1, flush_interval=5, enqueue_timeout=0)
+    await writer.start()
+    for n in range(3):
+        await writer.enqueue(**make_entry(n))
+    await asyncio.sleep(0)
+
+    await asyncio.wait_for(writer.stop(timeout=0.1), 1)
+
+    assert metrics.get("audit_log_dropped_total", reason="shutdown") == 2
+
+
+class RecordingSession:
+    def __init__(self):
+        self.statements = []
+        self.committed = False
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, statement, params=None):
+        if params:
+            self.statements.append(params["org_id"])
+        else:
+            compiled = statement.compile().params
+            self.statements.append([v for k, v in compiled.items() if k.startswith("organization_id")])
+
+    async def commit(self):
+        self.committed = True
+
+
+@pytest.mark.asyncio
+async def test_rows_are_written_under_their_tenant():
+    """Test each organization's rows are inserted after setting its tenant"""
+    session = RecordingSession()
+    writer = AuditLogWriter(session_factory=lambda: session)
+    batch = [
+        {**make_entry(1), "organization_id": "org-2"},
+        make_entry(2),
+        {**make_entry(3), "organization_id": "org-2"},
+    ]
+
+    await writer._write(batch)
+
+    assert session.statements == ["org-1", ["org-1"], "org-2", ["org-2", "org-2"]]
+    assert session.committed
@@ -1,5 +1,12 @@
+import uuid
+from datetime import datetime
+
 import pytest
 from fastapi import status
+from sqlalchemy.dialects import postgresql
+
+from src.models.base import User
+from src.services.last_login import LastLoginRecorder, last_login_recorder
 
 
 def test_register_success(client, test_user_credentials):
@@ -56,6 +63,100 @@ def test_login_success(client, test_user_credentials):
     assert "refresh_token" in data
 
 
+def test_login_defers_last_login(client, db_session, test_user_credentials):
+    """Test last_login is written by the periodic flush, not by the request"""
+    client.post("/api/v1/auth/register", json=test_user_credentials)
+    login_data = {
+        "email": test_user_credentials["email"],
+        "password": test_user_credentials["password"]
+    }
+    assert client.post("/api/v1/auth/login", json=login_data).status_code == status.HTTP_200_OK
+    
+    user = db_session.query(User).filter(User.email == test_user_credentials["email"]).one()
+    assert user.last_login is None
+    
+    client.portal.call(last_login_recorder.flush)
+    db_session.expire_all()
+    assert user.last_login is not None
+
+
+def test_last_login_recorder_coalesces_logins():
+    """Test repeat logins of a user collapse into one row of a single bulk UPDATE"""
+    recorder = LastLoginRecorder()
+    user_id = uuid.uuid4()
+    recorder.record(user_id, datetime(2026, 1, 1))
+    recorder.record(str(user_id), datetime(2026, 1, 2))
+    recorder.record(uuid.uuid4(), datetime(2026, 1, 1))
+    
+    assert recorder._pending[user_id] == datetime(2026, 1, 2)
+    sql = str(recorder._update(list(recorder._pending.items())).compile(dialect=postgresql.dialect()))
+    assert "FROM (VALUES" in sql
+    assert sql.count("::UUID") == 2
+
+
+def test_last_login_recorder_caps_pending():
+    """Test logins beyond max_pending are dropped, known users still update"""
+    recorder = LastLoginRecorder(max_pending=2)
+    first, second = uuid.uuid4(), uuid.uuid4()
+    recorder.record(first, datetime(2026, 1, 1))
+    recorder.record(second, datetime(2026, 1, 1))
+    recorder.record(uuid.uuid4(), datetime(2026, 1, 1))
+    recorder.record(first, datetime(2026, 1, 2))
+    
+    assert recorder._pending == {first: datetime(2026, 1, 2), second: datetime(2026, 1, 1)}
+
+
+class FakeUpdateResult:
+    def __init__(self, organization_ids):
+        self.organization_ids = organization_ids
+
+    def scalars(self):
+        return iter(self.organization_ids)
+
+
+class FakeSession:
+    def __init__(self, organization_ids):
+        self.organization_ids = organization_ids
+        self.committed = False
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, statement):
+        return FakeUpdateResult(self.organization_ids)
+
+    async def commit(self):
+        self.committed = True
+
+
+class FakeCache:
+    def __init__(self):
+        self.invalidated = []
+
+    async def invalidate(self, organization_id):
+        self.invalidated.append(organization_id)
+
+
+@pytest.mark.asyncio
+async def test_last_login_flush_invalidates_organizations():
+    """Test each organization with an updated user has its cache invalidated once"""
+    organization_id = uuid.uuid4()
+    session = FakeSession([organization_id, organization_id])
+    cache = FakeCache()
+    recorder = LastLoginRecorder(session_factory=lambda: session, cache=cache)
+    recorder.record(uuid.uuid4())
+    recorder.record(uuid.uuid4())
+    
+    await recorder.flush()
+    
+    assert session.committed
+    assert cache.invalidated == [organization_id]
+    assert recorder._pending == {}
+
+
 def test_login_wrong_password(client, test_user_credentials):
     """Test login with wrong password"""
     # Register user first
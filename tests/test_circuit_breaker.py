@@ -0,0 +1,151 @@
+import pytest
+
+from src.core.metrics import metrics
+from src.models.base import SubscriptionTier
+from src.services import rate_limit
+from src.services.circuit_breaker import CircuitBreaker, CircuitOpenError
+from src.services.rate_limit import LocalRateLimiter
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+async def failing():
+    raise ConnectionError("redis down")
+
+
+async def succeeding():
+    return "ok"
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def breaker(clock):
+    return CircuitBreaker("test", failure_threshold=3, slow_call_threshold=0.5, reset_timeout=10, timer=clock)
+
+
+@pytest.mark.asyncio
+async def test_breaker_opens_after_consecutive_failures(breaker):
+    """Test the breaker trips on the threshold and then fails fast"""
+    for _ in range(3):
+        with pytest.raises(ConnectionError):
+            await breaker.call(failing)
+
+    assert breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(CircuitOpenError):
+        await breaker.call(succeeding)
+    assert metrics.get("circuit_breaker_state", breaker="test") == 2
+
+
+@pytest.mark.asyncio
+async def test_success_resets_failure_count(breaker):
+    """Test only consecutive failures count"""
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            await breaker.call(failing)
+    await breaker.call(succeeding)
+    with pytest.raises(ConnectionError):
+        await breaker.call(failing)
+
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+@pytest.mark.asyncio
+async def test_slow_calls_open_breaker(breaker, clock):
+    """Test calls over the slow call threshold count as failures"""
+    async def slow():
+        clock.now += 1
+        return "ok"
+
+    for _ in range(3):
+        assert await breaker.call(slow) == "ok"
+
+    assert breaker.state == CircuitBreaker.OPEN
+
+
+@pytest.mark.asyncio
+async def test_half_open_probe(breaker, clock):
+    """Test one probe is let through after the reset timeout"""
+    for _ in range(3):
+        with pytest.raises(ConnectionError):
+            await breaker.call(failing)
+
+    clock.now += 10
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    with pytest.raises(ConnectionError):
+        await breaker.call(failing)
+    # A failed probe opens the breaker for another reset timeout
+    assert breaker.state == CircuitBreaker.OPEN
+
+    clock.now += 10
+    assert await breaker.call(succeeding) == "ok"
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_local_limiter_enforces_worker_share(clock):
+    """Test the degraded limiter splits the limit between workers"""
+    limiter = LocalRateLimiter(period=3600, workers=2, timer=clock)
+
+    results = [limiter.hit("org", 10) for _ in range(6)]
+
+    assert [r.allowed for r in results] == [True] * 5 + [False]
+    assert results[4].remaining == 0
+    assert results[-1].retry_after == pytest.approx(720)
+
+    clock.now += 720
+    assert limiter.hit("org", 10).allowed
+
+
+@pytest.mark.asyncio
+async def test_open_breaker_falls_back_to_local_limiter(breaker, monkeypatch):
+    """Test requests are limited in-process without touching Redis while open"""
+    breaker._transition(CircuitBreaker.OPEN)
+    monkeypatch.setattr(rate_limit.strict_rate_limiter, "breaker", breaker)
+    monkeypatch.setattr(rate_limit.hybrid_rate_limiter, "breaker", breaker)
+    monkeypatch.setattr(rate_limit, "local_rate_limiter", LocalRateLimiter(period=3600, workers=1))
+    degraded = metrics.get("rate_limit_degraded_total")
+
+    result = await rate_limit.check_rate_limit("org", SubscriptionTier.FREE)
+
+    assert result.allowed
+    assert result.limit == rate_limit.rate_limit_for_tier(SubscriptionTier.FREE)
+    assert metrics.get("rate_limit_degraded_total") == degraded + 1
+
+
+class FakeScriptRedis:
+    """Answers every GCRA call with 99 requests remaining"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def register_script(self, script):
+        async def run(keys, args, client=None):
+            self.calls += 1
+            return [1, 99, 1000, 0, 1_000_000]
+        return run
+
+
+@pytest.mark.asyncio
+async def test_local_hybrid_hits_bypass_breaker(breaker):
+    """Test requests served from the local allowance neither reset nor close the breaker"""
+    redis = FakeScriptRedis()
+    limiter = rate_limit.HybridRateLimiter(redis, period=3600, sync_interval=60, error_bound=0.1, breaker=breaker)
+    await limiter.hit("org", 100)
+    breaker._transition(CircuitBreaker.OPEN)
+    breaker._transition(CircuitBreaker.HALF_OPEN)
+    breaker.failures = 2
+
+    assert (await limiter.hit("org", 100)).allowed
+
+    assert redis.calls == 1
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.failures == 2
@@ -0,0 +1,208 @@
+import socket
+
+import pytest
+
+from src.core.redis_client import sync_redis_client
+from src.core.redis_lock import RedisLock
+from src.services.email import (
+    EmailDispatcher,
+    EmailOutbox,
+    RateShaper,
+    SharedRateShaper,
+    SMTPConnectionPool,
+    render_email,
+)
+from src.tasks.email_tasks import DELIVERY_LOCK_KEY, deliver_emails
+
+controller_module = pytest.importorskip("aiosmtpd.controller")
+
+
+class RecordingHandler:
+    """Accepts everything except addresses starting with "busy" (451) or "gone" (550)"""
+
+    def __init__(self):
+        self.messages = []
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        if address.startswith("busy"):
+            return "451 Try again later"
+        if address.startswith("gone"):
+            return "550 No such user"
+        envelope.rcpt_tos.append(address)
+        return "250 OK"
+
+    async def handle_DATA(self, server, session, envelope):
+        self.messages.append((session.peer, envelope.rcpt_tos[0], envelope.content))
+        return "250 Message accepted"
+
+
+@pytest.fixture
+def smtp_server():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    handler = RecordingHandler()
+    controller = controller_module.Controller(handler, hostname="127.0.0.1", port=port)
+    controller.start()
+    yield handler, port
+    controller.stop()
+
+
+def make_dispatcher(port: int, **pool_options) -> EmailDispatcher:
+    pool = SMTPConnectionPool(host="127.0.0.1", port=port, user="", starttls=False, **pool_options)
+    return EmailDispatcher(outbox=None, pool=pool, shaper=RateShaper(0), max_retries=2, backoff=1.0)
+
+
+def item(template: str, to: str, attempts: int = 0, **context) -> dict:
+    return {"id": to, "template": template, "to": to, "context": context, "attempts": attempts}
+
+
+def test_render_email():
+    """Test templates are filled from the context"""
+    message = render_email("invoice", "a@example.com", {"invoice_url": "https://pay/1"})
+    assert message["To"] == "a@example.com"
+    assert message["Subject"] == "Your invoice is ready"
+    assert "https://pay/1" in message.get_content()
+
+    with pytest.raises(KeyError):
+        render_email("invoice", "a@example.com", {})
+
+
+def test_batch_is_sent_over_one_connection(smtp_server):
+    """Test a batch, and the next one, reuse the pooled connection"""
+    handler, port = smtp_server
+    dispatcher = make_dispatcher(port)
+
+    first = dispatcher.send_batch([item("welcome", f"user{i}@example.com", organization_name="Acme") for i in range(20)])
+    second = dispatcher.send_batch([item("subscription_confirmation", "owner@example.com", tier="pro")])
+    dispatcher.pool.close()
+
+    assert len(first.sent) == 20 and len(second.sent) == 1
+    assert not first.retry and not first.dead
+    assert len(handler.messages) == 21
+    assert len({peer for peer, _, _ in handler.messages}) == 1
+    assert b"Welcome to Acme" in handler.messages[0][2]
+
+
+def test_connection_is_recycled(smtp_server):
+    """Test a connection is replaced after messages_per_connection sends"""
+    handler, port = smtp_server
+    dispatcher = make_dispatcher(port, messages_per_connection=3)
+
+    result = dispatcher.send_batch([item("invoice", f"user{i}@example.com", invoice_url="u") for i in range(7)])
+    dispatcher.pool.close()
+
+    assert len(result.sent) == 7
+    assert len({peer for peer, _, _ in handler.messages}) == 3
+
+
+def test_transient_and_permanent_failures(smtp_server):
+    """Test 4xx replies are retried with backoff, 5xx and exhausted retries are dead"""
+    handler, port = smtp_server
+    dispatcher = make_dispatcher(port)
+
+    result = dispatcher.send_batch([
+        item("invoice", "busy@example.com", invoice_url="u"),
+        item("invoice", "gone@example.com", invoice_url="u"),
+        item("invoice", "busy-again@example.com", attempts=2, invoice_url="u"),
+        item("invoice", "ok@example.com", invoice_url="u"),
+        item("invoice", "broken@example.com"),
+    ])
+    dispatcher.pool.close()
+
+    assert [i["to"] for i in result.sent] == ["ok@example.com"]
+    assert [(i["to"], i["attempts"]) for i, _ in result.retry] == [("busy@example.com", 1)]
+    assert 0.5 <= result.retry[0][1] <= 1.0
+    assert sorted(i["to"] for i, _ in result.dead) == ["broken@example.com", "busy-again@example.com", "gone@example.com"]
+    assert len(handler.messages) == 1
+
+
+def test_unreachable_provider_defers_batch():
+    """Test a failed connect retries the whole batch instead of erroring"""
+    dispatcher = make_dispatcher(port=1, timeout=1.0)
+
+    result = dispatcher.send_batch([item("invoice", f"user{i}@example.com", invoice_url="u") for i in range(3)])
+
+    assert not result.sent and not result.dead
+    assert len(result.retry) == 3
+
+
+def test_rate_shaper_paces_sends():
+    """Test bursts beyond one second of tokens wait for the refill"""
+    now = [0.0]
+    waits = []
+
+    def sleep(seconds):
+        waits.append(seconds)
+        now[0] += seconds
+
+    shaper = RateShaper(10, timer=lambda: now[0], sleep=sleep)
+    for _ in range(12):
+        shaper.acquire()
+
+    assert waits == pytest.approx([0.1, 0.1])
+
+
+def test_shared_rate_shaper_paces_all_workers():
+    """Test shapers of the same provider in different workers draw from one bucket"""
+    waits = []
+    shapers = [SharedRateShaper(sync_redis_client, "test-smtp", rate=10, sleep=waits.append) for _ in range(2)]
+    try:
+        for i in range(12):
+            shapers[i % 2].acquire()
+    finally:
+        sync_redis_client.delete(shapers[0].key)
+
+    assert waits == pytest.approx([0.1, 0.2], abs=0.05)
+
+
+def test_overlapping_delivery_runs_are_skipped():
+    """Test a delivery run does nothing while another one holds the lock"""
+    lock = RedisLock(sync_redis_client, DELIVERY_LOCK_KEY, 60)
+    assert lock.acquire()
+    try:
+        assert deliver_emails() == {"skipped": True}
+    finally:
+        lock.release()
+
+
+def test_outbox_delivery(smtp_server):
+    """Test queued messages are delivered and transient failures come back once due"""
+    handler, port = smtp_server
+    outbox = EmailOutbox(sync_redis_client, key="test:email:outbox")
+    dispatcher = make_dispatcher(port)
+    dispatcher.outbox = outbox
+
+    try:
+        outbox.enqueue("welcome", "a@example.com", {"organization_name": "Acme"})
+        outbox.enqueue("welcome", "busy@example.com", {"organization_name": "Acme"})
+
+        assert dispatcher.run() == {"sent": 1, "retried": 1, "dead": 0}
+        assert outbox.size() == {"queued": 0, "retrying": 1, "dead": 0}
+
+        assert outbox.promote_due(now=float("inf")) == 1
+        assert outbox.take(10)[0]["attempts"] == 1
+    finally:
+        dispatcher.pool.close()
+        sync_redis_client.delete(outbox.key, outbox.retry_key, outbox.dead_key)
+
+
+def test_tenant_outbox_schedules_delivery_once():
+    """Test an organization's outbox asks for a delivery when it stops being empty"""
+    scheduled = []
+    outbox = EmailOutbox(sync_redis_client, key="test:email:outbox", on_backlog=scheduled.append)
+
+    try:
+        outbox.enqueue("welcome", "a@example.com", {"organization_name": "Acme"}, organization_id="org-1")
+        outbox.enqueue("welcome", "b@example.com", {"organization_name": "Acme"}, organization_id="org-1")
+        outbox.enqueue("welcome", "c@example.com", {"organization_name": "Acme"})
+        assert scheduled == ["org-1"]
+        assert (outbox.pending("org-1"), outbox.pending()) == (2, 1)
+
+        taken = outbox.take(10, "org-1")
+        outbox.retry([(taken[0], 0)], now=1.0)
+        assert outbox.promote_due(now=2.0) == 1
+        assert scheduled == ["org-1", "org-1"]
+        assert outbox.take(10, "org-1")[0]["to"] == "a@example.com"
+    finally:
+        sync_redis_client.delete(outbox.key, outbox.queue_key("org-1"), outbox.retry_key, outbox.dead_key)
@@ -0,0 +1,54 @@
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+
+from src.core import security
+from src.core.config import settings
+from src.core.security import create_access_token, get_current_user_token, verified_token_cache
+from src.middleware import AuditLoggerMiddleware, RateLimiterMiddleware, TenantContextMiddleware
+
+
+@pytest.fixture
+def middleware_client(monkeypatch):
+    """Minimal app wrapped in the same middleware stack as src.main"""
+    monkeypatch.setattr(settings, "RATE_LIMIT_ENABLED", False)
+    verified_token_cache.clear()
+
+    app = FastAPI()
+
+    @app.get("/api/v1/whoami")
+    async def whoami(current_user: dict = Depends(get_current_user_token)):
+        return current_user
+
+    app.add_middleware(AuditLoggerMiddleware)
+    app.add_middleware(RateLimiterMiddleware)
+    app.add_middleware(TenantContextMiddleware)
+
+    with TestClient(app) as client:
+        yield client
+
+
+def test_token_decoded_once_per_request(middleware_client, monkeypatch):
+    """Test the middleware and the auth dependency share one verification"""
+    calls = []
+    original_decode = security.jwt.decode
+
+    def counting_decode(*args, **kwargs):
+        calls.append(1)
+        return original_decode(*args, **kwargs)
+
+    monkeypatch.setattr(security.jwt, "decode", counting_decode)
+    token = create_access_token({"sub": "user-1", "organization_id": "org-1", "role": "admin"})
+
+    response = middleware_client.get("/api/v1/whoami", headers={"Authorization": f"Bearer {token}"})
+
+    assert response.status_code == 200
+    assert response.json()["organization_id"] == "org-1"
+    assert len(calls) == 1
+
+
+def test_invalid_token_rejected_by_endpoint(middleware_client):
+    """Test a bad token passes through the middleware and fails auth"""
+    response = middleware_client.get("/api/v1/whoami", headers={"Authorization": "Bearer not-a-token"})
+
+    assert response.status_code == 401
@@ -0,0 +1,51 @@
+import base64
+import json
+import uuid
+from datetime import datetime
+
+import pytest
+from fastapi import HTTPException
+
+from src.core.pagination import decode_cursor, decode_timestamp_cursor, encode_cursor
+
+
+def test_cursor_round_trip():
+    """Test a cursor decodes back to the values it was built from"""
+    timestamp = datetime(2026, 10, 17, 12, 30, 1, 123456)
+    row_id = uuid.uuid4()
+
+    cursor = encode_cursor(timestamp, row_id)
+
+    assert "=" not in cursor
+    assert decode_cursor(cursor, 2) == [timestamp.isoformat(), str(row_id)]
+
+
+@pytest.mark.parametrize("cursor", ["not-base64!", encode_cursor("only-one"), "e30"])
+def test_invalid_cursor_rejected(cursor):
+    """Test malformed cursors are a 400, not a server error"""
+    with pytest.raises(HTTPException) as exc:
+        decode_cursor(cursor, 2)
+    assert exc.value.status_code == 400
+
+
+def test_timestamp_cursor_decoded():
+    """Test a (timestamp, id) cursor decodes to typed values"""
+    timestamp = datetime(2026, 10, 17, 12, 30, 1)
+    row_id = uuid.uuid4()
+
+    assert decode_timestamp_cursor(encode_cursor(timestamp, row_id)) == (timestamp, row_id)
+
+
+@pytest.mark.parametrize("values", [
+    [1, 2],
+    [None, None],
+    ["2026-10-17T12:30:01+02:00", str(uuid.UUID(int=1))],
+    ["yesterday", str(uuid.UUID(int=1))],
+    ["2026-10-17T12:30:01", "not-a-uuid"],
+])
+def test_invalid_timestamp_cursor_rejected(values):
+    """Test wrongly typed values and offset timestamps are a 400"""
+    cursor = base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+    with pytest.raises(HTTPException) as exc:
+        decode_timestamp_cursor(cursor)
+    assert exc.value.status_code == 400
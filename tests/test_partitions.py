@@ -0,0 +1,20 @@
+from datetime import date
+
+from src.database.partitions import PARTITION_NAME_RE, add_months, month_start, partition_name
+
+
+def test_add_months_rolls_over_years():
+    """Test month arithmetic across year boundaries"""
+    assert add_months(date(2026, 11, 1), 1) == date(2026, 12, 1)
+    assert add_months(date(2026, 12, 1), 1) == date(2027, 1, 1)
+    assert add_months(date(2026, 1, 1), -1) == date(2025, 12, 1)
+    assert add_months(date(2026, 3, 1), 24) == date(2028, 3, 1)
+
+
+def test_partition_name_round_trips():
+    """Test partition names encode the month they hold"""
+    name = partition_name(month_start(date(2026, 7, 19)))
+
+    assert name == "audit_logs_y2026m07"
+    assert PARTITION_NAME_RE.match(name).groups() == ("2026", "07")
+    assert PARTITION_NAME_RE.match("audit_logs_default") is None
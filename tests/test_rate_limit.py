@@ -0,0 +1,117 @@
+import uuid
+
+import pytest
+import pytest_asyncio
+
+from src.core.config import settings
+from src.models.base import SubscriptionTier
+from src.services.rate_limit import HybridRateLimiter, RateLimitResult, RedisRateLimiter, rate_limit_for_tier
+from src.services.tier_cache import OrganizationTierCache
+
+
+@pytest_asyncio.fixture
+async def limiter_key(redis_client):
+    """Unique key per test, removed afterwards"""
+    key = f"test-{uuid.uuid4()}"
+    yield key
+    await redis_client.delete(RedisRateLimiter.key_prefix + key)
+
+
+def test_result_headers():
+    """Test rate limit headers are derived from the script reply"""
+    result = RateLimitResult.from_script(100, [1, 42, 5000, 0, 1_700_000_000_000])
+
+    assert result.headers == {
+        "X-RateLimit-Limit": "100",
+        "X-RateLimit-Remaining": "42",
+        "X-RateLimit-Reset": "1700000005",
+    }
+
+
+def test_denied_result_has_retry_after():
+    """Test a denied request tells the client when to retry"""
+    result = RateLimitResult.from_script(100, [0, 0, 3600000, 35500, 1_700_000_000_000])
+
+    assert not result.allowed
+    assert result.headers["Retry-After"] == "36"
+    assert result.headers["X-RateLimit-Remaining"] == "0"
+
+
+@pytest.mark.asyncio
+async def test_gcra_allows_exactly_limit_requests(redis_client, limiter_key):
+    """Test a burst is capped at the limit and remaining counts down exactly"""
+    limiter = RedisRateLimiter(redis_client, period=3600)
+
+    results = [await limiter.hit(limiter_key, 5) for _ in range(6)]
+
+    assert [r.allowed for r in results] == [True] * 5 + [False]
+    assert [r.remaining for r in results[:5]] == [4, 3, 2, 1, 0]
+    assert results[-1].retry_after > 0
+
+
+@pytest.mark.asyncio
+async def test_gcra_uses_constant_memory(redis_client, limiter_key):
+    """Test the key holds a single value regardless of request count"""
+    limiter = RedisRateLimiter(redis_client, period=3600)
+
+    for _ in range(50):
+        await limiter.hit(limiter_key, 1000)
+
+    assert await redis_client.type(RedisRateLimiter.key_prefix + limiter_key) == "string"
+
+
+@pytest.mark.asyncio
+async def test_hybrid_limiter_batches_redis_calls(redis_client, limiter_key):
+    """Test the hybrid limiter only reaches Redis once per local allowance"""
+    limiter = HybridRateLimiter(redis_client, period=3600, sync_interval=60, error_bound=0.1)
+    calls = []
+    script = limiter._script
+    limiter._script = lambda *args, **kwargs: calls.append(1) or script(*args, **kwargs)
+
+    results = [await limiter.hit(limiter_key, 100) for _ in range(30)]
+
+    assert all(r.allowed for r in results)
+    # Initial read, then one reconciliation per 10 admitted requests
+    assert len(calls) == 3
+    assert results[-1].remaining == 70
+
+
+@pytest.mark.asyncio
+async def test_hybrid_limiter_respects_global_limit(redis_client, limiter_key):
+    """Test requests admitted by the hybrid limiter count against the shared limit"""
+    hybrid = HybridRateLimiter(redis_client, period=3600, sync_interval=60, error_bound=0.1)
+    strict = RedisRateLimiter(redis_client, period=3600)
+
+    for _ in range(20):
+        assert (await hybrid.hit(limiter_key, 20)).allowed
+    await hybrid.flush()
+
+    assert not (await strict.hit(limiter_key, 20)).allowed
+    assert not (await hybrid.hit(limiter_key, 20)).allowed
+
+
+def test_rate_limit_for_tier():
+    """Test each tier maps to its configured limit"""
+    assert rate_limit_for_tier(SubscriptionTier.FREE) == settings.RATE_LIMIT_FREE_TIER
+    assert rate_limit_for_tier(SubscriptionTier.PRO) == settings.RATE_LIMIT_PRO_TIER
+    assert rate_limit_for_tier(SubscriptionTier.ENTERPRISE) == settings.RATE_LIMIT_ENTERPRISE_TIER
+
+
+@pytest.mark.asyncio
+async def test_tier_cache_resolves_through_redis(redis_client):
+    """Test a tier stored in Redis is served and then kept locally"""
+    cache = OrganizationTierCache(redis_client, local_ttl=60)
+    organization_id = str(uuid.uuid4())
+    await redis_client.hset(cache.redis_key(organization_id), "tier", "enterprise")
+
+    try:
+        assert await cache.get_tier(organization_id) == SubscriptionTier.ENTERPRISE
+        await redis_client.delete(cache.redis_key(organization_id))
+        # Second lookup is answered by the in-process layer
+        assert await cache.get_tier(organization_id) == SubscriptionTier.ENTERPRISE
+
+        await cache.invalidate(organization_id)
+        await redis_client.hset(cache.redis_key(organization_id), "tier", "pro")
+        assert await cache.get_tier(organization_id) == SubscriptionTier.PRO
+    finally:
+        await redis_client.delete(cache.redis_key(organization_id))
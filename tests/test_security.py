@@ -0,0 +1,132 @@
+import asyncio
+import hashlib
+import threading
+import time
+from datetime import timedelta
+
+import pytest
+from fastapi import HTTPException
+from jose import jwt
+
+from src.core import security
+from src.core.cache import LRUCache
+from src.core.security import (
+    PasswordHashingPool, create_access_token, decode_token, get_password_hash_async,
+    verified_token_cache, verify_password_async
+)
+
+
+@pytest.fixture(autouse=True)
+def clear_token_cache():
+    verified_token_cache.clear()
+    yield
+    verified_token_cache.clear()
+
+
+def test_decode_token_caches_verified_claims(monkeypatch):
+    """Test repeat decodes of the same token skip verification"""
+    token = create_access_token({"sub": "user-1", "organization_id": "org-1"})
+    first = decode_token(token)
+
+    def fail_decode(*args, **kwargs):
+        raise AssertionError("token should come from the cache")
+
+    monkeypatch.setattr(security.jwt, "decode", fail_decode)
+    assert decode_token(token) == first
+
+
+def test_cached_claims_cannot_be_modified():
+    """Test changes to a returned payload don't reach later decodes"""
+    token = create_access_token({"sub": "user-1", "role": "member"})
+    decode_token(token)["role"] = "admin"
+
+    assert decode_token(token)["role"] == "member"
+    decode_token(token)["role"] = "admin"
+    assert decode_token(token)["role"] == "member"
+
+
+def test_decode_token_rejects_tampered_token():
+    """Test a modified signature is still rejected"""
+    token = create_access_token({"sub": "user-1"})
+    decode_token(token)
+
+    with pytest.raises(HTTPException) as exc:
+        decode_token(token[:-2] + ("A" if token[-2] != "A" else "B") + token[-1])
+    assert exc.value.status_code == 401
+
+
+def test_decode_token_rejects_expired_token():
+    """Test expired tokens are never served from the cache"""
+    token = create_access_token({"sub": "user-1"}, expires_delta=timedelta(seconds=-5))
+
+    with pytest.raises(HTTPException):
+        decode_token(token)
+    assert len(verified_token_cache) == 0
+
+
+def test_cached_claims_expire_with_token(monkeypatch):
+    """Test cache entries live exactly as long as jose would accept the token"""
+    token = create_access_token({"sub": "user-1"})
+    digest = hashlib.sha256(token.encode()).digest()
+    exp = jwt.get_unverified_claims(token)["exp"]
+    decode_token(token)
+
+    monkeypatch.setattr(verified_token_cache, "timer", lambda: exp + 0.5)
+    assert verified_token_cache.get(digest) is not None
+
+    monkeypatch.setattr(verified_token_cache, "timer", lambda: exp + 1)
+    assert verified_token_cache.get(digest) is None
+
+
+def test_lru_cache_evicts_least_recently_used():
+    """Test the cache stays within its size bound"""
+    cache = LRUCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+
+def test_lru_cache_ttl():
+    """Test entries expire after their ttl"""
+    now = [time.time()]
+    cache = LRUCache(maxsize=10, ttl=5, timer=lambda: now[0])
+    cache.set("a", 1)
+
+    now[0] += 4
+    assert cache.get("a") == 1
+    now[0] += 1
+    assert cache.get("a") is None
+
+
+@pytest.mark.asyncio
+async def test_password_hashing_runs_off_the_event_loop():
+    """Test async hash and verify round trip through the pool"""
+    hashed = await get_password_hash_async("s3cret-password")
+
+    assert await verify_password_async("s3cret-password", hashed)
+    assert not await verify_password_async("wrong-password", hashed)
+
+
+@pytest.mark.asyncio
+async def test_password_hashing_pool_rejects_when_full():
+    """Test callers beyond the pending limit get a 503 instead of queueing"""
+    pool = PasswordHashingPool(max_workers=1, max_pending=1)
+    release = threading.Event()
+    try:
+        running = [asyncio.create_task(pool.run("hash", release.wait)) for _ in range(2)]
+        await asyncio.sleep(0.05)
+
+        with pytest.raises(HTTPException) as exc:
+            await pool.run("hash", release.wait)
+        assert exc.value.status_code == 503
+
+        release.set()
+        assert await asyncio.gather(*running) == [True, True]
+    finally:
+        release.set()
+        pool.shutdown()
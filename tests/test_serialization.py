@@ -0,0 +1,33 @@
+import json
+import uuid
+from datetime import datetime
+
+from src.api.audit_logs import EXPORT_COLUMNS
+from src.api.users import LIST_COLUMNS
+from src.models.base import UserRole
+from src.schemas import AuditLogResponse, UserListResponse, UserResponse
+from src.schemas.adapters import audit_log_list_serializer, user_list_serializer
+
+
+def test_list_serializer_matches_validated_models():
+    """Test pages built from rows serialize exactly like validated models"""
+    row = {
+        "id": uuid.uuid4(),
+        "organization_id": uuid.uuid4(),
+        "email": "user@example.com",
+        "full_name": None,
+        "role": UserRole.VIEWER,
+        "is_active": True,
+        "created_at": datetime(2026, 10, 17, 12, 30, 0, 123456),
+        "last_login": None,
+    }
+    expected = UserListResponse(items=[UserResponse(**row)], next_cursor="abc").model_dump_json()
+
+    assert json.loads(user_list_serializer.dump_json([row], "abc")) == json.loads(expected)
+
+
+def test_list_columns_cover_response_fields():
+    """Test the selected columns are exactly the fields of the item models"""
+    assert {c.key for c in LIST_COLUMNS} == set(UserResponse.model_fields)
+    assert {c.key for c in EXPORT_COLUMNS} == set(AuditLogResponse.model_fields)
+    assert audit_log_list_serializer.item_model is AuditLogResponse
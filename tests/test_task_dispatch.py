@@ -0,0 +1,97 @@
+import json
+
+import pytest
+
+from src.core.redis_client import sync_redis_client
+from src.models.base import SubscriptionTier
+from src.tasks.dispatch import TenantScheduler, tier_weight
+
+
+@pytest.fixture
+def scheduler():
+    sent = []
+
+    def send_task(name, args, kwargs, queue, headers):
+        sent.append((queue, headers["organization_id"], args[0]))
+
+    scheduler = TenantScheduler(sync_redis_client, send_task=send_task, max_concurrency=3)
+    scheduler.prefix = "test:tasks"
+    scheduler.sent = sent
+    yield scheduler
+    keys = sync_redis_client.keys("test:tasks:*")
+    if keys:
+        sync_redis_client.delete(*keys)
+
+
+def test_tier_weight():
+    """Test weights follow the subscription tier"""
+    assert tier_weight(SubscriptionTier.ENTERPRISE) == 4
+    assert tier_weight("pro") == 2
+    assert tier_weight(None) == 1
+
+
+def test_round_robin_across_tenants(scheduler):
+    """Test a tenant's backlog doesn't hold back other tenants, weights set their share"""
+    for i in range(50):
+        scheduler.submit("noisy.task", "noisy", args=(i,))
+    scheduler.submit("quiet.task", "quiet", args=(0,))
+    for i in range(4):
+        scheduler.submit("pro.task", "pro", args=(i,), tier=SubscriptionTier.PRO)
+
+    scheduler.lane_budgets = {"default": 5}
+    assert scheduler.dispatch()["default"] == 5
+    assert [org for _, org, _ in scheduler.sent] == ["noisy", "quiet", "pro", "pro", "noisy"]
+    assert {queue for queue, _, _ in scheduler.sent} == {"default"}
+
+
+def test_concurrency_cap_and_release(scheduler):
+    """Test an organization never has more than max_concurrency tasks running"""
+    for i in range(10):
+        scheduler.submit("noisy.task", "noisy", args=(i,), tier="enterprise")
+
+    scheduler.lane_budgets = {"default": 100}
+    assert scheduler.dispatch()["default"] == 3
+    assert scheduler.dispatch()["default"] == 0
+
+    scheduler.finished("noisy")
+    assert scheduler.dispatch()["default"] == 1
+    assert [i for _, _, i in scheduler.sent] == [0, 1, 2, 3]
+
+    scheduler.started("noisy", "default", enqueued_at=0)
+    stats = scheduler.stats()["default"]["noisy"]
+    assert stats["pending"] == 6
+    assert stats["mean_wait_seconds"] > 0
+
+
+def test_unknown_lane_is_rejected(scheduler):
+    with pytest.raises(ValueError):
+        scheduler.submit("task", "org", lane="urgent")
+
+
+def test_failed_release_requeues_once(scheduler):
+    """Test jobs the broker refused go back in order and the tenant joins the ring once"""
+    def send_task(name, args, kwargs, queue, headers):
+        if args[0] == 1:
+            raise ConnectionError("broker down")
+        scheduler.sent.append(args[0])
+
+    scheduler.send_task = send_task
+    for i in range(3):
+        scheduler.submit("noisy.task", "noisy", args=(i,), tier="enterprise")
+
+    scheduler.lane_budgets = {"default": 100}
+    with pytest.raises(ConnectionError):
+        scheduler.dispatch()
+
+    assert scheduler.sent == [0]
+    assert sync_redis_client.lrange(scheduler.ring_key("default"), 0, -1) == ["noisy"]
+    assert [json.loads(job)["args"] for job in sync_redis_client.lrange(scheduler.queue_key("default", "noisy"), 0, -1)] == [[1], [2]]
+    assert sync_redis_client.get(scheduler.running_key("noisy")) == "1"
+
+
+def test_submit_without_tier_keeps_weight(scheduler):
+    """Test re-submitted jobs keep the weight of the organization's tier"""
+    scheduler.submit("pro.task", "pro", args=(0,), tier=SubscriptionTier.PRO)
+    scheduler.submit("pro.task", "pro", args=(1,))
+
+    assert sync_redis_client.hget(scheduler.weights_key("default"), "pro") == "2"
@@ -0,0 +1,70 @@
+import uuid
+
+import pytest
+
+from src.schemas import MessageResponse
+from src.services.circuit_breaker import CircuitBreaker
+from src.services.tenant_cache import TenantCache
+
+
+def counting_loader(calls: list, message: str = "hello"):
+    async def load():
+        calls.append(1)
+        return MessageResponse(message=message)
+    return load
+
+
+@pytest.mark.asyncio
+async def test_cache_hit_and_invalidation(redis_client):
+    """Test entries are served from cache until the organization is invalidated"""
+    cache = TenantCache(redis_client, breaker=CircuitBreaker("test-tenant-cache"))
+    organization_id = str(uuid.uuid4())
+    calls = []
+
+    try:
+        first = await cache.get(organization_id, "message", MessageResponse, counting_loader(calls))
+        second = await cache.get(organization_id, "message", MessageResponse, counting_loader(calls))
+        assert first == second == MessageResponse(message="hello")
+        assert len(calls) == 1
+
+        # Another worker only shares the Redis layer
+        other = TenantCache(redis_client, breaker=CircuitBreaker("test-tenant-cache"))
+        assert await other.get(organization_id, "message", MessageResponse, counting_loader(calls))
+        assert len(calls) == 1
+
+        await cache.invalidate(organization_id)
+        updated = await cache.get(organization_id, "message", MessageResponse, counting_loader(calls, "updated"))
+        assert updated.message == "updated"
+        assert len(calls) == 2
+    finally:
+        keys = await redis_client.keys(f"tenant:{organization_id}:*")
+        if keys:
+            await redis_client.delete(*keys)
+
+
+@pytest.mark.asyncio
+async def test_open_breaker_bypasses_cache():
+    """Test nothing is cached while Redis is unavailable"""
+    breaker = CircuitBreaker("test-tenant-cache-open")
+    breaker._transition(CircuitBreaker.OPEN)
+    cache = TenantCache(redis=None, breaker=breaker)
+    calls = []
+
+    for _ in range(2):
+        value = await cache.get("org", "message", MessageResponse, counting_loader(calls))
+        assert value.message == "hello"
+
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_missing_rows_are_not_cached():
+    """Test a loader returning None is passed through"""
+    breaker = CircuitBreaker("test-tenant-cache-missing")
+    breaker._transition(CircuitBreaker.OPEN)
+    cache = TenantCache(redis=None, breaker=breaker)
+
+    async def load():
+        return None
+
+    assert await cache.get("org", "message", MessageResponse, load) is None
@@ -0,0 +1,123 @@
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import pytest
+from fastapi import FastAPI, status
+from fastapi.testclient import TestClient
+
+from src.core.redis_client import sync_redis_client
+from src.core.security import create_access_token, decode_token
+from src.middleware.tenant_context import TenantContextMiddleware
+from src.middleware.usage_meter import UsageMeterMiddleware
+from src.models.base import UsageHourly
+from src.services.circuit_breaker import CircuitBreaker, CircuitOpenError
+from src.services.usage import PENDING_KEY, UsageMeter, _rows, rollup_usage, usage_key
+
+
+def make_meter(breaker: CircuitBreaker = None) -> UsageMeter:
+    return UsageMeter(
+        redis=None,
+        breaker=breaker or CircuitBreaker("test-usage"),
+        clock=lambda: datetime(2026, 10, 17, 14, 35)
+    )
+
+
+def test_middleware_counts_route_templates():
+    """Test requests are counted per organization, hour and route template"""
+    meter = make_meter()
+    app = FastAPI()
+    app.add_middleware(UsageMeterMiddleware, meter=meter)
+    app.add_middleware(TenantContextMiddleware)
+
+    @app.get("/items/{item_id}")
+    async def get_item(item_id: int):
+        return {"id": item_id}
+
+    organization_id = str(uuid.uuid4())
+    token = create_access_token({"sub": str(uuid.uuid4()), "organization_id": organization_id})
+    client = TestClient(app)
+    for item_id in (1, 2, 3):
+        client.get(f"/items/{item_id}", headers={"Authorization": f"Bearer {token}"})
+    client.get("/items/1")  # no tenant
+    client.get("/missing", headers={"Authorization": f"Bearer {token}"})  # no route
+
+    assert dict(meter._pending) == {(organization_id, "2026101714", "GET /items/{item_id}"): 3}
+
+
+@pytest.mark.asyncio
+async def test_failed_flush_keeps_counts():
+    """Test counts survive a flush that didn't reach Redis"""
+    breaker = CircuitBreaker("test-usage-open")
+    breaker._transition(CircuitBreaker.OPEN)
+    meter = make_meter(breaker)
+
+    meter.record("org", "GET", "/api/v1/users/")
+    with pytest.raises(CircuitOpenError):
+        await meter.flush()
+    meter.record("org", "GET", "/api/v1/users/")
+
+    assert dict(meter._pending) == {("org", "2026101714", "GET /api/v1/users/"): 2}
+
+
+def test_claimed_hash_to_rows():
+    """Test a claimed Redis hash maps to usage_hourly rows"""
+    organization_id = str(uuid.uuid4())
+    rows = _rows(f"usage:{organization_id}:2026101714:claimed", {"GET /api/v1/users/{user_id}": "7"})
+
+    assert rows == [{
+        "organization_id": organization_id,
+        "hour": datetime(2026, 10, 17, 14),
+        "method": "GET",
+        "route": "/api/v1/users/{user_id}",
+        "request_count": 7,
+    }]
+
+
+def test_get_usage_aggregates_rollup(client, db_session, get_auth_headers):
+    """Test usage is summed per day, optionally per route"""
+    headers = get_auth_headers()
+    organization_id = decode_token(headers["Authorization"].split()[1])["organization_id"]
+    db_session.add_all([
+        UsageHourly(organization_id=organization_id, hour=datetime(2026, 10, 16, 9), method="GET", route="/a", request_count=5),
+        UsageHourly(organization_id=organization_id, hour=datetime(2026, 10, 16, 10), method="GET", route="/a", request_count=3),
+        UsageHourly(organization_id=organization_id, hour=datetime(2026, 10, 17, 9), method="POST", route="/b", request_count=2),
+    ])
+    db_session.commit()
+
+    params = {"start": "2026-10-16T00:00:00", "end": "2026-10-18T00:00:00", "granularity": "day"}
+    response = client.get("/api/v1/usage", params=params, headers=headers)
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert data["total_requests"] == 10
+    assert [(item["period"][:10], item["request_count"]) for item in data["items"]] == [
+        ("2026-10-16", 8), ("2026-10-17", 2)
+    ]
+
+    response = client.get("/api/v1/usage", params={**params, "by_route": True}, headers=headers)
+    assert [(item["route"], item["request_count"]) for item in response.json()["items"]] == [("/a", 8), ("/b", 2)]
+
+    response = client.get("/api/v1/usage", params={**params, "end": "2026-10-15T00:00:00"}, headers=headers)
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_concurrent_rollups_apply_counts_once(db_engine, db_session, get_auth_headers):
+    """Test overlapping rollups never add the same claimed counts twice"""
+    headers = get_auth_headers()
+    organization_id = decode_token(headers["Authorization"].split()[1])["organization_id"]
+    key = usage_key(organization_id, "2026101714")
+    sync_redis_client.hincrby(key, "GET /a", 5)
+    sync_redis_client.sadd(PENDING_KEY, key)
+    start = threading.Barrier(2)
+
+    def run():
+        start.wait()
+        return rollup_usage(db_engine, sync_redis_client)
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        written = [future.result() for future in [pool.submit(run), pool.submit(run)]]
+
+    assert sum(written) == 1
+    row = db_session.query(UsageHourly).filter(UsageHourly.organization_id == organization_id).one()
+    assert row.request_count == 5
@@ -1,6 +1,12 @@
+import io
+import uuid
+
 import pytest
 from fastapi import status
 
+from src.core.config import settings
+from src.services.user_import import UserImport, iter_import_records, read_import_records
+
 
 def test_get_current_user(client, get_auth_headers):
     """Test getting current user profile"""
@@ -22,8 +28,36 @@ def test_list_users_as_admin(client, get_auth_headers):
     
     assert response.status_code == status.HTTP_200_OK
     data = response.json()
-    assert isinstance(data, list)
-    assert len(data) >= 1  # At least the registered user
+    assert isinstance(data["items"], list)
+    assert len(data["items"]) >= 1  # At least the registered user
+
+
+def test_list_users_filters_and_pages(client, get_auth_headers):
+    """Test search, filters and keyset pagination of the user list"""
+    headers = get_auth_headers()
+    for name, role in [("Ada Lovelace", "member"), ("Alan Turing", "viewer"), ("Grace_Hopper", "member")]:
+        email = name.lower().replace(" ", ".") + "@example.com"
+        client.post("/api/v1/users/", json={"email": email, "password": "password123", "full_name": name, "role": role}, headers=headers)
+    
+    search = client.get("/api/v1/users/", params={"search": "LOVE"}, headers=headers).json()
+    assert [u["full_name"] for u in search["items"]] == ["Ada Lovelace"]
+    
+    # LIKE wildcards in the search term are matched literally
+    search = client.get("/api/v1/users/", params={"search": "_h"}, headers=headers).json()
+    assert [u["full_name"] for u in search["items"]] == ["Grace_Hopper"]
+    
+    members = client.get("/api/v1/users/", params={"role": "member"}, headers=headers).json()
+    assert {u["full_name"] for u in members["items"]} == {"Ada Lovelace", "Grace_Hopper"}
+    
+    seen = []
+    params = {"limit": 2}
+    while True:
+        page = client.get("/api/v1/users/", params=params, headers=headers).json()
+        seen += [u["id"] for u in page["items"]]
+        if not page["next_cursor"]:
+            break
+        params["cursor"] = page["next_cursor"]
+    assert len(seen) == len(set(seen)) == 4
 
 
 def test_create_user_as_admin(client, get_auth_headers):
@@ -45,9 +79,157 @@ def test_create_user_as_admin(client, get_auth_headers):
     assert data["role"] == "member"
 
 
+def test_create_user_rejects_email_of_other_organization(client, get_auth_headers):
+    """Test emails are unique across organizations, not just within one"""
+    other = client.post("/api/v1/auth/register", json={
+        "email": "taken@example.com",
+        "password": "password123",
+        "organization_name": "Taken Org",
+        "organization_slug": "taken-org",
+    })
+    assert other.status_code == status.HTTP_201_CREATED
+
+    response = client.post(
+        "/api/v1/users/",
+        json={"email": "taken@example.com", "password": "password123"},
+        headers=get_auth_headers()
+    )
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert response.json()["detail"] == "Email already registered"
+
+
 def test_unauthorized_access(client):
     """Test accessing protected endpoint without auth"""
     response = client.get("/api/v1/users/me")
     
     # Should fail without auth header
     assert response.status_code in [401, 403]
+
+
+def test_import_users_csv(client, get_auth_headers, test_user_credentials):
+    """Test a CSV import reports created, duplicate and invalid rows"""
+    headers = get_auth_headers()
+    csv_data = (
+        "email,password,full_name,role\n"
+        "first@example.com,password123,First User,member\n"
+        f"{test_user_credentials['email']},password123,,\n"
+        "first@example.com,password123,Again,\n"
+        "not-an-email,password123,,\n"
+        "second@example.com,password123,,viewer\n"
+    )
+    
+    response = client.post(
+        "/api/v1/users/import",
+        files={"file": ("users.csv", csv_data, "text/csv")},
+        headers=headers
+    )
+    
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert (data["created"], data["duplicates"], data["invalid"]) == (2, 2, 1)
+    assert [r["status"] for r in data["results"]] == ["created", "duplicate", "duplicate", "invalid", "created"]
+    assert [r["line"] for r in data["results"]] == [2, 3, 4, 5, 6]
+    
+    login = client.post("/api/v1/auth/login", json={"email": "second@example.com", "password": "password123"})
+    assert login.status_code == status.HTTP_200_OK
+
+
+def test_import_users_skips_emails_of_other_organizations(client, get_auth_headers):
+    """Test an email registered in another organization is reported, not duplicated"""
+    other = client.post("/api/v1/auth/register", json={
+        "email": "elsewhere@example.com",
+        "password": "password123",
+        "organization_name": "Other Org",
+        "organization_slug": "other-org",
+    })
+    assert other.status_code == status.HTTP_201_CREATED
+
+    response = client.post(
+        "/api/v1/users/import",
+        files={"file": ("users.csv", "email,password\nelsewhere@example.com,password123\n", "text/csv")},
+        headers=get_auth_headers()
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert [(r["status"], r["detail"]) for r in response.json()["results"]] == [
+        ("duplicate", "Email already registered")
+    ]
+
+
+def test_import_users_row_limit(client, get_auth_headers, monkeypatch):
+    """Test uploads over the row limit are rejected without importing anything"""
+    monkeypatch.setattr(settings, "USER_IMPORT_MAX_ROWS", 2)
+    headers = get_auth_headers()
+    csv_data = "email,password\n" + "".join(f"limit{i}@example.com,password123\n" for i in range(3))
+    
+    response = client.post(
+        "/api/v1/users/import",
+        files={"file": ("users.csv", csv_data, "text/csv")},
+        headers=headers
+    )
+    
+    assert response.status_code == status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+    login = client.post("/api/v1/auth/login", json={"email": "limit0@example.com", "password": "password123"})
+    assert login.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+def test_import_records_from_ndjson():
+    """Test NDJSON records are parsed line by line with parse errors reported"""
+    stream = io.StringIO(
+        '{"email": "a@example.com", "password": "password123"}\n'
+        "\n"
+        "{broken\n"
+        '{"email": "a@example.com", "password": "password123"}\n'
+        '{"email": "b@example.com", "password": "short"}\n'
+    )
+    user_import = UserImport(organization_id=None)
+    
+    users = user_import.prepare(list(iter_import_records(stream, "ndjson")))
+    
+    assert [(line, user.email) for line, user in users] == [(1, "a@example.com")]
+    assert [(r.line, r.status) for r in user_import.report().results] == [
+        (3, "invalid"), (4, "duplicate"), (5, "invalid")
+    ]
+
+
+def test_read_import_records_stops_past_limit():
+    """Test an upload is parsed up to one record past the limit and left open"""
+    upload = io.BytesIO(b"\xef\xbb\xbfemail,password\n" + b"".join(b"u%d@example.com,password123\n" % i for i in range(5)))
+    
+    records = read_import_records(upload, "csv", 2)
+    
+    assert [record["email"] for _, record in records] == ["u0@example.com", "u1@example.com", "u2@example.com"]
+    assert not upload.closed
+
+
+def test_batch_update_and_delete_users(client, get_auth_headers):
+    """Test batch operations report every id and never delete the caller"""
+    headers = get_auth_headers()
+    me = client.get("/api/v1/users/me", headers=headers).json()
+    created = [
+        client.post("/api/v1/users/", json={"email": f"batch{i}@example.com", "password": "password123"}, headers=headers).json()
+        for i in range(2)
+    ]
+    ids = [user["id"] for user in created]
+    missing = str(uuid.uuid4())
+    
+    response = client.post(
+        "/api/v1/users/batch",
+        json={"user_ids": ids + [missing], "operation": "update", "update": {"is_active": False}},
+        headers=headers
+    )
+    
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert (data["found"], data["not_found"]) == (2, 1)
+    assert [r["status"] for r in data["results"]] == ["updated", "updated", "not_found"]
+    
+    response = client.post(
+        "/api/v1/users/batch",
+        json={"user_ids": [me["id"]] + ids, "operation": "delete"},
+        headers=headers
+    )
+    
+    assert [r["status"] for r in response.json()["results"]] == ["skipped", "deleted", "deleted"]
+    assert client.get("/api/v1/users/me", headers=headers).status_code == status.HTTP_200_OK